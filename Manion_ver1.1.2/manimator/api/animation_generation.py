@@ -2,41 +2,194 @@ import litellm
 from fastapi import HTTPException
 from dotenv import load_dotenv
 import os
+from functools import partial
+from typing import Optional
 
-from manimator.utils.system_prompts import MANIM_SYSTEM_PROMPT
+from manimator.utils.system_prompts import MANIM_PROMPT_PROFILES
+from manimator.utils.snippet_index import retrieve_snippets, format_snippets
+from manimator.utils.deadline import Deadline, check_timeout, llm_limits
+from manimator.utils.stream_guard import StreamGuard, StreamGuardViolation
+from manimator.utils.llm_client import stage_completion
+from manimator.utils.schema import ManimProcessor
+from manimator.utils.tex_precompile import start_tex_precompile
 
 load_dotenv('../config/.env')
 
 
-def generate_animation_response(prompt: str) -> str:
+def resolve_prompt_profile(profile: Optional[str] = None) -> str:
+    """Resolve the code generation prompt profile for a request.
+
+    Args:
+        profile (Optional[str]): Requested profile name. Defaults to the
+            CODE_PROMPT_PROFILE env variable, then "full"
+
+    Returns:
+        str: A key of MANIM_PROMPT_PROFILES
+
+    Raises:
+        HTTPException: If the profile is unknown, returns 400 status code
+    """
+
+    name = profile or os.getenv("CODE_PROMPT_PROFILE") or "full"
+    if name not in MANIM_PROMPT_PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown prompt profile '{name}'. Available: {', '.join(MANIM_PROMPT_PROFILES)}",
+        )
+    return name
+
+
+def build_code_system_prompt(prompt: str, profile: Optional[str] = None) -> str:
+    """Build the code generation system prompt for a given scene description.
+
+    Retrieves the most relevant snippets from the local library and uses them in
+    place of the fixed example scene. Falls back to the profile's example (the
+    full MANIM_SYSTEM_PROMPT for "full") when retrieval is disabled
+    (CODE_GEN_SNIPPETS=0) or nothing relevant is found. The number of snippets
+    comes from the profile unless CODE_GEN_SNIPPET_COUNT is set.
+
+    Args:
+        prompt (str): Scene description the code will be generated from
+        profile (Optional[str]): Prompt profile name, see resolve_prompt_profile
+
+    Returns:
+        str: System prompt content
+    """
+
+    config = MANIM_PROMPT_PROFILES[resolve_prompt_profile(profile)]
+    # CODE_GEN_SNIPPET_COUNT overrides the profile's snippet count
+    count = int(os.getenv("CODE_GEN_SNIPPET_COUNT") or config["snippet_count"])
+    snippets = []
+    if os.getenv("CODE_GEN_SNIPPETS", "1") != "0" and count:
+        snippets = retrieve_snippets(prompt, k=count)
+    if not snippets:
+        return config["instructions"] + config["example"]
+    return config["instructions"] + "\n\n" + format_snippets(snippets)
+
+
+def build_code_messages(prompt: str, profile: Optional[str] = None) -> list:
+    """Build the chat messages sent to the code generation model.
+
+    The overlap/cleanup reminder lives in every profile's instructions, so the
+    user turn carries only the scene description.
+
+    Args:
+        prompt (str): Scene description the code will be generated from
+        profile (Optional[str]): Prompt profile name, see resolve_prompt_profile
+
+    Returns:
+        list: Messages for litellm.completion
+    """
+
+    return [
+        {
+            "role": "system",
+            "content": build_code_system_prompt(prompt, profile),
+        },
+        {
+            "role": "user",
+            "content": prompt,
+        },
+    ]
+
+
+def _close_stream(response) -> None:
+    """Closes a litellm stream so the provider stops generating (and billing)."""
+    for target in (getattr(response, "completion_stream", None), response):
+        close = getattr(target, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+
+def stream_animation_response(
+    messages: list, guard: Optional[StreamGuard] = None, **kwargs
+) -> str:
+    """Stream a code completion, enforcing guard rules as tokens arrive.
+
+    Reading stops as soon as the first python block closes, since nothing
+    after it is used. Its formulas start compiling at that point, overlapping
+    LaTeX with the rest of job setup.
+
+    Args:
+        messages (list): Chat messages
+        guard (Optional[StreamGuard]): Guard rules. Defaults to StreamGuard.from_env()
+        **kwargs: Extra stage_completion arguments
+
+    Returns:
+        str: Completion text received so far
+
+    Raises:
+        StreamGuardViolation: If a rule is broken; the stream is cancelled first
+    """
+
+    guard = guard or StreamGuard.from_env()
+    response = stage_completion("code", messages, stream=True, **kwargs)
+    try:
+        for chunk in response:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta and guard.feed(delta):
+                start_tex_precompile(ManimProcessor().extract_code(guard.text))
+                break
+    finally:
+        _close_stream(response)
+    return guard.text
+
+
+def generate_animation_response(
+    prompt: str,
+    profile: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+    stream: Optional[bool] = None,
+) -> str:
     """Generate Manim animation code from a text prompt.
 
     Args:
         prompt (str): Text description of the desired animation
+        profile (Optional[str]): Prompt profile ("full", "compact", "minimal").
+            Defaults to the CODE_PROMPT_PROFILE env variable, then "full"
+        deadline (Optional[Deadline]): Request deadline. The call's timeout and
+            max_tokens leave RENDER_TIME_RESERVE_SECONDS for rendering
+        stream (Optional[bool]): Stream the completion through StreamGuard and
+            abort early on a violation. Defaults to the CODE_GEN_STREAM env variable
 
     Returns:
         str: Generated Manim Python code
 
     Raises:
-        HTTPException: If code generation fails, returns 500 status code
-            with error details
+        HTTPException: If the profile is unknown (400), the stream was aborted
+            by a guard rule (502), the deadline is exceeded (504) or code
+            generation fails (500) with error details
     """
 
+    messages = build_code_messages(prompt, profile)
+    if stream is None:
+        stream = os.getenv("CODE_GEN_STREAM", "0") == "1"
+    limits = partial(
+        llm_limits,
+        deadline,
+        "code_generation",
+        reserve=float(os.getenv("RENDER_TIME_RESERVE_SECONDS", "60")),
+        # Not retried when streamed: the guard has already seen part of the stream
+        retries=None if stream else 2,
+    )
     try:
-        messages = [
-            {
-                "role": "system",
-                "content": MANIM_SYSTEM_PROMPT,
-            },
-            {
-                "role": "user",
-                "content": f"{prompt}\n\n NOTE!!!: Make sure the objects or text in the generated code are not overlapping at any point in the video. Make sure that each scene is properly cleaned up before transitioning to the next scene.",
-            },
-        ]
-        response = litellm.completion(
-            model=os.getenv("CODE_GEN_MODEL"), messages=messages, num_retries=2
-        )
+        if stream:
+            return stream_animation_response(messages, limits=limits)
+        response = stage_completion("code", messages, limits=limits)
         return response.choices[0].message.content
+    except StreamGuardViolation as e:
+        raise HTTPException(
+            status_code=502, detail=f"Code generation stream aborted ({e.rule}): {e.detail}"
+        )
+    except HTTPException:
+        raise
+    except litellm.Timeout as e:
+        # A 504 either way; the deadline's only if it was the limit that ran out
+        check_timeout(deadline, "code_generation")
+        raise HTTPException(status_code=504, detail=f"Code generation timed out: {str(e)}")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to generate animation response: {str(e)}"
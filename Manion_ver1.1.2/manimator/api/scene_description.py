@@ -1,18 +1,22 @@
-from fastapi import HTTPException
 import litellm
+from fastapi import HTTPException
 import os
+from functools import partial
 from dotenv import load_dotenv
 
 from manimator.utils.helpers import compress_pdf
 from manimator.utils.system_prompts import SCENE_SYSTEM_PROMPT
 from manimator.few_shot.few_shot_prompts import SCENE_EXAMPLES, PDF_EXAMPLE
 from manimator.utils.ocr_helpers import process_image_file, validate_image_size, pdf_to_images
+from manimator.utils.deadline import Deadline, DeadlineExceeded, check_timeout, llm_limits
+from manimator.utils.llm_client import stage_completion
+from typing import Optional
 import base64
 
 load_dotenv('../config/.env')
 
 
-def process_prompt_scene(prompt: str) -> str:
+def process_prompt_scene(prompt: str, deadline: Optional[Deadline] = None) -> str:
     """Generate a scene description from a text prompt using LLM.
 
     This function takes a text prompt and generates a detailed scene description
@@ -21,6 +25,7 @@ def process_prompt_scene(prompt: str) -> str:
 
     Args:
         prompt: The text prompt describing the desired scene
+        deadline: Request deadline bounding the model call
 
     Returns:
         str: Generated scene description
@@ -42,11 +47,15 @@ def process_prompt_scene(prompt: str) -> str:
             "content": prompt,
         }
     )
-    response = litellm.completion(
-        model=os.getenv("PROMPT_SCENE_GEN_MODEL"),
-        messages=messages,
-        num_retries=2,
-    )
+    try:
+        response = stage_completion(
+            "scene",
+            messages,
+            limits=partial(llm_limits, deadline, "scene_description", retries=2),
+        )
+    except litellm.Timeout:
+        check_timeout(deadline, "scene_description")
+        raise
     return response.choices[0].message.content
 
 
@@ -54,6 +63,7 @@ def process_pdf_prompt(
     file_content: bytes,
     model: str = os.getenv("PDF_SCENE_GEN_MODEL"),
     retry: bool = False,
+    deadline: Optional[Deadline] = None,
 ) -> str:
     """Process a PDF file and generate a scene description using the specified model.
 
@@ -61,6 +71,7 @@ def process_pdf_prompt(
         file_content: Raw PDF file bytes
         model: LLM model to use for processing. Defaults to env PDF_SCENE_GEN_MODEL
         retry: Whether this is a retry attempt and should it use the PDF_RETRY_MODEL
+        deadline: Request deadline bounding the model call(s)
 
     Returns:
         str: Generated scene description
@@ -87,16 +98,25 @@ def process_pdf_prompt(
             },
         ]
 
-        response = litellm.completion(
+        response = stage_completion(
+            "pdf",
+            messages,
             model=model,
-            messages=messages,
+            local=not retry,
+            limits=partial(llm_limits, deadline, "pdf_scene_description"),
         )
         return response.choices[0].message.content
 
+    except DeadlineExceeded:
+        raise
     except Exception as e:
+        if isinstance(e, litellm.Timeout):
+            check_timeout(deadline, "pdf_scene_description")
         retry_model = os.getenv("PDF_RETRY_MODEL")
         if not retry and retry_model:
-            return process_pdf_prompt(file_content, model=retry_model, retry=True)
+            return process_pdf_prompt(
+                file_content, model=retry_model, retry=True, deadline=deadline
+            )
         raise HTTPException(status_code=500, detail=f"Failed to process PDF: {str(e)}")
 
 
@@ -104,6 +124,7 @@ def process_handwriting_prompt(
     file_content: bytes,
     ocr_type: str = "vision", # 기본값을 vision으로 변경
     model: str = os.getenv("PDF_SCENE_GEN_MODEL"), # Vision 모델 사용
+    deadline: Optional[Deadline] = None,
 ) -> str:
     """Process a handwritten image/PDF and generate a scene description.
 
@@ -115,6 +136,7 @@ def process_handwriting_prompt(
             - "google": Use Google Vision OCR for text
             - "both": Use both OCR services
         model: LLM model to use for scene generation (vision models for "vision" mode)
+        deadline: Request deadline bounding OCR and model calls
 
     Returns:
         str: Generated scene description
@@ -173,17 +195,18 @@ def process_handwriting_prompt(
                 },
             ]
             
-            response = litellm.completion(
+            response = stage_completion(
+                "pdf",
+                messages,
                 model=model,
-                messages=messages,
-                num_retries=2,
+                limits=partial(llm_limits, deadline, "handwriting_scene_description", retries=2),
             )
             
             return response.choices[0].message.content
         
         else:
             # 기존 OCR 방식
-            extracted_text = process_image_file(file_content, file_type="auto")
+            extracted_text = process_image_file(file_content, file_type="auto", deadline=deadline)
             
             if not extracted_text or extracted_text.strip() == "No text could be extracted from the provided file":
                 raise HTTPException(
@@ -213,10 +236,10 @@ Please create a detailed scene description for animating the concepts found in t
                 }
             )
             
-            response = litellm.completion(
-                model=os.getenv("PROMPT_SCENE_GEN_MODEL"),  # 텍스트용 모델
-                messages=messages,
-                num_retries=2,
+            response = stage_completion(
+                "scene",  # 텍스트용 모델
+                messages,
+                limits=partial(llm_limits, deadline, "handwriting_scene_description", retries=2),
             )
             
             return response.choices[0].message.content
@@ -225,6 +248,8 @@ Please create a detailed scene description for animating the concepts found in t
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
+        if isinstance(e, litellm.Timeout):
+            check_timeout(deadline, "handwriting_scene_description")
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to process handwritten content: {str(e)}"
@@ -235,6 +260,7 @@ def process_pdf_with_images(
     file_content: bytes,
     model: str = os.getenv("PDF_SCENE_GEN_MODEL"),
     retry: bool = False,
+    deadline: Optional[Deadline] = None,
 ) -> str:
     """Process a PDF file by converting to images and generate a scene description.
 
@@ -242,6 +268,7 @@ def process_pdf_with_images(
         file_content: Raw PDF file bytes
         model: LLM model to use for processing. Defaults to env PDF_SCENE_GEN_MODEL
         retry: Whether this is a retry attempt and should it use the PDF_RETRY_MODEL
+        deadline: Request deadline bounding the model call(s)
 
     Returns:
         str: Generated scene description
@@ -280,14 +307,23 @@ def process_pdf_with_images(
             },
         ]
 
-        response = litellm.completion(
+        response = stage_completion(
+            "pdf",
+            messages,
             model=model,
-            messages=messages,
+            local=not retry,
+            limits=partial(llm_limits, deadline, "pdf_scene_description"),
         )
         return response.choices[0].message.content
 
+    except DeadlineExceeded:
+        raise
     except Exception as e:
+        if isinstance(e, litellm.Timeout):
+            check_timeout(deadline, "pdf_scene_description")
         retry_model = os.getenv("PDF_RETRY_MODEL")
         if not retry and retry_model:
-            return process_pdf_with_images(file_content, model=retry_model, retry=True)
+            return process_pdf_with_images(
+                file_content, model=retry_model, retry=True, deadline=deadline
+            )
         raise HTTPException(status_code=500, detail=f"Failed to process PDF: {str(e)}")
@@ -0,0 +1,203 @@
+"""Curated, pre-validated Manim building blocks used as retrieval context for code generation.
+
+Every snippet targets the pinned Manim Community version below and only uses
+public APIs that exist in that release. When bumping Manim, re-render each
+snippet and update MANIM_SNIPPETS_VERSION.
+"""
+
+MANIM_SNIPPETS_VERSION = "0.18.1"
+
+FACTORING_TRANSFORM_SNIPPET = {
+    "name": "factoring_transform",
+    "title": "Step-by-step factoring with TransformMatchingTex",
+    "tags": [
+        "factor", "factoring", "factorization", "polynomial", "quadratic",
+        "expand", "simplify", "algebra", "equation", "roots", "transform",
+    ],
+    "code": r"""class FactoringSteps(Scene):
+    def construct(self):
+        steps = [
+            MathTex("x^2", "+", "5x", "+", "6"),
+            MathTex("x^2", "+", "2x", "+", "3x", "+", "6"),
+            MathTex("x", "(x + 2)", "+", "3", "(x + 2)"),
+            MathTex("(x + 2)", "(x + 3)"),
+        ]
+        current = steps[0]
+        self.play(Write(current))
+        self.wait(1)
+        for step in steps[1:]:
+            self.play(TransformMatchingTex(current, step))
+            self.wait(1)
+            current = step
+
+        # Highlight the result, then clean up before the next section
+        box = SurroundingRectangle(current, color=YELLOW, buff=0.2)
+        self.play(Create(box))
+        self.wait(1)
+        self.play(FadeOut(*self.mobjects))""",
+}
+
+AXES_PLOT_SNIPPET = {
+    "name": "axes_plot",
+    "title": "Plotting functions on Axes with labels",
+    "tags": [
+        "graph", "plot", "axes", "function", "curve", "coordinate", "parabola",
+        "sine", "cosine", "activation", "relu", "sigmoid", "derivative", "tangent",
+    ],
+    "code": r"""class FunctionPlot(Scene):
+    def construct(self):
+        axes = Axes(
+            x_range=[-3, 3, 1],
+            y_range=[-1, 9, 2],
+            x_length=7,
+            y_length=5,
+            axis_config={"include_numbers": True, "font_size": 24},
+        ).to_edge(DOWN, buff=0.5)
+        labels = axes.get_axis_labels(x_label="x", y_label="f(x)")
+
+        graph = axes.plot(lambda x: x**2, x_range=[-3, 3], color=BLUE)
+        graph_label = axes.get_graph_label(graph, label=MathTex("x^2"), x_val=2, direction=UR)
+
+        self.play(Create(axes), Write(labels))
+        self.play(Create(graph), Write(graph_label), run_time=2)
+
+        # Move a dot along the curve
+        tracker = ValueTracker(-2)
+        dot = always_redraw(lambda: Dot(axes.c2p(tracker.get_value(), tracker.get_value() ** 2), color=YELLOW))
+        self.play(FadeIn(dot))
+        self.play(tracker.animate.set_value(2), run_time=3)
+        self.wait(1)
+        self.play(FadeOut(*self.mobjects))""",
+}
+
+NEURAL_NETWORK_LAYERS_SNIPPET = {
+    "name": "neural_network_layers",
+    "title": "Neural network layer diagram with connections",
+    "tags": [
+        "neural", "network", "layer", "layers", "neuron", "neurons", "deep",
+        "learning", "perceptron", "backpropagation", "weights", "cnn", "mlp",
+    ],
+    "code": r"""class NeuralNetworkLayers(Scene):
+    def construct(self):
+        input_layer = self.create_layer(3, "Input", BLUE)
+        hidden_layer = self.create_layer(4, "Hidden", GREEN)
+        output_layer = self.create_layer(2, "Output", RED)
+        layers = VGroup(input_layer, hidden_layer, output_layer).arrange(RIGHT, buff=2)
+
+        connections = VGroup(
+            self.create_connections(input_layer, hidden_layer),
+            self.create_connections(hidden_layer, output_layer),
+        )
+        self.play(Create(layers))
+        self.play(Create(connections), run_time=2)
+        self.wait(1)
+        self.play(FadeOut(*self.mobjects))
+
+    def create_layer(self, num_neurons, label, color):
+        neurons = VGroup(*[Circle(radius=0.3, color=color) for _ in range(num_neurons)])
+        neurons.arrange(DOWN, buff=0.5)
+        layer_label = Text(label, font_size=20).next_to(neurons, UP)
+        return VGroup(neurons, layer_label)
+
+    def create_connections(self, layer1, layer2):
+        connections = VGroup()
+        for neuron1 in layer1[0]:
+            for neuron2 in layer2[0]:
+                connections.add(Line(neuron1.get_right(), neuron2.get_left(), stroke_width=1))
+        return connections""",
+}
+
+MATHTEX_DERIVATION_SNIPPET = {
+    "name": "mathtex_derivation",
+    "title": "Stacked MathTex derivation revealed line by line",
+    "tags": [
+        "derivation", "derive", "proof", "formula", "equation", "solve",
+        "mathtex", "latex", "step", "steps", "integral", "calculus", "identity",
+    ],
+    "code": r"""class Derivation(Scene):
+    def construct(self):
+        title = Text("Completing the Square", font_size=36).to_edge(UP)
+        lines = VGroup(
+            MathTex(r"ax^2 + bx + c = 0"),
+            MathTex(r"x^2 + \frac{b}{a}x = -\frac{c}{a}"),
+            MathTex(r"\left(x + \frac{b}{2a}\right)^2 = \frac{b^2 - 4ac}{4a^2}"),
+            MathTex(r"x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}"),
+        ).arrange(DOWN, aligned_edge=LEFT, buff=0.4)
+        lines.next_to(title, DOWN, buff=0.5)
+
+        self.play(Write(title))
+        for line in lines:
+            self.play(Write(line))
+            self.wait(1)
+
+        self.play(Indicate(lines[-1], color=YELLOW))
+        self.wait(1)
+        self.play(FadeOut(*self.mobjects))""",
+}
+
+SECTIONED_SCENE_SNIPPET = {
+    "name": "sectioned_scene",
+    "title": "Scene split into helper methods with full cleanup between sections",
+    "tags": [
+        "explain", "explanation", "introduction", "overview", "concept",
+        "sections", "structure", "title", "transition", "cleanup",
+    ],
+    "code": r"""class TopicExplanation(Scene):
+    def construct(self):
+        self.show_title("Topic Overview")
+        self.explain_first_idea()
+        self.explain_second_idea()
+
+    def show_title(self, text):
+        title = Text(text, font_size=40, color=BLUE)
+        self.play(Write(title))
+        self.wait(1)
+        self.play(FadeOut(title))
+
+    def explain_first_idea(self):
+        heading = Text("First Idea", font_size=32).to_edge(UP)
+        body = Text("One short sentence per line", font_size=24).next_to(heading, DOWN, buff=0.6)
+        self.play(Write(heading), FadeIn(body, shift=UP))
+        self.wait(2)
+        self.play(FadeOut(*self.mobjects))
+
+    def explain_second_idea(self):
+        heading = Text("Second Idea", font_size=32).to_edge(UP)
+        shapes = VGroup(Square(), Circle(), Triangle()).arrange(RIGHT, buff=1)
+        self.play(Write(heading), Create(shapes))
+        self.wait(2)
+        self.play(FadeOut(*self.mobjects))""",
+}
+
+VECTOR_MATRIX_SNIPPET = {
+    "name": "vector_matrix",
+    "title": "Vectors on a NumberPlane and a matrix transformation",
+    "tags": [
+        "vector", "vectors", "matrix", "linear", "transformation", "plane",
+        "grid", "eigen", "eigenvector", "basis", "rotation", "svm", "fourier",
+    ],
+    "code": r"""class VectorTransform(Scene):
+    def construct(self):
+        plane = NumberPlane(x_range=[-7, 7], y_range=[-4, 4])
+        vector = Arrow(plane.c2p(0, 0), plane.c2p(2, 1), buff=0, color=YELLOW)
+        matrix = Matrix([[1, 1], [0, 1]]).scale(0.7).to_corner(UL)
+        matrix.add_background_rectangle()
+
+        self.play(Create(plane), GrowArrow(vector))
+        self.play(Write(matrix))
+        self.play(
+            ApplyMatrix([[1, 1], [0, 1]], VGroup(plane, vector)),
+            run_time=2,
+        )
+        self.wait(1)
+        self.play(FadeOut(*self.mobjects))""",
+}
+
+MANIM_SNIPPETS = [
+    FACTORING_TRANSFORM_SNIPPET,
+    AXES_PLOT_SNIPPET,
+    NEURAL_NETWORK_LAYERS_SNIPPET,
+    MATHTEX_DERIVATION_SNIPPET,
+    SECTIONED_SCENE_SNIPPET,
+    VECTOR_MATRIX_SNIPPET,
+]
@@ -1,12 +1,23 @@
 import gradio as gr
-import re
+import base64
+import os
 from importlib import resources
 from typing import Tuple, Optional, Dict
 import functools
+import inspect
 
 from manimator.api.animation_generation import generate_animation_response
 from manimator.api.scene_description import process_prompt_scene, process_pdf_prompt, process_handwriting_prompt
 from manimator.utils.schema import ManimProcessor
+from manimator.utils.deadline import Deadline, DeadlineExceeded
+from manimator.utils.llm_client import stage_completion
+from manimator.utils.multi_scene import dry_run_scenes, render_scenes_joined, scenes_to_render
+from manimator.utils.progressive import upgrade_in_background
+
+# 1이면 자동 모드에서 프리뷰 영상을 먼저 보여주고 고화질 렌더가 끝나면 교체
+RENDER_PROGRESSIVE = os.getenv("RENDER_PROGRESSIVE", "0") == "1"
+# 1이면 자동 모드에서 본 렌더 전에 construct()만 실행해 런타임 오류를 먼저 확인
+RENDER_DRY_RUN = os.getenv("RENDER_DRY_RUN", "1") == "1"
 
 
 # 편집 가능한 파이프라인 함수들
@@ -29,17 +40,33 @@ def process_with_editing(prompt: str, edit_mode: bool, state: dict):
     except Exception as e:
         return None, None, f"처리 중 오류: {str(e)}"
 
-def process_prompt_auto(prompt: str):
-    """자동 모드 - 기존 로직 유지"""
+def process_prompt_auto(
+    prompt: str, deadline: Optional[Deadline] = None, quality: Optional[str] = None
+):
+    """자동 모드 - 기존 로직 유지
+
+    deadline이 없으면 REQUEST_DEADLINE_SECONDS 기준으로 새로 만들고,
+    재시도를 포함한 전체 파이프라인이 같은 예산을 공유합니다.
+    quality는 렌더 품질 프로필 이름입니다 (없으면 RENDER_QUALITY).
+    """
     max_attempts = 2
     attempts = 0
+    if deadline is None:
+        deadline = Deadline.from_env()
+    # 코드 생성 단계 실패(스트림 중단 포함) 시에는 스토리보드를 재사용해 바로 재시도
+    scene_description = None
+    # 정적 검증에서 거부된 코드의 오류 목록, 다음 시도의 코드 생성에 전달
+    repair_note = ""
 
     while attempts < max_attempts:
         try:
             processor = ManimProcessor()
             with processor.create_temp_dir() as temp_dir:
-                scene_description = process_prompt_scene(prompt)
-                response = generate_animation_response(scene_description)
+                if scene_description is None:
+                    scene_description = process_prompt_scene(prompt, deadline=deadline)
+                response = generate_animation_response(
+                    scene_description + repair_note, deadline=deadline
+                )
                 code = processor.extract_code(response)
 
                 if not code:
@@ -52,28 +79,108 @@ def process_prompt_auto(prompt: str):
                         "No valid Manim code generated after multiple attempts",
                     )
 
-                class_match = re.search(r"class (\w+)\(Scene\)", code)
-                if not class_match:
+                validation = processor.validate_code(code)
+                if not validation.ok:
                     attempts += 1
                     if attempts < max_attempts:
+                        repair_note = (
+                            "\n\nThe previous code was rejected by static checks. "
+                            f"Fix these problems:\n{validation.summary()}"
+                        )
                         continue
-                    return None, None, "No Scene class found after multiple attempts"
+                    return None, code, f"Code validation failed:\n{validation.summary()}"
 
-                scene_name = class_match.group(1)
+                # 코드에 장면 클래스가 여러 개면 모두 병렬로 렌더링해 하나로 이어 붙임
+                scene_names = scenes_to_render(code)
                 scene_file = processor.save_code(code, temp_dir)
-                video_path = processor.render_scene(scene_file, scene_name, temp_dir)
+                if RENDER_DRY_RUN:
+                    # 수 초 안에 끝나는 드라이런으로 런타임 오류를 본 렌더 전에 걸러냄
+                    dry_run = dry_run_scenes(
+                        processor, scene_file, scene_names, temp_dir, deadline=deadline
+                    )
+                    if not dry_run.ok:
+                        attempts += 1
+                        if attempts < max_attempts:
+                            repair_note = (
+                                "\n\nThe previous code failed when its construct() ran. "
+                                f"Fix this error:\n{dry_run.summary()}"
+                            )
+                            continue
+                        return None, code, f"Dry run failed:\n{dry_run.summary()}"
+                    if dry_run.layout and attempts + 1 < max_attempts:
+                        # 레이아웃 문제는 치명적이지 않으므로 재시도가 남아 있을 때만 재생성
+                        attempts += 1
+                        repair_note = (
+                            "\n\nThe previous code had layout problems (overlapping or off-screen "
+                            f"objects). Fix them:\n{dry_run.layout_summary()}"
+                        )
+                        continue
+                if len(scene_names) > 1:
+                    video_path = render_scenes_joined(
+                        processor, scene_file, scene_names, temp_dir, deadline, quality
+                    )
+                else:
+                    video_path = processor.render_scene(
+                        scene_file, scene_names[0], temp_dir, deadline=deadline, quality=quality
+                    )
 
                 if not video_path:
                     return None, None, "Failed to render animation"
 
                 return video_path, code, "Animation generated successfully!"
 
+        except DeadlineExceeded as e:
+            # 남은 예산이 없으므로 재시도하지 않고 바로 실패
+            return None, None, e.detail
         except Exception as e:
             attempts += 1
             if attempts < max_attempts:
                 continue
             return None, None, f"Error after multiple attempts: {str(e)}"
 
+def process_prompt_progressive(prompt: str, deadline: Optional[Deadline] = None):
+    """점진적 자동 모드 - 프리뷰 결과를 먼저 내보내고, 고화질 렌더가 끝나면 다시 내보냅니다"""
+    video, code, message = process_prompt_auto(prompt, deadline, quality="preview")
+    if not video:
+        yield video, code, message
+        return
+
+    yield video, code, "프리뷰 생성 완료 - 고화질 렌더링 중..."
+    scene_names = scenes_to_render(code)
+    render = upgrade_in_background(
+        video, code, scene_names if len(scene_names) > 1 else scene_names[0]
+    )
+    render.wait()
+    if render.error:
+        yield video, code, f"고화질 렌더링 실패 (프리뷰 유지): {render.error}"
+    else:
+        yield render.artifact_path, code, message
+
+
+def process_code_previews(code: str):
+    """생성된 코드로 전체 렌더 없이 키프레임 미리보기(컨택트 시트, 저fps 루프)를 만듭니다"""
+    if not code:
+        return None, None, "미리볼 코드가 없습니다"
+    try:
+        processor = ManimProcessor()
+        validation = processor.validate_code(code)
+        if not validation.ok:
+            return None, None, f"코드 검증 실패:\n{validation.summary()}"
+        with processor.create_temp_dir() as temp_dir:
+            scene_file = processor.save_code(code, temp_dir)
+            result = dry_run_scenes(
+                processor, scene_file, scenes_to_render(code), temp_dir, previews=True
+            )
+        if not result.ok:
+            return None, None, f"드라이런 실패:\n{result.summary()}"
+        message = f"미리보기 완료: 애니메이션 {result.animations}개, {result.duration:.1f}초"
+        if result.layout:
+            message += f"\n레이아웃 문제:\n{result.layout_summary()}"
+        return result.previews.get("contact_sheet"), result.previews.get("loop"), message
+    except Exception as e:
+        return None, None, f"미리보기 오류: {str(e)}"
+
+
 def process_prompt(prompt: str):
     """기존 호환성을 위한 래퍼 함수"""
     return process_prompt_auto(prompt)
@@ -148,12 +255,10 @@ def process_handwriting_recognition_only(file_bytes: bytes) -> str:
             },
         ]
         
-        import litellm
-        import os
-        import base64
-        response = litellm.completion(
+        response = stage_completion(
+            "pdf",
+            messages,
             model=os.getenv("PDF_SCENE_GEN_MODEL", "gpt-4o"),
-            messages=messages,
             num_retries=2,
         )
         
@@ -183,8 +288,9 @@ def process_handwriting_with_editing(file_path: str, edit_mode: bool, state: dic
             return None, None, "편집 모드: 1단계 - 손글씨 인식 결과 편집이 필요합니다"
         else:
             # 자동 모드: 기존 파이프라인 그대로
-            scene_description = process_handwriting_prompt(file_bytes)
-            return process_prompt_auto(scene_description)
+            deadline = Deadline.from_env()
+            scene_description = process_handwriting_prompt(file_bytes, deadline=deadline)
+            return process_prompt_auto(scene_description, deadline)
             
     except Exception as e:
         return None, None, f"손글씨 처리 중 오류: {str(e)}"
@@ -273,11 +379,11 @@ def process_step3_edit(edited_content: str, state: dict):
         # 코드 렌더링
         processor = ManimProcessor()
         with processor.create_temp_dir() as temp_dir:
-            class_match = re.search(r"class (\w+)\(Scene\)", edited_content)
-            if not class_match:
-                return False, None, "Scene 클래스를 찾을 수 없습니다"
+            validation = processor.validate_code(edited_content)
+            if not validation.ok:
+                return False, None, f"코드 검증 실패:\n{validation.summary()}"
             
-            scene_name = class_match.group(1)
+            scene_name = validation.scenes[0]
             scene_file = processor.save_code(edited_content, temp_dir)
             video_path = processor.render_scene(scene_file, scene_name, temp_dir)
             
@@ -410,6 +516,13 @@ with gr.Blocks(title="manimator") as demo:
                 label="Status", interactive=False, show_copy_button=True
             )
 
+            # 전체 렌더를 기다리지 않고 레이아웃만 빠르게 확인
+            with gr.Accordion("🔍 빠른 미리보기", open=False):
+                preview_button = gr.Button("생성된 코드로 미리보기 만들기")
+                with gr.Row():
+                    preview_sheet = gr.Image(label="키프레임 컨택트 시트", type="filepath")
+                    preview_loop = gr.Image(label="미리보기 루프", type="filepath")
+
         with gr.TabItem("📄 PDF Upload"):
             with gr.Column():
                 file_input = gr.File(label="Upload a PDF paper", file_types=[".pdf"])
@@ -482,6 +595,31 @@ with gr.Blocks(title="manimator") as demo:
                 outputs=[sample_video, sample_markdown],
             )
 
+    def as_generator(handler):
+        """핸들러를 제너레이터로 감싸 점진적 결과(프리뷰 → 고화질)를 순서대로 내보냅니다"""
+        @functools.wraps(handler)
+        def wrapper(*args):
+            result = handler(*args)
+            if inspect.isgenerator(result):
+                yield from result
+            else:
+                yield result
+        return wrapper
+
+    def auto_outputs(prompt, deadline=None):
+        """자동 모드 결과를 모달 출력 형식으로 변환 (RENDER_PROGRESSIVE면 단계별 제너레이터)"""
+        def outputs(video, code, message):
+            return (
+                gr.Modal(visible=False),  # 모달 닫기
+                gr.Markdown("### 자동 생성 완료"),
+                "",  # 편집 내용 초기화
+                video, code, message
+            )
+
+        if RENDER_PROGRESSIVE:
+            return (outputs(*result) for result in process_prompt_progressive(prompt, deadline))
+        return outputs(*process_prompt_auto(prompt, deadline))
+
     # 모달 제어 및 편집 처리 함수들
     def handle_text_input(prompt, edit_mode, state):
         """텍스트 입력 처리"""
@@ -497,13 +635,7 @@ with gr.Blocks(title="manimator") as demo:
             )
         else:
             # 자동 모드 - 기존 로직 사용
-            video, code, message = process_prompt_auto(prompt)
-            return (
-                gr.Modal(visible=False),  # 모달 닫기
-                gr.Markdown("### 자동 생성 완료"),
-                "",  # 편집 내용 초기화
-                video, code, message
-            )
+            return auto_outputs(prompt)
 
     def handle_pdf_input(pdf_file, edit_mode, state):
         """PDF 입력 처리"""
@@ -516,9 +648,10 @@ with gr.Blocks(title="manimator") as demo:
             )
         
         try:
+            deadline = Deadline.from_env()
             with open(pdf_file, "rb") as f:
                 file_bytes = f.read()
-                scene_description = process_pdf_prompt(file_bytes)
+                scene_description = process_pdf_prompt(file_bytes, deadline=deadline)
             
             if edit_mode:
                 state["step1_output"] = scene_description
@@ -532,13 +665,7 @@ with gr.Blocks(title="manimator") as demo:
                 )
             else:
                 # 자동 모드
-                video, code, message = process_prompt_auto(scene_description)
-                return (
-                    gr.Modal(visible=False),
-                    gr.Markdown("### 자동 생성 완료"),
-                    "",
-                    video, code, message
-                )
+                return auto_outputs(scene_description, deadline)
         except Exception as e:
             return (
                 gr.Modal(visible=False),
@@ -575,14 +702,9 @@ with gr.Blocks(title="manimator") as demo:
                 )
             else:
                 # 자동 모드: 기존 파이프라인 그대로
-                scene_description = process_handwriting_prompt(file_bytes)
-                video, code, message = process_prompt_auto(scene_description)
-                return (
-                    gr.Modal(visible=False),
-                    gr.Markdown("### 자동 생성 완료"),
-                    "",
-                    video, code, message
-                )
+                deadline = Deadline.from_env()
+                scene_description = process_handwriting_prompt(file_bytes, deadline=deadline)
+                return auto_outputs(scene_description, deadline)
         except Exception as e:
             return (
                 gr.Modal(visible=False),
@@ -631,16 +753,16 @@ with gr.Blocks(title="manimator") as demo:
                 state["step3_output"] = edited_content
                 processor = ManimProcessor()
                 with processor.create_temp_dir() as temp_dir:
-                    class_match = re.search(r"class (\w+)\(Scene\)", edited_content)
-                    if not class_match:
+                    validation = processor.validate_code(edited_content)
+                    if not validation.ok:
                         return (
                             gr.Modal(visible=True),
                             gr.Markdown("### 오류"),
                             edited_content,
-                            None, None, "Scene 클래스를 찾을 수 없습니다"
+                            None, None, f"코드 검증 실패:\n{validation.summary()}"
                         )
                     
-                    scene_name = class_match.group(1)
+                    scene_name = validation.scenes[0]
                     scene_file = processor.save_code(edited_content, temp_dir)
                     video_path = processor.render_scene(scene_file, scene_name, temp_dir)
                     
@@ -702,19 +824,25 @@ with gr.Blocks(title="manimator") as demo:
 
     # 이벤트 바인딩
     text_button.click(
-        fn=handle_text_input,
+        fn=as_generator(handle_text_input),
         inputs=[text_input, text_edit_mode, session_state],
         outputs=[edit_modal, edit_step_title, edit_content, video_output, code_output, status_output]
     )
     
+    preview_button.click(
+        fn=process_code_previews,
+        inputs=[code_output],
+        outputs=[preview_sheet, preview_loop, status_output]
+    )
+
     pdf_button.click(
-        fn=handle_pdf_input,
+        fn=as_generator(handle_pdf_input),
         inputs=[file_input, pdf_edit_mode, session_state],
         outputs=[edit_modal, edit_step_title, edit_content, pdf_video_output, pdf_code_output, pdf_status_output]
     )
     
     handwriting_button.click(
-        fn=handle_handwriting_input,
+        fn=as_generator(handle_handwriting_input),
         inputs=[handwriting_input, handwriting_edit_mode, session_state],
         outputs=[edit_modal, edit_step_title, edit_content, handwriting_video_output, handwriting_code_output, handwriting_status_output]
     )
@@ -1,21 +1,76 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
+from fastapi import FastAPI, Header, HTTPException, File, UploadFile
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-import re
+import logging
+import os
+from dataclasses import asdict
+from typing import Dict, Optional
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from manimator.utils.schema import ManimProcessor
 from manimator.utils.helpers import download_arxiv_pdf
+from manimator.utils.deadline import Deadline
+from manimator.utils.estimator import estimate_render
+from manimator.utils.artifacts import artifact_dir, handoff_stats, new_artifact_path
+from manimator.utils.multi_scene import (
+    dry_run_scenes,
+    render_scenes,
+    render_scenes_joined,
+    resolve_scene_mode,
+    scenes_to_render,
+)
+from manimator.utils.load_policy import get_load_policy, get_rerender_queue
+from manimator.utils.render_farm import get_render_queue, submit_farm_render
+from manimator.utils.scheduler import get_render_scheduler
+from manimator.utils.progressive import get_progressive_render, render_progressive
+from manimator.utils.streaming import get_streaming_render, start_streaming_render
+from manimator.utils.tex_cache import tex_cache_stats
+from manimator.utils.workspace import get_workspace_pool
 from manimator.api.animation_generation import generate_animation_response
 from manimator.api.scene_description import process_prompt_scene, process_pdf_prompt, process_handwriting_prompt
 
 
 load_dotenv('config/.env')
 
+logger = logging.getLogger(__name__)
+
+
+ARTIFACT_MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+STREAM_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".mp4": "video/mp4",
+}
+
+
+def artifact_urls(paths: Dict[str, str]) -> Dict[str, str]:
+    """/artifacts URLs of files in the artifact store, by the same keys"""
+    return {key: f"/artifacts/{os.path.basename(path)}" for key, path in paths.items()}
+
 
 class PromptRequest(BaseModel):
     prompt: str
+    prompt_profile: Optional[str] = None
+    quality: Optional[str] = None
+    progressive: bool = False
+    parallel_sections: Optional[bool] = None
+    dry_run: Optional[bool] = None
+    scenes: Optional[str] = None
+    previews: Optional[bool] = None
+    stream: bool = False
+
+
+class CodeRequest(BaseModel):
+    code: str
+    scenes: Optional[str] = None
+    quality: Optional[str] = None
 
 
 app = FastAPI()
@@ -38,8 +93,10 @@ async def health_check():
 async def generate_pdf_scene(file: UploadFile = File(...)):
     try:
         content = await file.read()
-        scene_description = process_pdf_prompt(content)
+        scene_description = process_pdf_prompt(content, deadline=Deadline.from_env())
         return {"scene_description": scene_description}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -57,7 +114,7 @@ async def generate_handwriting_scene(file: UploadFile = File(...)):
             )
         
         content = await file.read()
-        scene_description = process_handwriting_prompt(content)
+        scene_description = process_handwriting_prompt(content, deadline=Deadline.from_env())
         return {"scene_description": scene_description}
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -69,7 +126,13 @@ async def generate_handwriting_scene(file: UploadFile = File(...)):
 @app.post("/generate-prompt-scene")
 async def generate_prompt_scene(request: PromptRequest):
     try:
-        return {"scene_description": process_prompt_scene(request.prompt)}
+        return {
+            "scene_description": process_prompt_scene(
+                request.prompt, deadline=Deadline.from_env()
+            )
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error generating scene descriptions: {str(e)}"
@@ -80,43 +143,441 @@ async def generate_prompt_scene(request: PromptRequest):
 async def process_arxiv_by_id(arxiv_id: str):
     """Process arxiv paper by ID"""
     try:
+        deadline = Deadline.from_env()
         arxiv_url = f"https://arxiv.org/pdf/{arxiv_id}"
-        pdf_content = download_arxiv_pdf(arxiv_url)
-        scene_description = process_pdf_prompt(pdf_content)
+        pdf_content = download_arxiv_pdf(arxiv_url, deadline=deadline)
+        scene_description = process_pdf_prompt(pdf_content, deadline=deadline)
         return {"scene_description": scene_description}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# The render endpoints block on renders, the farm database and model calls;
+# as plain functions FastAPI runs them in its threadpool, off the event loop
 @app.post("/generate-animation")
-async def generate_animation(request: PromptRequest):
+def generate_animation(
+    request: PromptRequest, x_premium_key: Optional[str] = Header(None)
+):
     processor = ManimProcessor()
+    deadline = Deadline.from_env()
 
     try:
         with processor.create_temp_dir() as temp_dir:
-            response = generate_animation_response(request.prompt)
+            response = generate_animation_response(
+                request.prompt, request.prompt_profile, deadline=deadline
+            )
             code = processor.extract_code(response)
             if not code:
                 raise HTTPException(
                     status_code=400, detail="No valid Manim code generated"
                 )
-            class_match = re.search(r"class (\w+)\(Scene\)", code)
-            if not class_match:
+            validation = processor.validate_code(code)
+            if not validation.ok:
                 raise HTTPException(
-                    status_code=400, detail="No Scene class found in code"
+                    status_code=422,
+                    detail={
+                        "error": "invalid_code",
+                        "diagnostics": [asdict(d) for d in validation.diagnostics],
+                    },
                 )
-            scene_name = class_match.group(1)
+            try:
+                scene_mode = resolve_scene_mode(request.scenes)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            scene_names = scenes_to_render(code, scene_mode)
+            # Under queue pressure new renders get a lower quality, fewer
+            # extras and, if overloaded, a shorter video
+            requested_scenes = scene_names
+            quality = request.quality
+            decision = None
+            policy = get_load_policy()
+            if policy is not None:
+                try:
+                    decision = policy.decide(
+                        code,
+                        scene_names,
+                        request.quality,
+                        premium=policy.is_premium(x_premium_key),
+                        extras=[
+                            name
+                            for name, asked in (
+                                ("stream", request.stream),
+                                ("progressive", request.progressive),
+                                ("previews", request.previews),
+                                ("parallel_sections", request.parallel_sections),
+                            )
+                            if asked
+                        ],
+                    )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                scene_names = decision.scene_names
+                quality = decision.quality
+            extras = decision is None or decision.extras
+            degraded = decision is not None and decision.degraded
+            video_degraded = degraded and decision.video_degraded
+            scene_name = scene_names[0]
             scene_file = processor.save_code(code, temp_dir)
-            video_path = processor.render_scene(scene_file, scene_name, temp_dir)
+            dry_run = request.dry_run
+            if dry_run is None:
+                dry_run = os.getenv("RENDER_DRY_RUN", "1") == "1"
+            layout_issues = 0
+            preview_headers = {}
+            if dry_run:
+                result = dry_run_scenes(
+                    processor,
+                    scene_file,
+                    scene_names,
+                    temp_dir,
+                    deadline=deadline,
+                    previews=request.previews if extras else False,
+                )
+                if not result.ok:
+                    # The traceback names server paths; clients get the summary
+                    logger.warning("Dry run failed:\n%s", result.error)
+                    raise HTTPException(
+                        status_code=422,
+                        detail={"error": "dry_run_failed", "message": result.summary()},
+                    )
+                layout_issues = len(result.layout)
+                preview_headers = {
+                    "X-Preview-" + kind.title().replace("_", "-"): url
+                    for kind, url in artifact_urls(result.previews).items()
+                }
+            if request.stream and extras:
+                stream = start_streaming_render(code, scene_names, quality=quality)
+                return {
+                    "stream_id": stream.stream_id,
+                    "playlist": f"/streams/{stream.stream_id}/index.m3u8",
+                    "status": f"/streams/{stream.stream_id}",
+                    "layout_issues": layout_issues,
+                    "previews": artifact_urls(result.previews) if dry_run else {},
+                    "degraded": decision.describe() if decision else None,
+                }
+            if request.progressive and extras and not video_degraded:
+                # A progressive render upgrades one video in place, so
+                # several scenes are always joined. A degraded video is
+                # upgraded by the re-render queue below instead
+                render = render_progressive(
+                    code,
+                    scene_names if len(scene_names) > 1 else scene_name,
+                    deadline=deadline,
+                    final_quality=request.quality,
+                )
+                if not render:
+                    raise HTTPException(
+                        status_code=500, detail="Failed to render animation"
+                    )
+                return FileResponse(
+                    render.artifact_path,
+                    media_type="video/mp4",
+                    headers={
+                        "X-Render-Id": render.render_id,
+                        "X-Render-Quality": render.quality,
+                        **preview_headers,
+                    },
+                )
+            if scene_mode == "playlist" and len(requested_scenes) > 1:
+                # A playlist cut down to one scene stays a playlist, so the
+                # dropped scenes keep their entries and upgrades
+                videos = render_scenes(
+                    processor,
+                    scene_file,
+                    scene_names,
+                    temp_dir,
+                    deadline,
+                    quality,
+                    frame_slice=decision.frame_slice if decision else None,
+                )
+                scenes = [
+                    {"scene": name, "video": f"/artifacts/{os.path.basename(video)}"}
+                    for name, video in zip(scene_names, videos)
+                ]
+                if video_degraded:
+                    # Each scene is re-rendered as requested; dropped scenes
+                    # are rendered into a reserved artifact path, playable
+                    # from their upgrade once it is done
+                    for name in decision.dropped_scenes:
+                        scenes.append({"scene": name, "video": None})
+                        videos.append(new_artifact_path())
+                    for scene, name, video in zip(scenes, requested_scenes, videos):
+                        upgrade = get_rerender_queue().add(video, code, name, decision)
+                        scene["upgrade"] = f"/renders/{upgrade.render_id}"
+                return {
+                    "scenes": scenes,
+                    "layout_issues": layout_issues,
+                    "previews": artifact_urls(result.previews) if dry_run else {},
+                    "degraded": decision.describe() if decision else None,
+                }
+            if len(scene_names) > 1:
+                video_path = render_scenes_joined(
+                    processor, scene_file, scene_names, temp_dir, deadline, quality
+                )
+            else:
+                video_path = processor.render_scene(
+                    scene_file,
+                    scene_name,
+                    temp_dir,
+                    deadline=deadline,
+                    quality=quality,
+                    sections=request.parallel_sections if extras else False,
+                    time_slices=None if extras else 0,
+                    frame_slice=decision.frame_slice if decision else None,
+                    planned=result if dry_run else None,
+                )
             if not video_path:
                 raise HTTPException(
                     status_code=500, detail="Failed to render animation"
                 )
-            return FileResponse(video_path, media_type="video/mp4")
+            degraded_headers = decision.headers() if degraded else {}
+            if video_degraded:
+                # Re-rendered as requested, into the same artifact, once load drops
+                upgrade = get_rerender_queue().add(
+                    video_path,
+                    code,
+                    requested_scenes if len(requested_scenes) > 1 else requested_scenes[0],
+                    decision,
+                )
+                degraded_headers["X-Render-Upgrade-Id"] = upgrade.render_id
+            return FileResponse(
+                video_path,
+                media_type="video/mp4",
+                headers={
+                    "X-Render-Bytes-Copied": str(processor.bytes_copied),
+                    "X-Layout-Issues": str(layout_issues),
+                    **preview_headers,
+                    **degraded_headers,
+                },
+            )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/preview-animation")
+def preview_animation(request: CodeRequest):
+    """Poster frame, keyframe contact sheet and GIF/WebP loop of Manim code, without a full render"""
+    processor = ManimProcessor()
+    deadline = Deadline.from_env()
+
+    try:
+        with processor.create_temp_dir() as temp_dir:
+            validation = processor.validate_code(request.code)
+            if not validation.ok:
+                raise HTTPException(
+                    status_code=422,
+                    detail={
+                        "error": "invalid_code",
+                        "diagnostics": [asdict(d) for d in validation.diagnostics],
+                    },
+                )
+            try:
+                scene_names = scenes_to_render(request.code, request.scenes)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            scene_file = processor.save_code(request.code, temp_dir)
+            result = dry_run_scenes(
+                processor, scene_file, scene_names, temp_dir, deadline=deadline, previews=True
+            )
+            if not result.ok:
+                logger.warning("Dry run failed:\n%s", result.error)
+                raise HTTPException(
+                    status_code=422,
+                    detail={"error": "dry_run_failed", "message": result.summary()},
+                )
+            return {
+                "duration": result.duration,
+                "animations": result.animations,
+                "layout": [asdict(issue) for issue in result.layout],
+                "previews": artifact_urls(result.previews),
+            }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/estimate-render")
+def estimate_render_time(request: CodeRequest):
+    """Predicted render seconds of Manim code per quality profile, from its AST and past render timings"""
+    try:
+        scene_names = scenes_to_render(request.code, request.scenes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    estimate = estimate_render(request.code, scene_names)
+    if not estimate.scenes:
+        raise HTTPException(
+            status_code=422,
+            detail={"error": "no_scene", "message": "No renderable scene class found"},
+        )
+    return asdict(estimate)
+
+
+@app.post("/farm/jobs")
+def submit_farm_job(request: CodeRequest):
+    """Queues Manim code on the render farm (RENDER_FARM_DB); several scenes are joined"""
+    queue = get_render_queue()
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Render farm is not configured")
+    validation = ManimProcessor().validate_code(request.code)
+    if not validation.ok:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "invalid_code",
+                "diagnostics": [asdict(d) for d in validation.diagnostics],
+            },
+        )
+    try:
+        job = submit_farm_render(
+            queue, request.code, scenes_to_render(request.code, request.scenes), request.quality
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return farm_job_status(job.job_id)
+
+
+@app.get("/farm/jobs/{job_id}")
+def farm_job_status(job_id: str):
+    """Status of a render farm job; the video is served from /artifacts once done"""
+    queue = get_render_queue()
+    job = queue.get(job_id) if queue else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "node": job.node,
+        "cost": job.cost,
+        "video": f"/artifacts/{job.artifact}" if job.artifact else None,
+        "error": job.error,
+    }
+
+
+@app.get("/renders/{render_id}")
+async def progressive_render_status(render_id: str):
+    """Status of a progressive render started by /generate-animation"""
+    render = get_progressive_render(render_id)
+    if not render:
+        raise HTTPException(status_code=404, detail="Unknown render id")
+    return {
+        "render_id": render.render_id,
+        "quality": render.quality,
+        "final_quality": render.final_quality,
+        "done": render.done,
+        "error": render.error,
+    }
+
+
+@app.get("/renders/{render_id}/video")
+async def progressive_render_video(render_id: str):
+    """Current artifact of a progressive render (preview until the upgrade lands)"""
+    render = get_progressive_render(render_id)
+    if not render:
+        raise HTTPException(status_code=404, detail="Unknown render id")
+    if not os.path.exists(render.artifact_path):
+        # A scene dropped under load has no video until its re-render is done
+        raise HTTPException(status_code=404, detail="Video not rendered yet")
+    return FileResponse(
+        render.artifact_path,
+        media_type="video/mp4",
+        headers={"X-Render-Quality": render.quality},
+    )
+
+
+@app.get("/streams/{stream_id}")
+async def streaming_render_status(stream_id: str):
+    """Status of a streaming render started by /generate-animation"""
+    stream = get_streaming_render(stream_id)
+    if not stream:
+        raise HTTPException(status_code=404, detail="Unknown stream id")
+    return {
+        "stream_id": stream.stream_id,
+        "playlist": f"/streams/{stream.stream_id}/index.m3u8",
+        "video": f"/streams/{stream.stream_id}/video.mp4" if stream.video_path else None,
+        "done": stream.done,
+        "error": stream.error,
+    }
+
+
+@app.get("/streams/{stream_id}/{name}")
+async def streaming_render_file(stream_id: str, name: str):
+    """HLS playlist, a segment, or the final video of a streaming render"""
+    stream = get_streaming_render(stream_id)
+    media_type = STREAM_MEDIA_TYPES.get(os.path.splitext(name)[1])
+    if not stream or name != os.path.basename(name) or not media_type:
+        raise HTTPException(status_code=404, detail="Unknown stream file")
+    path = os.path.join(stream.directory, name)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Unknown stream file")
+    # The playlist grows until the render ends
+    headers = {"Cache-Control": "no-cache"} if name.endswith(".m3u8") else {}
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
+@app.get("/artifacts/{name}")
+async def artifact_file(name: str):
+    """A rendered video or preview image from the artifact store, e.g. one entry of a scene playlist"""
+    path = os.path.join(artifact_dir(), name)
+    media_type = ARTIFACT_MEDIA_TYPES.get(os.path.splitext(name)[1])
+    if name != os.path.basename(name) or not media_type or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Unknown artifact")
+    return FileResponse(path, media_type=media_type)
+
+
+@app.get("/cache/tex")
+async def tex_cache_metrics():
+    """Hit rate of the shared TeX → SVG cache across all render processes"""
+    return tex_cache_stats()
+
+
+@app.get("/metrics/artifacts")
+async def artifact_handoff_metrics():
+    """Rendered video handoffs and the bytes they copied (0 when zero-copy)"""
+    return handoff_stats()
+
+
+@app.get("/metrics/scheduler")
+async def render_scheduler_metrics():
+    """Busy render slots and the renders waiting for one, with their predicted cost"""
+    return get_render_scheduler().stats()
+
+
+@app.get("/metrics/farm")
+async def render_farm_metrics():
+    """Render farm nodes with their queued and running jobs"""
+    queue = get_render_queue()
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Render farm is not configured")
+    return queue.stats()
+
+
+@app.get("/metrics/load")
+async def render_load_metrics():
+    """Render queue pressure, the degradation level new renders get, and pending full-quality re-renders"""
+    policy = get_load_policy()
+    if policy is None:
+        raise HTTPException(status_code=503, detail="Load-aware degradation is disabled")
+    stats = get_render_scheduler().stats()
+    return {
+        "pressure": round(policy.pressure(stats), 2),
+        "level": policy.level(stats),
+        "rerenders": get_rerender_queue().stats(),
+    }
+
+
+@app.get("/metrics/workspaces")
+async def render_workspace_metrics():
+    """Renders that got a pooled (RAM-backed) workspace versus a directory on disk, and the quota in use"""
+    pool = get_workspace_pool()
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Render workspace pool is disabled")
+    return {**pool.stats, "reserved_mb": round(pool.reserved_bytes / (1024 * 1024), 1)}
+
+
 def main():
     import uvicorn
 
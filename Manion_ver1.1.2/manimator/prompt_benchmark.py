@@ -0,0 +1,251 @@
+"""A/B benchmark of the code generation prompt profiles.
+
+Runs a fixed corpus of scene descriptions through each prompt profile and
+reports prompt tokens, completion latency, code extraction success and
+dry-run render success.
+
+Usage:
+    poetry run prompt-benchmark --backend stub
+    poetry run prompt-benchmark --backend live --record outputs/prompt_recording.jsonl
+    poetry run prompt-benchmark --backend recorded --recording outputs/prompt_recording.jsonl
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import litellm
+from dotenv import load_dotenv
+
+from manimator.api.animation_generation import build_code_messages
+from manimator.few_shot.manim_snippets import SECTIONED_SCENE_SNIPPET
+from manimator.utils.schema import ManimProcessor
+from manimator.utils.snippet_index import retrieve_snippets
+from manimator.utils.system_prompts import MANIM_PROMPT_PROFILES
+from manimator.utils.validator import leaf_scene_classes, validate_code
+
+load_dotenv('config/.env')
+
+BENCHMARK_CORPUS = [
+    """*Topic*: Factoring Quadratic Equations
+*Key Points*:
+* Factoring x^2 + 5x + 6 into (x + 2)(x + 3)
+* Finding two numbers whose product is c and whose sum is b
+* Roots of the equation from the factored form
+*Visual Elements*:
+* Animate the expression splitting the middle term step by step
+* Highlight the common factor and the final product
+*Style*: Clean algebraic transformations with color-coded terms""",
+    """*Topic*: Neural Networks
+*Key Points*:
+* Neurons and layers
+* Weights and biases: z = w \\cdot x + b
+* Activation functions such as ReLU and sigmoid
+*Visual Elements*:
+* Show input, hidden and output layers with connections
+* Plot ReLU and sigmoid on axes
+*Style*: 3Blue1Brown style with smooth transitions""",
+    """*Topic*: Derivative as a Slope
+*Key Points*:
+* Secant lines approaching the tangent line
+* f'(x) = \\lim_{h \\to 0} \\frac{f(x+h) - f(x)}{h}
+* Derivative of x^2 is 2x
+*Visual Elements*:
+* Plot x^2 on axes and move a tangent line along the curve
+* Animate h shrinking to zero
+*Style*: Geometric, minimal colors""",
+    """*Topic*: Quadratic Formula
+*Key Points*:
+* Completing the square on ax^2 + bx + c = 0
+* x = \\frac{-b \\pm \\sqrt{b^2 - 4ac}}{2a}
+* The discriminant decides the number of real roots
+*Visual Elements*:
+* Derive the formula line by line with MathTex
+* Show parabolas with zero, one and two roots
+*Style*: Step-by-step derivation with highlighted terms""",
+    """*Topic*: Linear Transformations
+*Key Points*:
+* Matrices move basis vectors
+* Shear matrix [[1, 1], [0, 1]]
+* Determinant as area scaling
+*Visual Elements*:
+* Apply a matrix to a NumberPlane and a vector
+* Show the unit square changing area
+*Style*: Grid-based visuals in the 3Blue1Brown style""",
+]
+
+
+def stub_response(prompt: str) -> str:
+    """Builds a deterministic, well-formed model reply for a prompt.
+
+    Args:
+        prompt (str): Scene description
+
+    Returns:
+        str: Reply containing the best matching snippet as a python block
+    """
+
+    matches = retrieve_snippets(prompt, k=1)
+    snippet = matches[0] if matches else SECTIONED_SCENE_SNIPPET
+    return f"Here is the animation:\n\n```python\n{snippet['code']}\n```"
+
+
+def load_recording(path: str) -> Dict[tuple, Dict]:
+    """Loads recorded replies keyed by (profile, prompt)."""
+    recording = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recording[(entry["profile"], entry["prompt"])] = entry
+    return recording
+
+
+def count_prompt_tokens(messages: List[Dict], model: Optional[str]) -> int:
+    """Counts prompt tokens with litellm's tokenizer for the given model."""
+    try:
+        return litellm.token_counter(model=model or "gpt-4", messages=messages)
+    except Exception:
+        return sum(len(m["content"]) for m in messages) // 4
+
+
+def dry_run_render(code: str) -> Optional[bool]:
+    """Runs the code's construct() through ManimProcessor.dry_run, without rendering frames.
+
+    Returns:
+        Optional[bool]: Whether the scene constructed cleanly, or None if manim
+            is not installed
+    """
+
+    if importlib.util.find_spec("manim") is None:
+        return None
+    scenes = leaf_scene_classes(code)
+    if not scenes:
+        return False
+    processor = ManimProcessor()
+    with processor.create_temp_dir() as temp_dir:
+        scene_file = processor.save_code(code, temp_dir)
+        return processor.dry_run(scene_file, scenes[0], temp_dir).ok
+
+
+def run_case(
+    profile: str,
+    prompt: str,
+    backend: str,
+    model: Optional[str],
+    recording: Optional[Dict[tuple, Dict]],
+    render: bool,
+) -> Dict:
+    """Runs one corpus prompt through one profile and measures it."""
+    messages = build_code_messages(prompt, profile)
+    result = {
+        "profile": profile,
+        "prompt": prompt,
+        "prompt_tokens": count_prompt_tokens(messages, model),
+        "latency": None,
+        "response": None,
+        "extracted": False,
+        "valid": False,
+        "dry_run": None,
+    }
+
+    start = time.perf_counter()
+    if backend == "recorded":
+        entry = recording.get((profile, prompt))
+        if entry:
+            result["response"] = entry["response"]
+            result["latency"] = entry.get("latency")
+    else:
+        kwargs = {"mock_response": stub_response(prompt)} if backend == "stub" else {}
+        try:
+            response = litellm.completion(model=model or "gpt-4", messages=messages, **kwargs)
+            result["response"] = response.choices[0].message.content
+        except Exception as e:
+            print(f"   ❌ {profile}: completion failed: {e}")
+        result["latency"] = time.perf_counter() - start
+
+    code = ManimProcessor().extract_code(result["response"]) if result["response"] else None
+    result["extracted"] = code is not None
+    result["valid"] = code is not None and validate_code(code).ok
+    if code and render:
+        result["dry_run"] = dry_run_render(code)
+    return result
+
+
+def summarize(results: List[Dict]) -> Dict[str, Dict]:
+    """Aggregates per-case results into per-profile metrics."""
+    summary = {}
+    for profile in MANIM_PROMPT_PROFILES:
+        rows = [r for r in results if r["profile"] == profile]
+        if not rows:
+            continue
+        latencies = [r["latency"] for r in rows if r["latency"] is not None]
+        dry_runs = [r["dry_run"] for r in rows if r["dry_run"] is not None]
+        summary[profile] = {
+            "cases": len(rows),
+            "avg_prompt_tokens": sum(r["prompt_tokens"] for r in rows) / len(rows),
+            "avg_latency": sum(latencies) / len(latencies) if latencies else None,
+            "extraction_rate": sum(r["extracted"] for r in rows) / len(rows),
+            "valid_rate": sum(r["valid"] for r in rows) / len(rows),
+            "dry_run_rate": sum(dry_runs) / len(dry_runs) if dry_runs else None,
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Dict]) -> None:
+    """Prints the per-profile metrics as a table."""
+    def fmt(value, pattern):
+        return "n/a" if value is None else pattern.format(value)
+
+    print(f"{'profile':<10} {'cases':>5} {'prompt tok':>10} {'latency s':>10} {'extract':>8} {'valid':>8} {'dry-run':>8}")
+    for profile, row in summary.items():
+        print(
+            f"{profile:<10} {row['cases']:>5} {row['avg_prompt_tokens']:>10.0f} "
+            f"{fmt(row['avg_latency'], '{:.2f}'):>10} {fmt(row['extraction_rate'], '{:.0%}'):>8} "
+            f"{fmt(row['valid_rate'], '{:.0%}'):>8} {fmt(row['dry_run_rate'], '{:.0%}'):>8}"
+        )
+
+
+def main():
+    """Entry point for the prompt profile benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark code generation prompt profiles")
+    parser.add_argument("--backend", choices=["stub", "recorded", "live"], default="stub")
+    parser.add_argument("--profiles", nargs="+", default=list(MANIM_PROMPT_PROFILES))
+    parser.add_argument("--model", default=os.getenv("CODE_GEN_MODEL"))
+    parser.add_argument("--recording", help="JSONL file to replay with --backend recorded")
+    parser.add_argument("--record", help="JSONL file to write live/stub replies to")
+    parser.add_argument("--no-render", action="store_true", help="Skip the manim dry-run check")
+    parser.add_argument("--json", action="store_true", help="Print per-profile metrics as JSON")
+    args = parser.parse_args()
+
+    unknown = set(args.profiles) - set(MANIM_PROMPT_PROFILES)
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(sorted(unknown))}")
+    if args.backend == "recorded" and not args.recording:
+        parser.error("--backend recorded requires --recording")
+    recording = load_recording(args.recording) if args.recording else None
+
+    results = []
+    for profile in args.profiles:
+        for prompt in BENCHMARK_CORPUS:
+            results.append(
+                run_case(profile, prompt, args.backend, args.model, recording, not args.no_render)
+            )
+
+    if args.record:
+        with open(args.record, "w") as f:
+            for r in results:
+                f.write(json.dumps({k: r[k] for k in ("profile", "prompt", "response", "latency")}) + "\n")
+
+    summary = summarize(results)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
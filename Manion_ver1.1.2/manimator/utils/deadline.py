@@ -0,0 +1,164 @@
+"""End-to-end request deadlines shared by every pipeline stage."""
+
+import os
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+
+# Below this many seconds a stage is not started at all: no model call or
+# render finishes in that time, so failing immediately is cheaper.
+MIN_STAGE_SECONDS = 1.0
+
+
+class DeadlineExceeded(HTTPException):
+    """Raised when a pipeline stage has no budget left (HTTP 504)."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(status_code=504, detail=f"Deadline exceeded at stage {stage}")
+
+
+class Deadline:
+    """A wall-clock budget for one request, measured on the monotonic clock.
+
+    Every stage asks the deadline for its timeout, so the remaining budget
+    flows through the pipeline and a hung dependency can only consume what is
+    left instead of pinning the worker forever.
+    """
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    @classmethod
+    def from_env(cls) -> Optional["Deadline"]:
+        """Creates a deadline from REQUEST_DEADLINE_SECONDS, or None if unset/0."""
+        budget = float(os.getenv("REQUEST_DEADLINE_SECONDS", "0") or 0)
+        return cls(budget) if budget > 0 else None
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (negative once it has passed)."""
+        return self.expires_at - time.monotonic()
+
+    def check(self, stage: str) -> None:
+        """Raises DeadlineExceeded if the budget is already spent."""
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(stage)
+
+    def timeout(self, stage: str, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """Returns the timeout a stage may use.
+
+        Args:
+            stage (str): Stage name, reported if the budget is exhausted
+            cap (Optional[float]): Upper bound for this stage's timeout
+            reserve (float): Seconds to hold back for later stages
+
+        Returns:
+            float: Timeout in seconds
+
+        Raises:
+            DeadlineExceeded: If less than MIN_STAGE_SECONDS remain
+        """
+
+        available = self.remaining() - reserve
+        if available < MIN_STAGE_SECONDS:
+            raise DeadlineExceeded(stage)
+        return min(available, cap) if cap else available
+
+    def max_tokens(
+        self,
+        stage: str,
+        tokens_per_second: float,
+        ceiling: int,
+        floor: int = 256,
+        reserve: float = 0.0,
+    ) -> int:
+        """Scales a completion's max_tokens to the time the stage has left.
+
+        Args:
+            stage (str): Stage name, reported if the budget is exhausted
+            tokens_per_second (float): Expected generation throughput of the model
+            ceiling (int): max_tokens used when time is plentiful
+            floor (int): Smallest useful completion; below it the stage fails fast
+            reserve (float): Seconds to hold back for later stages
+
+        Returns:
+            int: max_tokens for the completion
+
+        Raises:
+            DeadlineExceeded: If not even `floor` tokens fit in the remaining time
+        """
+
+        tokens = int(self.timeout(stage, reserve=reserve) * tokens_per_second)
+        if tokens < floor:
+            raise DeadlineExceeded(stage)
+        return min(tokens, ceiling)
+
+
+def stage_timeout(
+    deadline: Optional[Deadline], stage: str, default: Optional[float] = None
+) -> Optional[float]:
+    """Timeout for a stage, falling back to `default` when there is no deadline.
+
+    Args:
+        deadline (Optional[Deadline]): Request deadline, if any
+        stage (str): Stage name
+        default (Optional[float]): Timeout to use without a deadline (None = no limit).
+            Also caps the deadline-derived timeout
+
+    Returns:
+        Optional[float]: Timeout in seconds
+    """
+
+    if deadline is None:
+        return default
+    return deadline.timeout(stage, cap=default)
+
+
+def check_timeout(deadline: Optional[Deadline], stage: str) -> None:
+    """Raises DeadlineExceeded after a timed-out call if the deadline bounded it.
+
+    A stage's timeout is the smaller of its own cap and the remaining budget.
+    When the budget was the smaller one it is now spent, and the request
+    failed on its deadline (504) rather than on the dependency (500).
+    """
+
+    if deadline is not None and deadline.remaining() < MIN_STAGE_SECONDS:
+        raise DeadlineExceeded(stage)
+
+
+def llm_limits(
+    deadline: Optional[Deadline], stage: str, reserve: float = 0.0, retries: Optional[int] = None
+) -> dict:
+    """litellm.completion kwargs bounding one model call by the request deadline.
+
+    The timeout is the remaining budget (minus `reserve` for later stages) and
+    max_tokens is scaled so that generation at LLM_TOKENS_PER_SECOND finishes
+    in that time, capped at LLM_MAX_TOKENS. litellm retries a timed-out call
+    with the same full timeout, so under a deadline no retries are made.
+
+    Args:
+        deadline (Optional[Deadline]): Request deadline, if any
+        stage (str): Stage name, reported if the budget is exhausted
+        reserve (float): Seconds to hold back for later stages
+        retries (Optional[int]): num_retries to use without a deadline
+
+    Returns:
+        dict: {"timeout", "max_tokens", "num_retries"} ({"num_retries"} only
+            when there is no deadline; num_retries only if `retries` is given)
+    """
+
+    if deadline is None:
+        return {} if retries is None else {"num_retries": retries}
+    limits = {} if retries is None else {"num_retries": 0}
+    return {
+        **limits,
+        "timeout": deadline.timeout(stage, reserve=reserve),
+        "max_tokens": deadline.max_tokens(
+            stage,
+            tokens_per_second=float(os.getenv("LLM_TOKENS_PER_SECOND", "40")),
+            ceiling=int(os.getenv("LLM_MAX_TOKENS", "4096")),
+            reserve=reserve,
+        ),
+    }
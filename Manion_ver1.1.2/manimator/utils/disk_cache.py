@@ -0,0 +1,208 @@
+"""Size-bounded, content-addressed file cache shared by concurrent processes.
+
+Entries are immutable files named by key. Writers stage into a temp file and
+`os.replace` it into place, so readers never see a partial entry. Recency is
+the entry's mtime, refreshed on every hit, and eviction removes the least
+recently used entries once the cache grows past `max_bytes`. Consumers take
+hard links to entries, so evicting an entry never breaks a render using it.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+
+class DiskCache:
+    """A directory of cached files with LRU eviction.
+
+    Args:
+        root (str): Cache directory, created if missing
+        max_bytes (int): Size above which least recently used entries are evicted
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._persisted = (0, 0)
+        self._stats_lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Path an entry with this key is stored at."""
+        return os.path.join(self.root, "objects", key[:2], key)
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the entry path and marks it recently used, or None on a miss."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._count(False)
+            return None
+        self._count(True)
+        return path
+
+    def link_to(self, key: str, dest: str) -> bool:
+        """Hard-links an entry to dest (copying across filesystems).
+
+        Returns:
+            bool: True on a hit, False if the entry is not cached
+        """
+
+        source = self.get(key)
+        if source is None:
+            return False
+        try:
+            _link_or_copy(source, dest)
+        except FileNotFoundError:
+            # Evicted between the lookup and the link
+            return False
+        return True
+
+    def put_file(self, key: str, source: str) -> str:
+        """Stores a file under key unless already cached, and returns the entry path.
+
+        The source is hard-linked when possible, so storing costs no copy.
+        """
+
+        path = self.path(key)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, staging = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".staging-")
+        os.close(fd)
+        os.remove(staging)
+        try:
+            _link_or_copy(source, staging)
+            os.replace(staging, path)
+        finally:
+            if os.path.exists(staging):
+                os.remove(staging)
+        return path
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """Stores bytes under key unless already cached, and returns the entry path."""
+        path = self.path(key)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, staging = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".staging-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(staging, path)
+        finally:
+            if os.path.exists(staging):
+                os.remove(staging)
+        return path
+
+    @contextmanager
+    def lock(self):
+        """Exclusive lock across processes sharing this cache directory."""
+        with open(os.path.join(self.root, ".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            int: Number of entries removed
+        """
+
+        with self.lock():
+            entries = []
+            total = 0
+            for directory, _, files in os.walk(os.path.join(self.root, "objects")):
+                for name in files:
+                    if name.startswith(".staging-"):
+                        continue
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
+
+    def persist_stats(self) -> Tuple[int, int]:
+        """Adds hits and misses since the last call to the totals in the cache dir.
+
+        Returns:
+            Tuple[int, int]: Hits and misses that were added
+        """
+
+        with self._stats_lock:
+            hits = self.hits - self._persisted[0]
+            misses = self.misses - self._persisted[1]
+            self._persisted = (self.hits, self.misses)
+        if not hits and not misses:
+            return 0, 0
+        with self.lock():
+            totals = self.load_stats()
+            totals = {"hits": totals["hits"] + hits, "misses": totals["misses"] + misses}
+            fd, staging = tempfile.mkstemp(dir=self.root, prefix=".staging-")
+            with os.fdopen(fd, "w") as f:
+                json.dump(totals, f)
+            os.replace(staging, os.path.join(self.root, "stats.json"))
+        return hits, misses
+
+    def load_stats(self) -> Dict[str, float]:
+        """Hit/miss totals persisted by every process sharing the cache."""
+        try:
+            with open(os.path.join(self.root, "stats.json")) as f:
+                totals = json.load(f)
+        except (FileNotFoundError, ValueError):
+            totals = {"hits": 0, "misses": 0}
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = totals["hits"] / lookups if lookups else 0.0
+        return totals
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters of this process."""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _link_or_copy(source: str, dest: str) -> None:
+    try:
+        os.link(source, dest)
+    except OSError as e:
+        if isinstance(e, FileNotFoundError):
+            raise
+        shutil.copyfile(source, dest)
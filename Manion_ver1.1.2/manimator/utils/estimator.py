@@ -0,0 +1,368 @@
+"""Render-time estimates from the scene's AST.
+
+Like the validator, this never runs the code. It walks each scene class,
+sums play() run_times and wait() durations (loops over a constant range()
+multiply their body), counts TeX and Text objects, and notes 3D scenes,
+surfaces and updaters. A linear model turns those features into render
+seconds for each quality profile: per-frame cost grows with the pixel count,
+3D scenes, surfaces and updaters add to every frame, TeX and Text add a
+fixed cost each.
+
+The model starts from hand-set coefficients and is calibrated against the
+timings of our own renders, which render_scene appends to a history file.
+"""
+
+import ast
+import fcntl
+import json
+import operator
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from manimator.utils.quality import QUALITY_PROFILES
+from manimator.utils.validator import SCENE_BASES, _find_scenes, leaf_scene_classes
+
+TEX_CLASSES = {"Tex", "MathTex", "SingleStringMathTex", "Title", "BulletedList", "Matrix", "DecimalMatrix", "IntegerMatrix"}
+TEXT_CLASSES = {"Text", "MarkupText", "Paragraph", "Code"}
+THREE_D_BASES = {"ThreeDScene", "SpecialThreeDScene"}
+SURFACE_CLASSES = {"Surface", "ParametricSurface", "Sphere", "Torus", "Cylinder", "Cone", "Prism", "Cube"}
+
+# manim's defaults for play() and wait()
+DEFAULT_RUN_TIME = 1.0
+DEFAULT_WAIT = 1.0
+# Iterations assumed for loops whose count is not a constant
+UNKNOWN_LOOP_COUNT = 3
+
+FEATURES = (
+    "overhead",
+    "frame_megapixels",
+    "three_d_frame_megapixels",
+    "surface_frames",
+    "updater_frames",
+    "tex",
+    "text",
+    "plays",
+)
+
+# Seconds per unit of each feature before any calibration, measured on a
+# 4-core server with a cold TeX cache
+DEFAULT_COEFFICIENTS = {
+    "overhead": 2.0,
+    "frame_megapixels": 0.06,
+    "three_d_frame_megapixels": 0.25,
+    "surface_frames": 0.04,
+    "updater_frames": 0.01,
+    "tex": 0.8,
+    "text": 0.15,
+    "plays": 0.1,
+}
+
+# Calibration starts once this many renders are recorded, and the defaults
+# keep the weight of this many renders after that
+MIN_SAMPLES = 5
+PRIOR_SAMPLES = 5
+
+
+@dataclass
+class SceneFeatures:
+    """What static analysis can tell about a scene's render cost.
+
+    Attributes:
+        duration: Video seconds (play() run_times plus wait() durations)
+        plays: play() and wait() calls
+        tex: TeX objects created (MathTex, Tex, ...)
+        text: Pango text objects created (Text, MarkupText, ...)
+        three_d: Whether the scene is a ThreeDScene
+        surfaces: 3D surfaces created
+        updaters: Updaters added (add_updater, always_redraw)
+    """
+
+    duration: float = 0.0
+    plays: int = 0
+    tex: int = 0
+    text: int = 0
+    three_d: bool = False
+    surfaces: int = 0
+    updaters: int = 0
+
+    def __add__(self, other: "SceneFeatures") -> "SceneFeatures":
+        return SceneFeatures(
+            duration=self.duration + other.duration,
+            plays=self.plays + other.plays,
+            tex=self.tex + other.tex,
+            text=self.text + other.text,
+            three_d=self.three_d or other.three_d,
+            surfaces=self.surfaces + other.surfaces,
+            updaters=self.updaters + other.updaters,
+        )
+
+
+@dataclass
+class RenderEstimate:
+    """Predicted render time of a piece of code.
+
+    Attributes:
+        scenes: Scene classes estimated, in source order
+        features: Features of all scenes together
+        seconds: Predicted render seconds per quality profile (scenes
+            rendered one after another)
+        samples: Recorded renders the model was calibrated on (0 when it
+            still uses the default coefficients)
+    """
+
+    scenes: List[str] = field(default_factory=list)
+    features: SceneFeatures = field(default_factory=SceneFeatures)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    samples: int = 0
+
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+
+def _number(node: ast.AST) -> Optional[float]:
+    """Value of a constant numeric expression such as 2, -1 or 1.5 * 2."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _number(node.operand)
+        return -value if value is not None else None
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        left, right = _number(node.left), _number(node.right)
+        if left is not None and right is not None and not (right == 0 and isinstance(node.op, ast.Div)):
+            return _OPERATORS[type(node.op)](left, right)
+    return None
+
+
+def _loop_count(node: ast.For) -> int:
+    """Iterations of a for loop, when its iterable is a constant range() or literal."""
+    iterable = node.iter
+    if isinstance(iterable, (ast.List, ast.Tuple, ast.Set)):
+        return len(iterable.elts)
+    if isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name):
+        if iterable.func.id == "range" and not iterable.keywords:
+            bounds = [_number(arg) for arg in iterable.args]
+            if bounds and all(b is not None for b in bounds):
+                return max(0, len(range(*(int(b) for b in bounds))))
+        if iterable.func.id == "enumerate" and iterable.args:
+            return _loop_count(ast.For(target=node.target, iter=iterable.args[0], body=[], orelse=[]))
+    return UNKNOWN_LOOP_COUNT
+
+
+def _callee(node: ast.Call) -> Optional[str]:
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _count(node: ast.AST, features: SceneFeatures, times: float) -> None:
+    """Adds the features of a node, counting loop bodies once per iteration."""
+    if isinstance(node, (ast.For, ast.While)):
+        count = _loop_count(node) if isinstance(node, ast.For) else UNKNOWN_LOOP_COUNT
+        for child in node.body:
+            _count(child, features, times * count)
+        for child in node.orelse:
+            _count(child, features, times)
+        return
+    if isinstance(node, ast.Call):
+        name = _callee(node)
+        is_self_call = isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name) and node.func.value.id == "self"
+        if is_self_call and name == "play":
+            run_time = next((_number(k.value) for k in node.keywords if k.arg == "run_time"), None)
+            features.duration += times * (run_time if run_time and run_time > 0 else DEFAULT_RUN_TIME)
+            features.plays += round(times)
+        elif is_self_call and name == "wait":
+            duration = _number(node.args[0]) if node.args else next(
+                (_number(k.value) for k in node.keywords if k.arg == "duration"), DEFAULT_WAIT
+            )
+            features.duration += times * (duration if duration and duration > 0 else DEFAULT_WAIT)
+            features.plays += round(times)
+        elif name in TEX_CLASSES:
+            features.tex += round(times)
+        elif name in TEXT_CLASSES:
+            features.text += round(times)
+        elif name in SURFACE_CLASSES:
+            features.surfaces += round(times)
+        elif name in {"add_updater", "always_redraw"}:
+            features.updaters += round(times)
+    for child in ast.iter_child_nodes(node):
+        _count(child, features, times)
+
+
+def scene_features(code: str, scene_names: Optional[List[str]] = None) -> Dict[str, SceneFeatures]:
+    """Features of each scene class, by name.
+
+    A scene's methods include those of the local scene bases it derives from.
+
+    Args:
+        code (str): Manim code
+        scene_names (Optional[List[str]]): Scenes to analyse. Defaults to every
+            scene class no other derives from
+
+    Returns:
+        Dict[str, SceneFeatures]: Features per scene, in the given order
+            (empty if the code does not parse)
+    """
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return {}
+    classes = {node.name: node for node in _find_scenes(tree)}
+    names = scene_names if scene_names is not None else leaf_scene_classes(code)
+    result = {}
+    for name in names:
+        if name not in classes:
+            continue
+        features = SceneFeatures()
+        lineage, pending = [], [name]
+        while pending:
+            current = classes.get(pending.pop())
+            if current is None or current in lineage:
+                continue
+            lineage.append(current)
+            for base in current.bases:
+                base_name = base.id if isinstance(base, ast.Name) else getattr(base, "attr", None)
+                if base_name in THREE_D_BASES:
+                    features.three_d = True
+                elif base_name not in SCENE_BASES:
+                    pending.append(base_name)
+        for scene in lineage:
+            for statement in scene.body:
+                _count(statement, features, 1.0)
+        result[name] = features
+    return result
+
+
+def feature_vector(features: SceneFeatures, quality: str) -> np.ndarray:
+    """The model's inputs for one scene rendered at a quality, in FEATURES order."""
+    profile = QUALITY_PROFILES[quality]
+    frames = features.duration * profile["frame_rate"]
+    megapixels = profile["pixel_width"] * profile["pixel_height"] / 1e6
+    return np.array(
+        [
+            1.0,
+            frames * megapixels,
+            frames * megapixels if features.three_d else 0.0,
+            frames * features.surfaces,
+            frames * features.updaters,
+            features.tex,
+            features.text,
+            features.plays,
+        ]
+    )
+
+
+def timings_path() -> str:
+    """History of recorded renders: RENDER_TIMINGS_FILE, default ~/.cache/manimator/render_timings.jsonl."""
+    return os.getenv("RENDER_TIMINGS_FILE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "manimator", "render_timings.jsonl"
+    )
+
+
+def record_render(features: SceneFeatures, quality: str, seconds: float) -> None:
+    """Appends one finished render to the timing history used for calibration."""
+    path = timings_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps({"features": asdict(features), "quality": quality, "seconds": seconds})
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.write(line + "\n")
+
+
+def load_timings(limit: Optional[int] = None) -> List[dict]:
+    """The most recent recorded renders (RENDER_TIMINGS_SAMPLES, default 500)."""
+    limit = limit or int(os.getenv("RENDER_TIMINGS_SAMPLES", "500"))
+    try:
+        with open(timings_path()) as f:
+            lines = f.readlines()[-limit:]
+    except FileNotFoundError:
+        return []
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+            record["features"] = SceneFeatures(**record["features"])
+        except (ValueError, TypeError, KeyError):
+            continue  # A line cut short by a crash
+        if record.get("quality") in QUALITY_PROFILES:
+            records.append(record)
+    return records
+
+
+def calibrate(records: List[dict]) -> np.ndarray:
+    """Fits the coefficients to recorded renders.
+
+    Ridge regression towards DEFAULT_COEFFICIENTS: with few renders, or
+    features the history never exercised (say, no 3D scene yet), the
+    defaults hold; as renders accumulate the data takes over. Coefficients
+    are kept non-negative.
+
+    Returns:
+        np.ndarray: Coefficients in FEATURES order
+    """
+
+    prior = np.array([DEFAULT_COEFFICIENTS[name] for name in FEATURES])
+    if len(records) < MIN_SAMPLES:
+        return prior
+    X = np.array([feature_vector(r["features"], r["quality"]) for r in records])
+    y = np.array([r["seconds"] for r in records])
+    gram = X.T @ X
+    # The prior weighs as much as PRIOR_SAMPLES average renders, per feature
+    penalty = np.diag(PRIOR_SAMPLES / len(records) * np.diag(gram) + 1e-9)
+    coefficients = np.linalg.solve(gram + penalty, X.T @ y + penalty @ prior)
+    return np.clip(coefficients, 0.0, None)
+
+
+_calibration = {"at": float("-inf"), "coefficients": None}
+
+
+def predict_seconds(features: SceneFeatures, quality: str) -> float:
+    """Predicted render seconds of one scene, for scheduling.
+
+    The calibration is refreshed from the timing history at most once a minute.
+    """
+
+    now = time.monotonic()
+    if now - _calibration["at"] > 60:
+        _calibration.update(at=now, coefficients=calibrate(load_timings()))
+    return float(feature_vector(features, quality) @ _calibration["coefficients"])
+
+
+def estimate_render(code: str, scene_names: Optional[List[str]] = None) -> RenderEstimate:
+    """Predicts how long rendering code takes at each quality profile.
+
+    Args:
+        code (str): Manim code
+        scene_names (Optional[List[str]]): Scenes that will be rendered.
+            Defaults to every scene class no other derives from
+
+    Returns:
+        RenderEstimate: Features and seconds per quality (no scenes if the
+            code does not parse)
+    """
+
+    per_scene = scene_features(code, scene_names)
+    records = load_timings()
+    coefficients = calibrate(records)
+    estimate = RenderEstimate(
+        scenes=list(per_scene), samples=len(records) if len(records) >= MIN_SAMPLES else 0
+    )
+    for features in per_scene.values():
+        estimate.features = estimate.features + features
+    for quality in QUALITY_PROFILES:
+        estimate.seconds[quality] = round(
+            sum(float(feature_vector(f, quality) @ coefficients) for f in per_scene.values()), 1
+        )
+    return estimate
@@ -0,0 +1,127 @@
+"""Thin wrappers around the ffmpeg CLI for post-processing rendered videos."""
+
+import os
+import subprocess
+import time
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from manimator.utils.scheduler import encode_slot
+
+
+def _run_ffmpeg(args: List[str], timeout: Optional[float] = None) -> None:
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", *args]
+    started = time.monotonic()
+    try:
+        # The wait for an encode slot comes out of the same timeout
+        with encode_slot(timeout):
+            remaining = None if timeout is None else timeout - (time.monotonic() - started)
+            subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=remaining)
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail="ffmpeg is not installed")
+    except (subprocess.TimeoutExpired, TimeoutError):
+        raise HTTPException(
+            status_code=504, detail=f"ffmpeg timed out after {timeout:.0f}s"
+        )
+    except subprocess.CalledProcessError as e:
+        raise HTTPException(status_code=500, detail=f"ffmpeg error: {e.stderr}")
+
+
+def concat_videos(
+    video_paths: List[str], output_path: str, timeout: Optional[float] = None
+) -> str:
+    """Joins videos end to end with stream copy (no re-encode).
+
+    All inputs must share codec, resolution and frame rate, which holds for
+    pieces rendered from the same scene at the same quality. The moov atom is
+    written at the front (faststart) for instant web playback.
+
+    Args:
+        video_paths (List[str]): Videos in playback order
+        output_path (str): Path of the joined video
+        timeout (Optional[float]): Seconds before ffmpeg is abandoned
+
+    Returns:
+        str: output_path
+
+    Raises:
+        HTTPException: If ffmpeg is missing or fails (500), or times out (504)
+    """
+
+    list_path = f"{output_path}.concat.txt"
+    with open(list_path, "w") as f:
+        for path in video_paths:
+            escaped = os.path.abspath(path).replace("'", r"'\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        _run_ffmpeg(
+            [
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                "-c", "copy", "-movflags", "+faststart", output_path,
+            ],
+            timeout=timeout,
+        )
+    finally:
+        os.remove(list_path)
+    return output_path
+
+
+def faststart(video_path: str, timeout: Optional[float] = None) -> str:
+    """Moves an MP4's moov atom to the front so playback starts before the download ends.
+
+    Stream copy into a sibling file that then replaces the original.
+
+    Args:
+        video_path (str): MP4 to rewrite in place
+        timeout (Optional[float]): Seconds before ffmpeg is abandoned
+
+    Returns:
+        str: video_path
+
+    Raises:
+        HTTPException: If ffmpeg is missing or fails (500), or times out (504)
+    """
+
+    tmp_path = f"{video_path}.faststart.mp4"
+    try:
+        _run_ffmpeg(
+            ["-i", video_path, "-c", "copy", "-movflags", "+faststart", tmp_path],
+            timeout=timeout,
+        )
+        os.replace(tmp_path, video_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return video_path
+
+
+def remux_to_ts(
+    video_path: str, output_path: str, offset: float = 0.0, timeout: Optional[float] = None
+) -> str:
+    """Stream-copies an H.264 MP4 into an MPEG-TS segment for HLS.
+
+    Args:
+        video_path (str): MP4 to remux (e.g. one partial movie file)
+        output_path (str): Path of the .ts segment
+        offset (float): Start time of the segment in the whole stream, so
+            timestamps keep increasing across segments
+        timeout (Optional[float]): Seconds before ffmpeg is abandoned
+
+    Returns:
+        str: output_path
+
+    Raises:
+        HTTPException: If ffmpeg is missing or fails (500), or times out (504)
+    """
+
+    _run_ffmpeg(
+        [
+            "-i", video_path,
+            "-c", "copy", "-bsf:v", "h264_mp4toannexb",
+            "-output_ts_offset", f"{offset:.6f}",
+            "-f", "mpegts", output_path,
+        ],
+        timeout=timeout,
+    )
+    return output_path
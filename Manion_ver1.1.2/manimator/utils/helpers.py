@@ -7,6 +7,9 @@ from importlib import resources
 from pathlib import Path
 from typing import Optional
 import base64
+import os
+
+from manimator.utils.deadline import Deadline, DeadlineExceeded, check_timeout, stage_timeout
 
 
 def read_base64_few_shot_file(filename: str = "few_shot_1.pdf") -> str:
@@ -36,11 +39,12 @@ def read_base64_few_shot_file(filename: str = "few_shot_1.pdf") -> str:
         return None
 
 
-def download_arxiv_pdf(url: str) -> bytes:
+def download_arxiv_pdf(url: str, deadline: Optional[Deadline] = None) -> bytes:
     """Downloads a PDF from an arXiv URL.
 
     Args:
         url (str): The arXiv URL to download the PDF from
+        deadline (Optional[Deadline]): Request deadline bounding the download
 
     Returns:
         bytes: Raw PDF content
@@ -50,10 +54,17 @@ def download_arxiv_pdf(url: str) -> bytes:
     """
 
     try:
-        response = requests.get(url)
+        timeout = stage_timeout(
+            deadline, "arxiv_download", float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+        )
+        response = requests.get(url, timeout=timeout)
         response.raise_for_status()
         return response.content
+    except DeadlineExceeded:
+        raise
     except Exception as e:
+        if isinstance(e, requests.Timeout):
+            check_timeout(deadline, "arxiv_download")
         raise HTTPException(
             status_code=500, detail=f"Failed to download arxiv PDF: {str(e)}"
         )
@@ -0,0 +1,228 @@
+"""Headless layout checks for overlapping and off-screen mobjects.
+
+The system prompts ask for scenes without overlaps that stay within
+x∈[-7.5, 7.5], y∈[-4, 4]; this module checks it. During a dry run (see
+render_worker.dry_run_in_process) the bounding boxes of the scene's visible
+top-level mobjects are captured after every play() and wait(), and each
+snapshot is tested with vectorized NumPy interval arithmetic: all pairwise
+intersections at once, and every box against the frame.
+
+Only top-level mobjects are compared, since the parts of a group are meant
+to touch. A box fully inside another (a label on a shape, a surrounding
+rectangle) is treated as intentional and not reported.
+"""
+
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FRAME_X = 7.5
+FRAME_Y = 4.0
+
+# Share of the smaller box that must be covered before two mobjects overlap
+MIN_OVERLAP_RATIO = 0.1
+
+# Tolerance for boxes that touch the frame edge or each other's edges
+EPSILON = 1e-3
+
+
+@dataclass
+class LayoutIssue:
+    """A layout problem and the stretch of video it is visible in.
+
+    Attributes:
+        kind: "overlap" or "out_of_frame"
+        objects: Labels of the mobjects involved
+        start: First snapshot time (seconds) showing the problem
+        end: Last snapshot time showing it
+        detail: Overlap share or the offending extent
+    """
+
+    kind: str
+    objects: List[str]
+    start: float
+    end: float
+    detail: str
+
+    def __str__(self) -> str:
+        what = " and ".join(self.objects)
+        return f"{self.start:.1f}s-{self.end:.1f}s: {self.kind} of {what} ({self.detail})"
+
+
+def overlapping_pairs(boxes: np.ndarray, min_ratio: float = MIN_OVERLAP_RATIO) -> List[tuple]:
+    """Pairs of boxes that partially overlap.
+
+    Args:
+        boxes (np.ndarray): (n, 4) array of xmin, ymin, xmax, ymax
+        min_ratio (float): Intersection share of the smaller box to report
+
+    Returns:
+        List[tuple]: (i, j, ratio) with i < j
+    """
+
+    if len(boxes) < 2:
+        return []
+    lo, hi = boxes[:, :2], boxes[:, 2:]
+    sides = np.clip(np.minimum(hi[:, None], hi[None]) - np.maximum(lo[:, None], lo[None]), 0, None)
+    intersection = sides.prod(axis=-1)
+    area = (hi - lo).prod(axis=-1)
+    smaller = np.minimum(area[:, None], area[None])
+    ratio = np.divide(
+        intersection, smaller, out=np.zeros_like(intersection), where=smaller > 0
+    )
+    contains = np.all(lo[:, None] <= lo[None] + EPSILON, axis=-1) & np.all(
+        hi[:, None] >= hi[None] - EPSILON, axis=-1
+    )
+    mask = np.triu(ratio > min_ratio, k=1) & ~(contains | contains.T)
+    return [(int(i), int(j), float(ratio[i, j])) for i, j in zip(*np.nonzero(mask))]
+
+
+def out_of_frame(boxes: np.ndarray, frame_x: float = FRAME_X, frame_y: float = FRAME_Y) -> np.ndarray:
+    """Indices of boxes reaching outside [-frame_x, frame_x] x [-frame_y, frame_y]."""
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=int)
+    limits = np.array([-frame_x, -frame_y, frame_x, frame_y])
+    outside = np.concatenate(
+        [boxes[:, :2] < limits[:2] - EPSILON, boxes[:, 2:] > limits[2:] + EPSILON], axis=1
+    )
+    return np.nonzero(outside.any(axis=1))[0]
+
+
+def keyed_issues(
+    boxes: np.ndarray, labels: Sequence[str], time: float, ids: Optional[Sequence[Hashable]] = None
+) -> List[Tuple[tuple, LayoutIssue]]:
+    """Layout issues of one snapshot, each keyed by the mobjects involved.
+
+    Labels are not unique (two Text overlaps are both "Text and Text"), so
+    issues are tracked across snapshots by mobject identity instead.
+
+    Args:
+        boxes (np.ndarray): (n, 4) bounding boxes, xmin, ymin, xmax, ymax
+        labels (Sequence[str]): Label of each box
+        time (float): Video time of the snapshot
+        ids (Optional[Sequence[Hashable]]): Identity of each box's mobject
+            (default: its index)
+
+    Returns:
+        List[Tuple[tuple, LayoutIssue]]: (key, issue) for overlaps and
+            out-of-frame mobjects
+    """
+
+    ids = list(range(len(boxes))) if ids is None else ids
+    issues = [
+        (
+            ("overlap", ids[i], ids[j]),
+            LayoutIssue("overlap", [labels[i], labels[j]], time, time, f"{ratio:.0%} overlap"),
+        )
+        for i, j, ratio in overlapping_pairs(boxes)
+    ]
+    for i in out_of_frame(boxes):
+        xmin, ymin, xmax, ymax = boxes[i]
+        issues.append((
+            ("out_of_frame", ids[i]),
+            LayoutIssue(
+                "out_of_frame",
+                [labels[i]],
+                time,
+                time,
+                f"x {xmin:.2f}..{xmax:.2f}, y {ymin:.2f}..{ymax:.2f}",
+            ),
+        ))
+    return issues
+
+
+def check_boxes(boxes: np.ndarray, labels: Sequence[str], time: float) -> List[LayoutIssue]:
+    """Layout issues of one snapshot (see keyed_issues).
+
+    Returns:
+        List[LayoutIssue]: Overlaps and out-of-frame mobjects
+    """
+
+    return [issue for _, issue in keyed_issues(boxes, labels, time)]
+
+
+def merge_issues(snapshots: Sequence[List[Tuple[tuple, LayoutIssue]]]) -> List[LayoutIssue]:
+    """Joins the same issue (by key) across consecutive snapshots into one time range."""
+    merged: List[LayoutIssue] = []
+    open_issues = {}
+    for snapshot in snapshots:
+        still_open = {}
+        for key, issue in snapshot:
+            previous = open_issues.get(key)
+            if previous is not None:
+                previous.end = issue.end
+                previous.detail = issue.detail
+                still_open[key] = previous
+            else:
+                merged.append(issue)
+                still_open[key] = issue
+        open_issues = still_open
+    return merged
+
+
+def _label(mobject) -> str:
+    name = type(mobject).__name__
+    text = getattr(mobject, "text", None) or getattr(mobject, "tex_string", None)
+    if isinstance(text, str) and text:
+        short = text if len(text) <= 24 else text[:21] + "..."
+        return f"{name}({short!r})"
+    return name
+
+
+def _is_visible(mobject) -> bool:
+    family = mobject.get_family()
+    if not any(len(m.points) for m in family):
+        return False
+    # Fully transparent VMobjects (e.g. after set_opacity(0)) are not on screen
+    opacities = [
+        max(m.get_fill_opacity(), m.get_stroke_opacity())
+        for m in family
+        if len(m.points) and hasattr(m, "get_fill_opacity")
+    ]
+    return not opacities or max(opacities) > 0
+
+
+def snapshot_scene(scene) -> tuple:
+    """Bounding boxes, labels and identities of a scene's visible top-level mobjects.
+
+    Returns:
+        tuple: ((n, 4) np.ndarray of boxes, list of labels, list of ids)
+    """
+
+    boxes = []
+    labels = []
+    ids = []
+    for mobject in scene.mobjects:
+        if type(mobject).__name__ == "ValueTracker" or not _is_visible(mobject):
+            continue
+        points = mobject.get_all_points()
+        boxes.append(np.concatenate([points[:, :2].min(axis=0), points[:, :2].max(axis=0)]))
+        labels.append(_label(mobject))
+        ids.append(id(mobject))
+    return np.array(boxes).reshape(-1, 4), labels, ids
+
+
+class LayoutRecorder:
+    """Collects layout issues from a scene after each play() and wait().
+
+    Install it on a scene before rendering; the issues of every snapshot are
+    available from `issues()` afterwards.
+    """
+
+    def __init__(self):
+        self.snapshots: List[List[Tuple[tuple, LayoutIssue]]] = []
+
+    def install(self, scene) -> None:
+        renderer = scene.renderer
+        original = renderer.play
+
+        def play(scene_, *args, **kwargs):
+            original(scene_, *args, **kwargs)
+            boxes, labels, ids = snapshot_scene(scene_)
+            self.snapshots.append(keyed_issues(boxes, labels, renderer.time, ids))
+
+        renderer.play = play
+
+    def issues(self) -> List[LayoutIssue]:
+        return merge_issues(self.snapshots)
@@ -0,0 +1,195 @@
+"""Stage-aware LLM calls with optional local OpenAI-compatible endpoints.
+
+Each pipeline stage reads its configuration from env variables sharing a prefix:
+
+    PROMPT_SCENE_GEN_MODEL        hosted model (litellm name), used as fallback
+    PROMPT_SCENE_GEN_API_BASE     local OpenAI-compatible base URL, e.g. http://10.0.0.5:8000/v1
+    PROMPT_SCENE_GEN_LOCAL_MODEL  model name served by the local endpoint
+    PROMPT_SCENE_GEN_API_KEY      key for the local endpoint (default "local")
+    PROMPT_SCENE_GEN_MAX_CONCURRENCY  in-flight requests before the endpoint counts as saturated
+
+and likewise for CODE_GEN_* and PDF_SCENE_GEN_*. Without an API_BASE the stage
+calls its hosted model exactly as before.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import httpx
+import litellm
+import openai
+
+logger = logging.getLogger(__name__)
+
+STAGE_PREFIXES = {
+    "scene": "PROMPT_SCENE_GEN",
+    "code": "CODE_GEN",
+    "pdf": "PDF_SCENE_GEN",
+}
+
+# Status codes a local server uses to say it is overloaded or warming up
+SATURATION_STATUS_CODES = {429, 503}
+
+
+@dataclass
+class LocalEndpoint:
+    """A local OpenAI-compatible server with a keep-alive connection pool."""
+
+    base_url: str
+    model: str
+    api_key: str
+    max_concurrency: int
+    acquire_timeout: float
+
+    def __post_init__(self):
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.client = openai.OpenAI(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            max_retries=0,
+            http_client=httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=float(os.getenv("LOCAL_LLM_KEEPALIVE_SECONDS", "60")),
+                ),
+            ),
+        )
+
+    def try_acquire(self) -> bool:
+        """Takes a concurrency slot, waiting at most acquire_timeout seconds."""
+        return self.slots.acquire(timeout=self.acquire_timeout)
+
+    def release(self) -> None:
+        self.slots.release()
+
+
+_endpoints: Dict[tuple, LocalEndpoint] = {}
+_endpoints_lock = threading.Lock()
+
+
+def get_local_endpoint(stage: str) -> Optional[LocalEndpoint]:
+    """Returns the pooled local endpoint configured for a stage, if any.
+
+    Endpoints are created once per (base URL, model) and shared by every
+    request, so connections stay warm between calls.
+
+    Args:
+        stage (str): "scene", "code" or "pdf"
+
+    Returns:
+        Optional[LocalEndpoint]: Endpoint, or None if the stage has no API_BASE
+    """
+
+    prefix = STAGE_PREFIXES[stage]
+    base_url = os.getenv(f"{prefix}_API_BASE")
+    if not base_url:
+        return None
+    model = os.getenv(f"{prefix}_LOCAL_MODEL") or os.getenv(f"{prefix}_MODEL")
+    key = (base_url.rstrip("/"), model)
+    with _endpoints_lock:
+        if key not in _endpoints:
+            _endpoints[key] = LocalEndpoint(
+                base_url=key[0],
+                model=model,
+                api_key=os.getenv(f"{prefix}_API_KEY", "local"),
+                max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "8")),
+                acquire_timeout=float(os.getenv(f"{prefix}_ACQUIRE_TIMEOUT", "0.05")),
+            )
+        return _endpoints[key]
+
+
+class _SlotReleasingStream:
+    """Wraps a streamed response so the endpoint slot is held until it ends."""
+
+    def __init__(self, response, endpoint: LocalEndpoint):
+        self.response = response
+        self.endpoint = endpoint
+        self.completion_stream = getattr(response, "completion_stream", None)
+        self._released = False
+
+    def __iter__(self):
+        try:
+            yield from self.response
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if not self._released:
+            self._released = True
+            self.endpoint.release()
+
+
+def _is_saturation_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status in SATURATION_STATUS_CODES:
+        return True
+    return isinstance(error, (litellm.APIConnectionError, litellm.RateLimitError))
+
+
+def stage_completion(
+    stage: str,
+    messages: list,
+    model: Optional[str] = None,
+    local: bool = True,
+    limits: Optional[Callable[[], dict]] = None,
+    **kwargs,
+):
+    """Runs a chat completion for a pipeline stage.
+
+    The stage's local endpoint is tried first. If every connection slot is busy,
+    or the server answers 429/503 or cannot be reached, the call fails over to
+    the hosted model. `limits` is called again before the fallback, so the
+    hosted call only gets the time the local attempt left over.
+
+    Args:
+        stage (str): "scene", "code" or "pdf"
+        messages (list): Chat messages
+        model (Optional[str]): Hosted model. Defaults to the stage's <PREFIX>_MODEL
+        local (bool): Whether the local endpoint may be used
+        limits (Optional[Callable[[], dict]]): Returns the per-attempt litellm
+            arguments (timeout, max_tokens, num_retries), e.g. a partial of
+            deadline.llm_limits
+        **kwargs: Extra litellm.completion arguments (stream, ...)
+
+    Returns:
+        litellm response (or stream wrapper when stream=True)
+
+    Raises:
+        DeadlineExceeded: If `limits` finds the deadline too close for an attempt
+    """
+
+    hosted_model = model or os.getenv(f"{STAGE_PREFIXES[stage]}_MODEL")
+    endpoint = get_local_endpoint(stage) if local else None
+    limits = limits or dict
+
+    if endpoint is not None and endpoint.try_acquire():
+        try:
+            attempt = {**kwargs, **limits()}
+            local_kwargs = {k: v for k, v in attempt.items() if k != "num_retries"}
+            response = litellm.completion(
+                model=f"openai/{endpoint.model}",
+                messages=messages,
+                api_base=endpoint.base_url,
+                api_key=endpoint.api_key,
+                client=endpoint.client,
+                **local_kwargs,
+            )
+        except Exception as e:
+            endpoint.release()
+            if not _is_saturation_error(e):
+                raise
+            logger.warning(
+                "Local %s endpoint unavailable (%s), falling back to %s", stage, e, hosted_model
+            )
+        else:
+            if kwargs.get("stream"):
+                return _SlotReleasingStream(response, endpoint)
+            endpoint.release()
+            return response
+
+    # Recomputed: a slow local failure may have spent most of the budget
+    return litellm.completion(model=hosted_model, messages=messages, **{**kwargs, **limits()})
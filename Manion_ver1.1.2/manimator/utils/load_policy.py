@@ -0,0 +1,357 @@
+"""Load-aware degradation of new renders under queue pressure.
+
+At peak load it is better to give everyone a 480p video quickly than a few
+people a 1080p video slowly. The policy reads the render scheduler's queue
+(waiting renders per slot, and the predicted seconds of work waiting per
+slot) and, once either crosses its threshold, degrades new non-premium
+renders in two steps:
+
+- busy: quality capped at RENDER_DEGRADE_BUSY_QUALITY (default "low",
+  480p15); extras that multiply the work of one request are turned off
+  (previews, progressive and streaming renders, parallel sections and time
+  slices).
+- overloaded (twice a threshold): quality capped at
+  RENDER_DEGRADE_OVERLOADED_QUALITY (default "preview", 480p10) and the
+  video cut at RENDER_DEGRADE_MAX_SECONDS. A single scene is cut mid-scene;
+  of several scenes the leading ones that fit are kept.
+
+A degraded video is registered as a deferred progressive upgrade: the
+RerenderQueue re-renders it at the requested quality and length once the
+queue has drained below half the thresholds, one at a time, and swaps it
+into the same artifact path. Scenes dropped from a playlist are rendered
+into paths of their own. Extras a request asked for and did not get are
+reported as degradation too, though the video itself needs no re-render.
+"""
+
+import hmac
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from manimator.utils.estimator import scene_features
+from manimator.utils.progressive import ProgressiveRender, defer_upgrade, start_upgrade
+from manimator.utils.quality import QUALITY_PROFILES, resolve_quality
+from manimator.utils.scheduler import RenderScheduler, get_render_scheduler
+
+LEVELS = ("normal", "busy", "overloaded")
+
+
+@dataclass
+class Degradation:
+    """How a new render is adjusted for the current load.
+
+    Attributes:
+        level: Load level the decision was made at (one of LEVELS)
+        requested_quality: Quality the request asked for
+        quality: Quality to render at
+        scene_names: Scenes to render (leading scenes, when the length is capped)
+        dropped_scenes: Scenes left out to cap the length
+        frame_slice: Frames [start, end) to render of a single scene cut short
+        extras: Whether previews, progressive and streaming renders, parallel
+            sections and time slices may be used
+        dropped_extras: Extras the request asked for that were turned off
+    """
+
+    level: str
+    requested_quality: str
+    quality: str
+    scene_names: List[str]
+    dropped_scenes: List[str] = field(default_factory=list)
+    frame_slice: Optional[Tuple[int, int]] = None
+    extras: bool = True
+    dropped_extras: List[str] = field(default_factory=list)
+
+    @property
+    def video_degraded(self) -> bool:
+        """Whether the video is worse than requested, so worth re-rendering."""
+        return (
+            self.quality != self.requested_quality
+            or bool(self.dropped_scenes)
+            or self.frame_slice is not None
+        )
+
+    @property
+    def degraded(self) -> bool:
+        """Whether the response differs from what was requested."""
+        return self.video_degraded or bool(self.dropped_extras)
+
+    def describe(self) -> Optional[Dict]:
+        """How the video was degraded, for the response; None if it was not."""
+        if not self.degraded:
+            return None
+        return {
+            "level": self.level,
+            "quality": self.quality,
+            "requested_quality": self.requested_quality,
+            "dropped_scenes": self.dropped_scenes,
+            "cut_at_frame": self.frame_slice[1] if self.frame_slice else None,
+            "dropped_extras": self.dropped_extras,
+        }
+
+    def headers(self) -> Dict[str, str]:
+        """Response headers marking a degraded render."""
+        if not self.degraded:
+            return {}
+        headers = {
+            "X-Render-Degraded": self.level,
+            "X-Render-Quality": self.quality,
+            "X-Render-Requested-Quality": self.requested_quality,
+        }
+        if self.dropped_scenes:
+            headers["X-Render-Dropped-Scenes"] = ",".join(self.dropped_scenes)
+        if self.frame_slice:
+            headers["X-Render-Cut-At-Frame"] = str(self.frame_slice[1])
+        if self.dropped_extras:
+            headers["X-Render-Dropped-Extras"] = ",".join(self.dropped_extras)
+        return headers
+
+
+def _cap_quality(quality: str, cap: str) -> str:
+    order = list(QUALITY_PROFILES)
+    return quality if order.index(quality) <= order.index(cap) else cap
+
+
+class LoadPolicy:
+    """Decides how far new renders are degraded, from the scheduler's queue.
+
+    Args:
+        queue_depth (float): Waiting renders per slot at which renders are
+            degraded (0 disables this signal)
+        wait_seconds (float): Predicted seconds of waiting work per slot at
+            which renders are degraded (0 disables this signal)
+        busy_quality (str): Highest quality while busy
+        overloaded_quality (str): Highest quality while overloaded
+        max_seconds (float): Longest video while overloaded (0: no cap)
+        premium_keys (Sequence[str]): Keys whose renders are never degraded
+    """
+
+    def __init__(
+        self,
+        queue_depth: float = 1.0,
+        wait_seconds: float = 60.0,
+        busy_quality: str = "low",
+        overloaded_quality: str = "preview",
+        max_seconds: float = 30.0,
+        premium_keys: Sequence[str] = (),
+    ):
+        self.queue_depth = queue_depth
+        self.wait_seconds = wait_seconds
+        self.busy_quality = resolve_quality(busy_quality)
+        self.overloaded_quality = resolve_quality(overloaded_quality)
+        self.max_seconds = max_seconds
+        self.premium_keys = [key for key in premium_keys if key]
+
+    def pressure(self, stats: Dict) -> float:
+        """Load relative to the thresholds: 1 is busy, 2 overloaded.
+
+        Args:
+            stats (Dict): RenderScheduler.stats()
+        """
+
+        slots = max(1, stats["slots"])
+        signals = [0.0]
+        if self.queue_depth > 0:
+            signals.append(stats["waiting"] / slots / self.queue_depth)
+        if self.wait_seconds > 0:
+            signals.append(stats["waiting_cost"] / slots / self.wait_seconds)
+        return max(signals)
+
+    def level(self, stats: Dict) -> str:
+        pressure = self.pressure(stats)
+        return LEVELS[2] if pressure >= 2 else LEVELS[1] if pressure >= 1 else LEVELS[0]
+
+    def is_premium(self, key: Optional[str]) -> bool:
+        # Compared as bytes: compare_digest rejects non-ASCII str
+        return bool(key) and any(
+            hmac.compare_digest(key.encode(), premium.encode()) for premium in self.premium_keys
+        )
+
+    def decide(
+        self,
+        code: str,
+        scene_names: List[str],
+        quality: Optional[str] = None,
+        premium: bool = False,
+        stats: Optional[Dict] = None,
+        extras: Sequence[str] = (),
+    ) -> Degradation:
+        """Adjusts a new render to the current load.
+
+        Args:
+            code (str): Manim code to render; the video length is estimated
+                from it
+            scene_names (List[str]): Scenes to render, in playback order
+            quality (Optional[str]): Requested quality profile
+            premium (bool): Never degrade this render
+            stats (Optional[Dict]): Scheduler stats to decide on (default:
+                the process-wide scheduler's)
+            extras (Sequence[str]): Extras the request asked for (e.g.
+                "stream"), reported as dropped when extras are turned off
+
+        Returns:
+            Degradation: What to render
+
+        Raises:
+            ValueError: If the quality is unknown
+        """
+
+        requested = resolve_quality(quality)
+        level = self.level(stats if stats is not None else get_render_scheduler().stats())
+        decision = Degradation(level, requested, requested, list(scene_names))
+        if premium or level == LEVELS[0]:
+            return decision
+        decision.extras = False
+        decision.dropped_extras = list(extras)
+        if level == LEVELS[1]:
+            decision.quality = _cap_quality(requested, self.busy_quality)
+            return decision
+
+        decision.quality = _cap_quality(requested, self.overloaded_quality)
+        if self.max_seconds <= 0:
+            return decision
+        features = scene_features(code, scene_names)
+        total = 0.0
+        for index, name in enumerate(scene_names):
+            duration = features[name].duration if name in features else 0.0
+            if total + duration <= self.max_seconds:
+                total += duration
+                continue
+            if index == 0:
+                # One scene longer than the cap: cut it short
+                frame_rate = QUALITY_PROFILES[decision.quality]["frame_rate"]
+                decision.scene_names = [name]
+                decision.frame_slice = (0, round(self.max_seconds * frame_rate))
+            else:
+                decision.scene_names = list(scene_names[:index])
+            decision.dropped_scenes = list(scene_names[len(decision.scene_names):])
+            break
+        return decision
+
+
+class RerenderQueue:
+    """Degraded renders waiting to be re-rendered at full quality.
+
+    A re-render starts once the queue pressure is below half of what counts
+    as busy, and only one runs at a time, so the re-renders never bring the
+    load back up themselves.
+
+    Args:
+        policy (LoadPolicy): Policy whose thresholds define "load dropped"
+        scheduler (RenderScheduler): Scheduler whose queue is watched
+        poll_seconds (float): How often the load is checked
+    """
+
+    def __init__(self, policy: LoadPolicy, scheduler: RenderScheduler, poll_seconds: float = 5.0):
+        self.policy = policy
+        self.scheduler = scheduler
+        self.poll_seconds = poll_seconds
+        self._pending: Deque[Tuple[ProgressiveRender, str, Union[str, List[str]]]] = deque()
+        self._running: Optional[ProgressiveRender] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(
+        self, artifact_path: str, code: str, scene_name: Union[str, List[str]], decision: Degradation
+    ) -> ProgressiveRender:
+        """Marks a degraded video for a full-quality re-render.
+
+        Args:
+            artifact_path (str): The degraded video, replaced by the re-render
+            code (str): Manim code it was rendered from
+            scene_name (Union[str, List[str]]): Scene class, or several to
+                render and join, as requested (before any were dropped)
+            decision (Degradation): How the video was degraded
+
+        Returns:
+            ProgressiveRender: Handle tracking the re-render, not done until
+                it has run
+        """
+
+        render = defer_upgrade(artifact_path, decision.quality, decision.requested_quality)
+        with self._lock:
+            self._pending.append((render, code, scene_name))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rerender-queue", daemon=True)
+                self._thread.start()
+        return render
+
+    def run_once(self) -> Optional[ProgressiveRender]:
+        """Starts the next re-render if the load has dropped and none is running.
+
+        Returns:
+            Optional[ProgressiveRender]: The re-render started, if any
+        """
+
+        with self._lock:
+            if not self._pending or (self._running is not None and not self._running.done):
+                return None
+            if self.policy.pressure(self.scheduler.stats()) >= 0.5:
+                return None
+            render, code, scene_name = self._pending.popleft()
+            self._running = render
+        start_upgrade(render, code, scene_name)
+        return render
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "running": self._running is not None and not self._running.done,
+            }
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.poll_seconds)
+            self.run_once()
+
+
+_policy: Optional[LoadPolicy] = None
+_rerenders: Optional[RerenderQueue] = None
+_policy_lock = threading.Lock()
+
+
+def get_load_policy() -> Optional[LoadPolicy]:
+    """Returns the process-wide load policy, creating it on first use.
+
+    Configured by RENDER_DEGRADE (0 turns degradation off),
+    RENDER_DEGRADE_QUEUE_DEPTH, RENDER_DEGRADE_WAIT_SECONDS,
+    RENDER_DEGRADE_BUSY_QUALITY, RENDER_DEGRADE_OVERLOADED_QUALITY,
+    RENDER_DEGRADE_MAX_SECONDS and RENDER_PREMIUM_KEYS (comma-separated).
+
+    Returns:
+        Optional[LoadPolicy]: The policy, or None when degradation is off
+    """
+
+    global _policy
+    if os.getenv("RENDER_DEGRADE", "1") != "1":
+        return None
+    with _policy_lock:
+        if _policy is None:
+            _policy = LoadPolicy(
+                queue_depth=float(os.getenv("RENDER_DEGRADE_QUEUE_DEPTH", "1")),
+                wait_seconds=float(os.getenv("RENDER_DEGRADE_WAIT_SECONDS", "60")),
+                busy_quality=os.getenv("RENDER_DEGRADE_BUSY_QUALITY", "low"),
+                overloaded_quality=os.getenv("RENDER_DEGRADE_OVERLOADED_QUALITY", "preview"),
+                max_seconds=float(os.getenv("RENDER_DEGRADE_MAX_SECONDS", "30")),
+                premium_keys=os.getenv("RENDER_PREMIUM_KEYS", "").split(","),
+            )
+        return _policy
+
+
+def get_rerender_queue() -> Optional[RerenderQueue]:
+    """Returns the process-wide queue of full-quality re-renders of degraded videos."""
+    global _rerenders
+    policy = get_load_policy()
+    if policy is None:
+        return None
+    with _policy_lock:
+        if _rerenders is None:
+            _rerenders = RerenderQueue(
+                policy,
+                get_render_scheduler(),
+                poll_seconds=float(os.getenv("RENDER_RERENDER_POLL_SECONDS", "5")),
+            )
+        return _rerenders
@@ -0,0 +1,130 @@
+"""Cross-job cache of manim partial movie files.
+
+manim names every `play()`/`wait()` segment by a hash of the animation and
+the scene state, and skips rendering a segment whose file already exists in
+the scene's partial_movie_files directory. Every job renders into a fresh
+media dir, so on its own that cache never hits. This module keeps segments in
+a persistent DiskCache and, before each render, hard-links the segments the
+same scene produced last time into the new job's partial movie directory.
+After the render the job's new segments are stored back. Re-rendering an
+edited scene then only encodes the animations that changed.
+"""
+
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import List, Optional
+
+from manimator.utils.disk_cache import DiskCache
+from manimator.utils.quality import quality_dir
+
+
+def partial_movie_dir(media_dir: str, scene_file: str, scene_name: str, quality: str) -> str:
+    """Directory manim writes a scene's partial movie files to."""
+    module_name = os.path.splitext(os.path.basename(scene_file))[0]
+    return os.path.join(
+        media_dir, "videos", module_name, quality_dir(quality), "partial_movie_files", scene_name
+    )
+
+
+class PartialMovieCache:
+    """Partial movie files shared by all render jobs.
+
+    Entries are keyed by quality and animation hash, since the same hash
+    renders to different files at different resolutions and frame rates. A
+    per-scene index remembers which hashes a scene produced last time.
+
+    Args:
+        root (str): Cache directory
+        max_bytes (int): Size bound for the cached segments
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.store = DiskCache(os.path.join(root, "segments"), max_bytes)
+        self.index_dir = os.path.join(root, "index")
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def _index_path(self, scene_name: str, quality: str) -> str:
+        return os.path.join(self.index_dir, f"{quality}-{scene_name}.json")
+
+    def _read_index(self, scene_name: str, quality: str) -> List[str]:
+        try:
+            with open(self._index_path(scene_name, quality)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _write_index(self, scene_name: str, quality: str, hashes: List[str]) -> None:
+        fd, staging = tempfile.mkstemp(dir=self.index_dir, prefix=".staging-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(hashes, f)
+        os.replace(staging, self._index_path(scene_name, quality))
+
+    @staticmethod
+    def _key(quality: str, animation_hash: str) -> str:
+        return f"{animation_hash}-{quality}.mp4"
+
+    def populate(self, partial_dir: str, scene_name: str, quality: str) -> int:
+        """Links the segments this scene produced last time into partial_dir.
+
+        Returns:
+            int: Number of segments linked
+        """
+
+        os.makedirs(partial_dir, exist_ok=True)
+        linked = 0
+        for animation_hash in self._read_index(scene_name, quality):
+            dest = os.path.join(partial_dir, f"{animation_hash}.mp4")
+            if not os.path.exists(dest) and self.store.link_to(
+                self._key(quality, animation_hash), dest
+            ):
+                linked += 1
+        return linked
+
+    def harvest(self, partial_dir: str, scene_name: str, quality: str) -> int:
+        """Stores the job's segments and records them as the scene's index.
+
+        Returns:
+            int: Number of segments that were not cached yet
+        """
+
+        if not os.path.isdir(partial_dir):
+            return 0
+        hashes = []
+        added = 0
+        for name in sorted(os.listdir(partial_dir)):
+            # uncached_* segments are animations manim refused to hash
+            if not name.endswith(".mp4") or name.startswith("uncached_"):
+                continue
+            animation_hash = name[: -len(".mp4")]
+            key = self._key(quality, animation_hash)
+            if not os.path.exists(self.store.path(key)):
+                added += 1
+            self.store.put_file(key, os.path.join(partial_dir, name))
+            hashes.append(animation_hash)
+        if hashes:
+            self._write_index(scene_name, quality, hashes)
+        if added:
+            self.store.evict()
+        return added
+
+
+@lru_cache(maxsize=1)
+def get_partial_movie_cache() -> Optional[PartialMovieCache]:
+    """Returns the process-wide partial movie cache.
+
+    Configured by PARTIAL_MOVIE_CACHE_DIR (default ~/.cache/manimator/partial_movies)
+    and PARTIAL_MOVIE_CACHE_MB (default 2048, 0 disables the cache).
+
+    Returns:
+        Optional[PartialMovieCache]: The cache, or None when disabled
+    """
+
+    max_mb = float(os.getenv("PARTIAL_MOVIE_CACHE_MB", "2048"))
+    if max_mb <= 0:
+        return None
+    root = os.getenv("PARTIAL_MOVIE_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "manimator", "partial_movies"
+    )
+    return PartialMovieCache(root, int(max_mb * 1024 * 1024))
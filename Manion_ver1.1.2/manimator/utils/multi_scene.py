@@ -0,0 +1,204 @@
+"""Rendering every scene class of a generated file.
+
+The model sometimes splits a topic into several scene classes. Each one is
+rendered (and dry-run checked) concurrently, in its own media directory, and
+the results are returned in source order: as a playlist of videos, or joined
+with ffmpeg stream copy into one video.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from manimator.utils.artifacts import new_artifact_path
+from manimator.utils.deadline import Deadline, stage_timeout
+from manimator.utils.ffmpeg import concat_videos
+from manimator.utils.validator import leaf_scene_classes
+
+if TYPE_CHECKING:
+    from manimator.utils.schema import DryRunResult, ManimProcessor
+
+SCENE_MODES = ("first", "playlist", "concat")
+
+
+def resolve_scene_mode(mode: Optional[str] = None) -> str:
+    """Validates a scene mode, defaulting to RENDER_SCENES, then "concat".
+
+    Raises:
+        ValueError: If the mode is not one of SCENE_MODES
+    """
+
+    mode = mode or os.getenv("RENDER_SCENES", "concat")
+    if mode not in SCENE_MODES:
+        raise ValueError(f"Unknown scene mode '{mode}'. Choose from: {', '.join(SCENE_MODES)}")
+    return mode
+
+
+def scenes_to_render(code: str, mode: Optional[str] = None) -> List[str]:
+    """Scene classes to render for a scene mode, in source order.
+
+    "first" keeps the single-scene behaviour; the other modes render every
+    scene class no other scene in the code derives from.
+    """
+
+    scenes = leaf_scene_classes(code)
+    return scenes[:1] if resolve_scene_mode(mode) == "first" else scenes
+
+
+def _workers(count: int, workers: Optional[int]) -> int:
+    workers = workers or int(os.getenv("SCENE_RENDER_WORKERS", "0")) or os.cpu_count() or 1
+    return max(1, min(workers, count))
+
+
+def dry_run_scenes(
+    processor: "ManimProcessor",
+    scene_file: str,
+    scene_names: List[str],
+    temp_dir: str,
+    deadline: Optional[Deadline] = None,
+    workers: Optional[int] = None,
+    previews: Optional[bool] = None,
+) -> "DryRunResult":
+    """Dry-runs several scenes concurrently and combines the results.
+
+    Returns:
+        DryRunResult: The first failure in scene order, or the summed duration
+            and animation count with layout issues shifted to their time in
+            the joined video. Previews are the first scene's
+    """
+
+    def dry_run(name):
+        return processor.dry_run(scene_file, name, temp_dir, deadline=deadline, previews=previews)
+
+    with ThreadPoolExecutor(max_workers=_workers(len(scene_names), workers)) as executor:
+        results = list(executor.map(dry_run, scene_names))
+    for result in results[1:]:
+        for path in result.previews.values():
+            os.remove(path)
+    for result in results:
+        if not result.ok:
+            return result
+
+    combined = replace(
+        results[0],
+        duration=0.0,
+        animations=0,
+        layout=[],
+        slice_blocker=next((r.slice_blocker for r in results if r.slice_blocker), None),
+    )
+    for result in results:
+        combined.layout.extend(
+            replace(issue, start=issue.start + combined.duration, end=issue.end + combined.duration)
+            for issue in result.layout
+        )
+        combined.duration += result.duration
+        combined.animations += result.animations
+    return combined
+
+
+def render_scenes(
+    processor: "ManimProcessor",
+    scene_file: str,
+    scene_names: List[str],
+    temp_dir: str,
+    deadline: Optional[Deadline] = None,
+    quality: Optional[str] = None,
+    workers: Optional[int] = None,
+    frame_slice: Optional[Tuple[int, int]] = None,
+) -> List[str]:
+    """Renders several scenes of one file concurrently.
+
+    Args:
+        processor (ManimProcessor): Processor used to render each scene
+        scene_file (str): Path to the saved scene file
+        scene_names (List[str]): Scene classes in playback order
+        temp_dir (str): Working directory of this render
+        deadline (Optional[Deadline]): Request deadline bounding every scene
+        quality (Optional[str]): Quality profile for every scene
+        workers (Optional[int]): Concurrent scene renders. Defaults to
+            SCENE_RENDER_WORKERS, then the CPU count
+        frame_slice (Optional[Tuple[int, int]]): Frames [start, end) to render
+            when there is a single scene, e.g. one cut short by the load policy
+
+    Returns:
+        List[str]: Video of each scene in the artifact store (owned by the
+            caller), in scene order
+
+    Raises:
+        Exception: The first failing scene's error (e.g. HTTPException from
+            render_scene); the other scenes' videos are removed
+    """
+
+    if len(scene_names) == 1:
+        video_path = processor.render_scene(
+            scene_file,
+            scene_names[0],
+            temp_dir,
+            deadline=deadline,
+            quality=quality,
+            frame_slice=frame_slice,
+        )
+        if not video_path:
+            raise RuntimeError(f"Failed to render {scene_names[0]}")
+        return [video_path]
+
+    scene_root = os.path.join(temp_dir, "scenes")
+    os.makedirs(scene_root)
+
+    def render(index_name):
+        index, name = index_name
+        media_dir = os.path.join(scene_root, f"media{index:02d}")
+        os.makedirs(media_dir)
+        # Scenes are the unit of parallelism here; splitting them further
+        # into sections would oversubscribe the cores
+        video_path = processor.render_scene(
+            scene_file, name, media_dir, deadline=deadline, quality=quality, sections=False
+        )
+        if not video_path:
+            raise RuntimeError(f"Failed to render {name}")
+        return video_path
+
+    with ThreadPoolExecutor(max_workers=_workers(len(scene_names), workers)) as executor:
+        futures = [executor.submit(render, item) for item in enumerate(scene_names)]
+    videos = [future.result() for future in futures if not future.exception()]
+    for future in futures:
+        if future.exception():
+            for video in videos:
+                os.remove(video)
+            raise future.exception()
+    return videos
+
+
+def render_scenes_joined(
+    processor: "ManimProcessor",
+    scene_file: str,
+    scene_names: List[str],
+    temp_dir: str,
+    deadline: Optional[Deadline] = None,
+    quality: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> str:
+    """Renders several scenes concurrently and joins them into one video.
+
+    Arguments as for render_scenes.
+
+    Returns:
+        str: The joined video in the artifact store (owned by the caller)
+    """
+
+    videos = render_scenes(
+        processor, scene_file, scene_names, temp_dir, deadline, quality, workers
+    )
+    if len(videos) == 1:
+        return videos[0]
+    output = new_artifact_path()
+    try:
+        return concat_videos(videos, output, timeout=stage_timeout(deadline, "render"))
+    except Exception:
+        if os.path.exists(output):
+            os.remove(output)
+        raise
+    finally:
+        for video in videos:
+            os.remove(video)
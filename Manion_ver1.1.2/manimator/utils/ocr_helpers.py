@@ -10,6 +10,8 @@ import pdf2image
 from google.cloud import vision
 from fastapi import HTTPException
 
+from manimator.utils.deadline import Deadline, DeadlineExceeded, check_timeout, stage_timeout
+
 
 def setup_google_vision_client() -> vision.ImageAnnotatorClient:
     """Setup Google Vision API client using API key.
@@ -27,11 +29,12 @@ def setup_google_vision_client() -> vision.ImageAnnotatorClient:
     return None  # We'll use REST API instead
 
 
-def mathpix_ocr(image_content: bytes) -> str:
+def mathpix_ocr(image_content: bytes, deadline: Optional[Deadline] = None) -> str:
     """Extract mathematical formulas and text from image using Mathpix OCR.
     
     Args:
         image_content: Raw image bytes
+        deadline: Request deadline bounding the API call
         
     Returns:
         str: Extracted text with LaTeX formulas
@@ -67,7 +70,12 @@ def mathpix_ocr(image_content: bytes) -> str:
             }
         }
         
-        response = requests.post(url, json=data, headers=headers)
+        response = requests.post(
+            url, json=data, headers=headers,
+            timeout=stage_timeout(
+                deadline, "ocr_mathpix", float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+            ),
+        )
         response.raise_for_status()
         
         result = response.json()
@@ -80,17 +88,22 @@ def mathpix_ocr(image_content: bytes) -> str:
         else:
             return "No text extracted from image"
             
+    except HTTPException:
+        raise
     except requests.exceptions.RequestException as e:
+        if isinstance(e, requests.Timeout):
+            check_timeout(deadline, "ocr_mathpix")
         raise HTTPException(status_code=500, detail=f"Mathpix API error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Mathpix OCR failed: {str(e)}")
 
 
-def google_vision_ocr(image_content: bytes) -> str:
+def google_vision_ocr(image_content: bytes, deadline: Optional[Deadline] = None) -> str:
     """Extract text from image using Google Vision OCR.
     
     Args:
         image_content: Raw image bytes
+        deadline: Request deadline bounding the API call
         
     Returns:
         str: Extracted text
@@ -132,7 +145,12 @@ def google_vision_ocr(image_content: bytes) -> str:
             ]
         }
         
-        response = requests.post(url, json=data, headers=headers)
+        response = requests.post(
+            url, json=data, headers=headers,
+            timeout=stage_timeout(
+                deadline, "ocr_google_vision", float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+            ),
+        )
         response.raise_for_status()
         
         result = response.json()
@@ -145,17 +163,22 @@ def google_vision_ocr(image_content: bytes) -> str:
         
         return "No text extracted from image"
         
+    except HTTPException:
+        raise
     except requests.exceptions.RequestException as e:
+        if isinstance(e, requests.Timeout):
+            check_timeout(deadline, "ocr_google_vision")
         raise HTTPException(status_code=500, detail=f"Google Vision API error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Google Vision OCR failed: {str(e)}")
 
 
-def combined_ocr(image_content: bytes) -> Tuple[str, str]:
+def combined_ocr(image_content: bytes, deadline: Optional[Deadline] = None) -> Tuple[str, str]:
     """Extract both mathematical formulas and general text from image.
     
     Args:
         image_content: Raw image bytes
+        deadline: Request deadline shared by both OCR calls
         
     Returns:
         Tuple[str, str]: (mathpix_result, google_vision_result)
@@ -164,13 +187,17 @@ def combined_ocr(image_content: bytes) -> Tuple[str, str]:
     google_result = ""
     
     try:
-        mathpix_result = mathpix_ocr(image_content)
+        mathpix_result = mathpix_ocr(image_content, deadline)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Mathpix OCR failed: {str(e)}")
         mathpix_result = "Mathpix OCR failed"
     
     try:
-        google_result = google_vision_ocr(image_content)
+        google_result = google_vision_ocr(image_content, deadline)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Google Vision OCR failed: {str(e)}")
         google_result = "Google Vision OCR failed"
@@ -207,12 +234,15 @@ def pdf_to_images(pdf_content: bytes) -> list[bytes]:
         raise HTTPException(status_code=500, detail=f"PDF to image conversion failed: {str(e)}")
 
 
-def process_image_file(file_content: bytes, file_type: str = "auto") -> str:
+def process_image_file(
+    file_content: bytes, file_type: str = "auto", deadline: Optional[Deadline] = None
+) -> str:
     """Process image file and extract text using both OCR services.
     
     Args:
         file_content: Raw file bytes
         file_type: File type ("image", "pdf", or "auto")
+        deadline: Request deadline shared by all OCR calls
         
     Returns:
         str: Combined extracted text
@@ -238,7 +268,7 @@ def process_image_file(file_content: bytes, file_type: str = "auto") -> str:
             image_list = pdf_to_images(file_content)
             
             for i, image_bytes in enumerate(image_list):
-                mathpix_text, google_text = combined_ocr(image_bytes)
+                mathpix_text, google_text = combined_ocr(image_bytes, deadline)
                 
                 page_text = f"=== Page {i+1} ===\n"
                 if mathpix_text and mathpix_text != "Mathpix OCR failed":
@@ -249,7 +279,7 @@ def process_image_file(file_content: bytes, file_type: str = "auto") -> str:
                 extracted_texts.append(page_text)
                 
         else:  # image
-            mathpix_text, google_text = combined_ocr(file_content)
+            mathpix_text, google_text = combined_ocr(file_content, deadline)
             
     # Process image directly
             combined_text = ""
@@ -268,6 +298,8 @@ def process_image_file(file_content: bytes, file_type: str = "auto") -> str:
         
         return final_text
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
 
@@ -0,0 +1,122 @@
+"""Lightweight preview images captured during the dry run.
+
+Reviewers often only need to glance at a scene's layout. While the dry run
+executes construct() with animations skipped, the frame at the end of every
+play() is drawn once (no intermediate frames, no encoding) and kept as a
+keyframe. From those, three small artifacts are written next to the video:
+
+- a poster frame, the final state of the scene
+- a contact sheet with every keyframe and its timestamp
+- a short low-fps GIF/WebP loop through the keyframes
+
+Runs inside render worker processes; Pillow comes with manim.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageDraw
+
+# Keyframes are stored at this width; the dry run draws at the preview quality
+THUMB_WIDTH = 320
+SHEET_COLUMNS = 4
+
+
+def _thumbnail(image: Image.Image, width: int = THUMB_WIDTH) -> Image.Image:
+    image = image.convert("RGB")
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+class KeyframeRecorder:
+    """Keeps the last frame of every play() of a scene rendered with animations skipped.
+
+    Plays made only of waits are not recorded, since the frame does not
+    change.
+    """
+
+    def __init__(self, width: int = THUMB_WIDTH):
+        self.width = width
+        self.frames: List[Image.Image] = []
+        self.times: List[float] = []
+
+    def install(self, scene) -> None:
+        renderer = scene.renderer
+        original = renderer.play
+
+        def play(scene_, *args, **kwargs):
+            original(scene_, *args, **kwargs)
+            if all(type(animation).__name__ == "Wait" for animation in scene_.animations or []):
+                return
+            # Draws the current state once; skipped animations drew nothing
+            renderer.update_frame(scene_)
+            self.frames.append(_thumbnail(renderer.camera.get_image(), self.width))
+            self.times.append(renderer.time)
+
+        renderer.play = play
+
+
+def contact_sheet(
+    frames: List[Image.Image], times: List[float], columns: int = SHEET_COLUMNS
+) -> Image.Image:
+    """Lays keyframes out in a grid, each labelled with its number and timestamp."""
+    columns = max(1, min(columns, len(frames)))
+    rows = -(-len(frames) // columns)
+    width, height = frames[0].size
+    gap = 4
+    sheet = Image.new(
+        "RGB", (columns * (width + gap) + gap, rows * (height + gap) + gap), (24, 24, 24)
+    )
+    draw = ImageDraw.Draw(sheet)
+    for index, (frame, time) in enumerate(zip(frames, times)):
+        x = gap + (index % columns) * (width + gap)
+        y = gap + (index // columns) * (height + gap)
+        sheet.paste(frame, (x, y))
+        label = f"#{index + 1}  {time:.1f}s"
+        draw.rectangle((x, y, x + 8 + 7 * len(label), y + 16), fill=(0, 0, 0))
+        draw.text((x + 4, y + 2), label, fill=(255, 255, 255))
+    return sheet
+
+
+def save_loop(frames: List[Image.Image], path: str, frame_ms: int) -> None:
+    """Writes keyframes as an endlessly looping GIF or WebP (by the path's extension)."""
+    # The final state is held twice as long before the loop restarts
+    durations = [frame_ms] * (len(frames) - 1) + [2 * frame_ms]
+    frames[0].save(
+        path, save_all=True, append_images=frames[1:], duration=durations, loop=0
+    )
+
+
+def write_previews(
+    recorder: KeyframeRecorder,
+    poster: Image.Image,
+    paths: Dict[str, str],
+    frame_ms: Optional[int] = None,
+) -> Dict[str, str]:
+    """Writes the requested preview artifacts.
+
+    Args:
+        recorder (KeyframeRecorder): Keyframes of the dry run
+        poster (Image.Image): Final frame of the scene
+        paths (Dict[str, str]): Output path per artifact: "poster",
+            "contact_sheet" and/or "loop"
+        frame_ms (Optional[int]): Display time of each loop frame. Defaults to
+            PREVIEW_FRAME_MS, then 600
+
+    Returns:
+        Dict[str, str]: The artifacts written
+    """
+
+    frames = recorder.frames or [_thumbnail(poster, recorder.width)]
+    times = recorder.times or [0.0]
+    written = {}
+    if paths.get("poster"):
+        poster.convert("RGB").save(paths["poster"])
+        written["poster"] = paths["poster"]
+    if paths.get("contact_sheet"):
+        contact_sheet(frames, times).save(paths["contact_sheet"])
+        written["contact_sheet"] = paths["contact_sheet"]
+    if paths.get("loop"):
+        save_loop(frames, paths["loop"], frame_ms or int(os.getenv("PREVIEW_FRAME_MS", "600")))
+        written["loop"] = paths["loop"]
+    return written
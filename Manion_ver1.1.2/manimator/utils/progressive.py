@@ -0,0 +1,231 @@
+"""Progressive rendering: a fast preview now, the high quality render later.
+
+The preview file is the artifact. When the background render finishes it is
+atomically swapped into the same path, so whoever holds the path gets the
+upgraded video on the next read.
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from fastapi import HTTPException
+
+from manimator.utils.deadline import Deadline
+from manimator.utils.multi_scene import render_scenes_joined
+from manimator.utils.quality import resolve_quality
+from manimator.utils.schema import ManimProcessor
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_renders: "OrderedDict[str, ProgressiveRender]" = OrderedDict()
+_renders_lock = threading.Lock()
+_MAX_TRACKED_RENDERS = 512
+
+
+@dataclass
+class ProgressiveRender:
+    """A rendered artifact that is upgraded in the background.
+
+    Attributes:
+        render_id: Id for looking the render up later
+        artifact_path: Video path; holds the preview, then the final render
+        quality: Quality currently stored at artifact_path
+        final_quality: Quality of the background render
+        error: Background render error, if it failed (the preview is kept)
+    """
+
+    render_id: str
+    artifact_path: str
+    quality: str
+    final_quality: str
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.future is None or self.future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """Blocks until the background render ends and returns the artifact path."""
+        if self.future is not None:
+            self.future.exception(timeout=timeout)
+        return self.artifact_path
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("PROGRESSIVE_HD_WORKERS", "2")),
+                thread_name_prefix="progressive-render",
+            )
+        return _executor
+
+
+def _final_quality(final_quality: Optional[str]) -> str:
+    """Resolves the background render's quality, failing before any render."""
+    try:
+        return resolve_quality(final_quality or os.getenv("PROGRESSIVE_FINAL_QUALITY", "high"))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _render(
+    processor: ManimProcessor,
+    code: str,
+    scene_name: Union[str, List[str]],
+    temp_dir: str,
+    deadline: Optional[Deadline],
+    quality: str,
+) -> Optional[str]:
+    scene_file = processor.save_code(code, temp_dir)
+    if isinstance(scene_name, str):
+        return processor.render_scene(
+            scene_file, scene_name, temp_dir, deadline=deadline, quality=quality
+        )
+    return render_scenes_joined(processor, scene_file, scene_name, temp_dir, deadline, quality)
+
+
+def _upgrade(render: ProgressiveRender, code: str, scene_name: Union[str, List[str]]) -> None:
+    processor = ManimProcessor()
+    try:
+        with processor.create_temp_dir() as temp_dir:
+            final_path = _render(
+                processor, code, scene_name, temp_dir, None, render.final_quality
+            )
+        if not final_path:
+            raise RuntimeError("Final render produced no video")
+        os.replace(final_path, render.artifact_path)
+        render.quality = render.final_quality
+    except Exception as e:
+        render.error = getattr(e, "detail", None) or str(e)
+        raise
+
+
+def _track(render: ProgressiveRender) -> None:
+    with _renders_lock:
+        _renders[render.render_id] = render
+        while len(_renders) > _MAX_TRACKED_RENDERS:
+            _renders.popitem(last=False)
+
+
+def upgrade_in_background(
+    artifact_path: str,
+    code: str,
+    scene_name: Union[str, List[str]],
+    preview_quality: str = "preview",
+    final_quality: Optional[str] = None,
+) -> ProgressiveRender:
+    """Queues a final-quality render of code whose preview is at artifact_path.
+
+    Args:
+        artifact_path (str): Path of the already rendered preview
+        code (str): Manim code that produced the preview
+        scene_name (Union[str, List[str]]): Scene class to render, or several
+            to render and join
+        preview_quality (str): Quality of the preview
+        final_quality (Optional[str]): Quality of the background render.
+            Defaults to PROGRESSIVE_FINAL_QUALITY, then "high" (1080p60)
+
+    Returns:
+        ProgressiveRender: Handle tracking the upgrade
+
+    Raises:
+        HTTPException: If the final quality is unknown (422)
+    """
+
+    render = ProgressiveRender(
+        render_id=uuid.uuid4().hex,
+        artifact_path=artifact_path,
+        quality=preview_quality,
+        final_quality=_final_quality(final_quality),
+    )
+    render.future = _get_executor().submit(_upgrade, render, code, scene_name)
+    _track(render)
+    return render
+
+
+def defer_upgrade(artifact_path: str, quality: str, final_quality: str) -> ProgressiveRender:
+    """Registers a final-quality render of an artifact without starting it.
+
+    The render reports not done until start_upgrade has run it, so it can be
+    handed out (and polled) before its render is scheduled.
+
+    Args:
+        artifact_path (str): Path of the already rendered video
+        quality (str): Quality of that video
+        final_quality (str): Quality of the render that replaces it
+
+    Returns:
+        ProgressiveRender: Handle tracking the upgrade
+    """
+
+    render = ProgressiveRender(
+        render_id=uuid.uuid4().hex,
+        artifact_path=artifact_path,
+        quality=quality,
+        final_quality=final_quality,
+        future=Future(),
+    )
+    _track(render)
+    return render
+
+
+def start_upgrade(render: ProgressiveRender, code: str, scene_name: Union[str, List[str]]) -> None:
+    """Runs an upgrade registered with defer_upgrade on the background workers."""
+
+    def run():
+        try:
+            _upgrade(render, code, scene_name)
+        except Exception as e:
+            render.future.set_exception(e)
+        else:
+            render.future.set_result(render.artifact_path)
+
+    _get_executor().submit(run)
+
+
+def render_progressive(
+    code: str,
+    scene_name: Union[str, List[str]],
+    deadline: Optional[Deadline] = None,
+    final_quality: Optional[str] = None,
+) -> Optional[ProgressiveRender]:
+    """Renders a preview right away and queues the final render behind it.
+
+    Args:
+        code (str): Manim code to render
+        scene_name (Union[str, List[str]]): Scene class to render, or several
+            to render and join
+        deadline (Optional[Deadline]): Request deadline for the preview only
+        final_quality (Optional[str]): Quality of the background render.
+            Defaults to PROGRESSIVE_FINAL_QUALITY, then "high" (1080p60)
+
+    Returns:
+        Optional[ProgressiveRender]: Handle whose artifact_path holds the
+            preview, or None if the preview render produced no video
+
+    Raises:
+        HTTPException: If the final quality is unknown (422), checked before
+            the preview is rendered
+    """
+
+    final_quality = _final_quality(final_quality)
+    processor = ManimProcessor()
+    with processor.create_temp_dir() as temp_dir:
+        preview_path = _render(processor, code, scene_name, temp_dir, deadline, "preview")
+    if not preview_path:
+        return None
+    return upgrade_in_background(preview_path, code, scene_name, "preview", final_quality)
+
+
+def get_progressive_render(render_id: str) -> Optional[ProgressiveRender]:
+    """Looks up a progressive render started in this process."""
+    with _renders_lock:
+        return _renders.get(render_id)
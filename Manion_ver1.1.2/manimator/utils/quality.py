@@ -0,0 +1,53 @@
+"""Render quality profiles shared by the CLI and pooled render paths."""
+
+import os
+from typing import Dict, List
+
+# "low" matches the historical `manim -ql` output (480p15). "preview" trades
+# frame rate for speed and is what progressive renders show first.
+QUALITY_PROFILES: Dict[str, Dict[str, int]] = {
+    "preview": {"pixel_width": 854, "pixel_height": 480, "frame_rate": 10},
+    "low": {"pixel_width": 854, "pixel_height": 480, "frame_rate": 15},
+    "medium": {"pixel_width": 1280, "pixel_height": 720, "frame_rate": 30},
+    "high": {"pixel_width": 1920, "pixel_height": 1080, "frame_rate": 60},
+    "production": {"pixel_width": 2560, "pixel_height": 1440, "frame_rate": 60},
+}
+
+DEFAULT_QUALITY = "low"
+
+
+def resolve_quality(quality: str = None) -> str:
+    """Resolves a quality profile name, defaulting to RENDER_QUALITY then "low".
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+
+    name = quality or os.getenv("RENDER_QUALITY") or DEFAULT_QUALITY
+    if name not in QUALITY_PROFILES:
+        raise ValueError(
+            f"Unknown render quality '{name}'. Available: {', '.join(QUALITY_PROFILES)}"
+        )
+    return name
+
+
+def quality_cli_args(quality: str) -> List[str]:
+    """manim CLI arguments selecting a quality profile."""
+    profile = QUALITY_PROFILES[quality]
+    return [
+        "--resolution",
+        f"{profile['pixel_width']},{profile['pixel_height']}",
+        "--frame_rate",
+        str(profile["frame_rate"]),
+    ]
+
+
+def quality_config(quality: str) -> Dict[str, int]:
+    """manim config overrides selecting a quality profile (in-process renders)."""
+    return dict(QUALITY_PROFILES[quality])
+
+
+def quality_dir(quality: str) -> str:
+    """Name of the directory manim writes videos of this quality to, e.g. 480p15."""
+    profile = QUALITY_PROFILES[quality]
+    return f"{profile['pixel_height']}p{profile['frame_rate']}"
@@ -0,0 +1,488 @@
+"""Render farm: render nodes on many machines sharing one job queue.
+
+The queue is a SQLite database on storage every node can reach
+(RENDER_FARM_DB, e.g. on NFS); the artifact store (RENDER_ARTIFACT_DIR) is
+shared the same way, so a video a node renders is served by whichever API
+process asks for it. No broker service is needed, and a single machine
+running several nodes against a local file is a working cluster.
+
+Each job is queued on the live node with the least queued work. A node
+runs its own jobs shortest-first; when it has none it steals the largest
+job queued on the busiest other node. A node that stops heartbeating loses
+its jobs back to the queue after RENDER_FARM_LEASE_SECONDS. Jobs carry a
+cache key (code, scenes and quality), so a repeated render is answered from
+the finished job's artifact without rendering again.
+
+Run a node with `python -m manimator.utils.render_farm [--node NAME] [--slots N]`.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+from manimator.utils.artifacts import artifact_dir
+from manimator.utils.estimator import predict_seconds, scene_features
+from manimator.utils.quality import resolve_quality
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    cache_key TEXT NOT NULL,
+    code TEXT NOT NULL,
+    scene_names TEXT NOT NULL,
+    quality TEXT NOT NULL,
+    cost REAL NOT NULL,
+    node TEXT NOT NULL,
+    status TEXT NOT NULL,
+    claimed_by TEXT,
+    artifact TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, node, cost);
+CREATE INDEX IF NOT EXISTS jobs_cache ON jobs (cache_key, status);
+CREATE TABLE IF NOT EXISTS nodes (
+    name TEXT PRIMARY KEY,
+    slots INTEGER NOT NULL,
+    heartbeat REAL NOT NULL
+);
+"""
+
+# Status of a job through its life
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass
+class FarmJob:
+    """A render job in the farm queue.
+
+    Attributes:
+        job_id: Id for looking the job up
+        code: Manim code to render
+        scene_names: Scene classes, joined in this order
+        quality: Quality profile
+        cost: Predicted render seconds, for ordering and load balancing
+        node: Node the job is queued on (or was stolen by)
+        status: queued, running, done or failed
+        artifact: File name of the video in the shared artifact store, when done
+        error: Render error, when failed
+    """
+
+    job_id: str
+    code: str
+    scene_names: List[str]
+    quality: str
+    cost: float
+    node: str
+    status: str
+    artifact: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+def cache_key(code: str, scene_names: List[str], quality: str) -> str:
+    """Identity of a render: the same code, scenes and quality give the same video."""
+    return hashlib.sha256(
+        "\0".join([quality, ",".join(scene_names), code]).encode()
+    ).hexdigest()
+
+
+def _job(row: sqlite3.Row) -> FarmJob:
+    return FarmJob(
+        job_id=row["id"],
+        code=row["code"],
+        scene_names=json.loads(row["scene_names"]),
+        quality=row["quality"],
+        cost=row["cost"],
+        node=row["node"],
+        status=row["status"],
+        artifact=row["artifact"],
+        error=row["error"],
+    )
+
+
+class RenderQueue:
+    """The shared job queue.
+
+    Args:
+        path (str): SQLite database file every node and API process can reach
+        lease_seconds (float): Heartbeat age after which a node counts as dead
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """A write transaction; the database lock is taken up front, so claims never race."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _live_nodes(self, db: sqlite3.Connection) -> List[str]:
+        cutoff = time.time() - self.lease_seconds
+        return [row["name"] for row in db.execute("SELECT name FROM nodes WHERE heartbeat >= ?", (cutoff,))]
+
+    def heartbeat(self, node: str, slots: int) -> None:
+        """Marks a node alive and returns the jobs of dead nodes to the queue."""
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO nodes (name, slots, heartbeat) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET slots = excluded.slots, heartbeat = excluded.heartbeat",
+                (node, slots, time.time()),
+            )
+            live = self._live_nodes(db)
+            marks = ",".join("?" * len(live))
+            # Running on a dead node: run again, wherever a node is free
+            db.execute(
+                f"UPDATE jobs SET status = ?, claimed_by = NULL WHERE status = ? AND claimed_by NOT IN ({marks})",
+                (QUEUED, RUNNING, *live),
+            )
+            # Queued on a dead node: any live node steals them anyway, but
+            # moving them keeps the load balance honest
+            db.execute(
+                f"UPDATE jobs SET node = ? WHERE status = ? AND node NOT IN ({marks})",
+                (node, QUEUED, *live),
+            )
+
+    def submit(self, code: str, scene_names: List[str], quality: str, cost: float) -> FarmJob:
+        """Queues a render on the live node with the least queued work per slot.
+
+        A render identical to a finished one (same cache key) whose video is
+        still in the artifact store is not queued again; that job is returned.
+        """
+
+        key = cache_key(code, scene_names, quality)
+        with self._transaction() as db:
+            for row in db.execute(
+                "SELECT * FROM jobs WHERE cache_key = ? AND status IN (?, ?, ?) ORDER BY created DESC",
+                (key, DONE, RUNNING, QUEUED),
+            ):
+                if row["status"] != DONE or os.path.exists(os.path.join(artifact_dir(), row["artifact"])):
+                    return _job(row)
+            loads = {
+                row["name"]: row["load"]
+                for row in db.execute(
+                    "SELECT nodes.name, COALESCE(SUM(jobs.cost), 0) / nodes.slots AS load FROM nodes "
+                    "LEFT JOIN jobs ON jobs.node = nodes.name AND jobs.status IN (?, ?) "
+                    "WHERE nodes.heartbeat >= ? GROUP BY nodes.name",
+                    (QUEUED, RUNNING, time.time() - self.lease_seconds),
+                )
+            }
+            # With no live node yet the job waits for whichever node starts first
+            node = min(loads, key=loads.get) if loads else ""
+            job_id = uuid.uuid4().hex
+            db.execute(
+                "INSERT INTO jobs (id, cache_key, code, scene_names, quality, cost, node, status, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, key, code, json.dumps(scene_names), quality, cost, node, QUEUED, time.time()),
+            )
+            return _job(db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def claim(self, node: str) -> Optional[FarmJob]:
+        """Takes the next job for a node: its own shortest job, else one stolen.
+
+        Stealing takes the largest queued job of the node with the most
+        queued work, which moves the most load per steal.
+        """
+
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT * FROM jobs WHERE status = ? AND node = ? ORDER BY cost, created LIMIT 1",
+                (QUEUED, node),
+            ).fetchone()
+            if row is None:
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND node = ("
+                    "  SELECT node FROM jobs WHERE status = ? GROUP BY node ORDER BY SUM(cost) DESC LIMIT 1"
+                    ") ORDER BY cost DESC, created LIMIT 1",
+                    (QUEUED, QUEUED),
+                ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = ?, claimed_by = ?, node = ? WHERE id = ?",
+                (RUNNING, node, node, row["id"]),
+            )
+            return _job(db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def finish(self, job_id: str, node: str, artifact: Optional[str] = None, error: Optional[str] = None) -> bool:
+        """Records a job's outcome.
+
+        Returns:
+            bool: False if the job was taken from this node meanwhile (its
+                lease expired), in which case the outcome is dropped
+        """
+
+        with self._transaction() as db:
+            updated = db.execute(
+                "UPDATE jobs SET status = ?, artifact = ?, error = ?, finished = ? "
+                "WHERE id = ? AND status = ? AND claimed_by = ?",
+                (FAILED if error else DONE, artifact, error, time.time(), job_id, RUNNING, node),
+            ).rowcount
+            return updated == 1
+
+    def get(self, job_id: str) -> Optional[FarmJob]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_seconds: float = 0.5) -> FarmJob:
+        """Polls until a job is done or failed.
+
+        Raises:
+            TimeoutError: If it is still queued or running after timeout
+        """
+
+        started = time.monotonic()
+        while True:
+            job = self.get(job_id)
+            if job is None or job.done:
+                return job
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"Render job {job_id} not finished after {timeout:.0f}s")
+            time.sleep(poll_seconds)
+
+    def stats(self) -> Dict:
+        """Live nodes and, per node, queued and running jobs with their cost."""
+        with self._connect() as db:
+            live = set(self._live_nodes(db))
+            nodes = {
+                row["name"]: {"slots": row["slots"], "live": row["name"] in live, "queued": 0, "running": 0, "cost": 0.0}
+                for row in db.execute("SELECT name, slots FROM nodes")
+            }
+            for row in db.execute(
+                "SELECT node, status, COUNT(*) AS jobs, SUM(cost) AS cost FROM jobs "
+                "WHERE status IN (?, ?) GROUP BY node, status",
+                (QUEUED, RUNNING),
+            ):
+                entry = nodes.setdefault(
+                    row["node"], {"slots": 0, "live": False, "queued": 0, "running": 0, "cost": 0.0}
+                )
+                entry[row["status"]] = row["jobs"]
+                entry["cost"] = round(entry["cost"] + row["cost"], 1)
+        return {"nodes": nodes}
+
+
+def render_job(job: FarmJob) -> str:
+    """Renders a farm job on this node and returns its video in the artifact store."""
+    from manimator.utils.multi_scene import render_scenes_joined
+    from manimator.utils.schema import ManimProcessor
+
+    processor = ManimProcessor()
+    with processor.create_temp_dir() as temp_dir:
+        scene_file = processor.save_code(job.code, temp_dir)
+        return render_scenes_joined(
+            processor, scene_file, job.scene_names, temp_dir, quality=job.quality
+        )
+
+
+class FarmNode:
+    """A render node: `slots` threads claiming and rendering jobs from the queue.
+
+    Args:
+        queue (RenderQueue): The shared queue
+        name (str): Node name, unique in the farm
+        slots (int): Jobs rendered at once
+        render (Callable): Renders one FarmJob and returns the video path,
+            which must be in the shared artifact store
+        poll_seconds (float): Pause between claims when there is no work
+    """
+
+    def __init__(
+        self,
+        queue: RenderQueue,
+        name: str,
+        slots: int = 1,
+        render: Callable[[FarmJob], str] = render_job,
+        poll_seconds: float = 1.0,
+    ):
+        self.queue = queue
+        self.name = name
+        self.slots = slots
+        self.render = render
+        self.poll_seconds = poll_seconds
+        self.completed = 0
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def run_one(self) -> bool:
+        """Claims and renders one job.
+
+        Returns:
+            bool: False if there was nothing to claim
+        """
+
+        job = self.queue.claim(self.name)
+        if job is None:
+            return False
+        path = None
+        try:
+            path = self.render(job)
+            artifact, error = os.path.basename(path), None
+        except Exception as e:
+            artifact, error = None, getattr(e, "detail", None) or str(e) or type(e).__name__
+        if not self._finish(job.job_id, artifact, str(error) if error else None):
+            # The lease expired and the job went to another node; nothing
+            # will ever point at this video
+            if artifact:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        self.completed += 1
+        return True
+
+    def _finish(self, job_id: str, artifact: Optional[str], error: Optional[str]) -> bool:
+        """Records a job's outcome, retrying while the queue is unreachable.
+
+        Giving up would leave the job running on a node that still
+        heartbeats, so it would never be handed to anyone else.
+
+        Returns:
+            bool: What RenderQueue.finish returned; False also if the node
+                stopped before the outcome could be recorded
+        """
+
+        while True:
+            try:
+                return self.queue.finish(job_id, self.name, artifact=artifact, error=error)
+            except (sqlite3.Error, OSError):
+                logger.exception("Render node %s could not record job %s", self.name, job_id)
+                if self._stopping.wait(self.poll_seconds):
+                    return False
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = self.run_one()
+            except (sqlite3.Error, OSError):
+                # e.g. "database is locked" on the shared file; the slot
+                # must not die with it
+                logger.exception("Render node %s could not reach the queue", self.name)
+                claimed = False
+            if not claimed:
+                self._stopping.wait(self.poll_seconds)
+
+    def _heartbeat(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.queue.heartbeat(self.name, self.slots)
+            except (sqlite3.Error, OSError):
+                # A missed beat is retried soon, well within the lease
+                logger.exception("Render node %s missed a heartbeat", self.name)
+                self._stopping.wait(self.poll_seconds)
+                continue
+            self._stopping.wait(self.queue.lease_seconds / 3)
+
+    def start(self) -> None:
+        self.queue.heartbeat(self.name, self.slots)
+        self._threads = [threading.Thread(target=self._heartbeat, daemon=True)]
+        self._threads += [threading.Thread(target=self._loop, daemon=True) for _ in range(self.slots)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stops claiming; jobs being rendered are finished first."""
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join()
+
+
+_queues: Dict[str, RenderQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_render_queue() -> Optional[RenderQueue]:
+    """The farm queue at RENDER_FARM_DB, or None when the farm is not configured.
+
+    One RenderQueue per database path, so its schema is set up only once.
+    """
+
+    path = os.getenv("RENDER_FARM_DB")
+    if not path:
+        return None
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = RenderQueue(
+                path, lease_seconds=float(os.getenv("RENDER_FARM_LEASE_SECONDS", "60"))
+            )
+        return _queues[path]
+
+
+def submit_farm_render(
+    queue: RenderQueue, code: str, scene_names: List[str], quality: Optional[str] = None
+) -> FarmJob:
+    """Queues code for the farm with its predicted cost.
+
+    Raises:
+        ValueError: If the quality is unknown
+    """
+
+    quality = resolve_quality(quality)
+    cost = sum(
+        predict_seconds(features, quality)
+        for features in scene_features(code, scene_names).values()
+    )
+    return queue.submit(code, scene_names, quality, cost)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Runs a render node until interrupted."""
+    parser = argparse.ArgumentParser(description="Manimator render farm node")
+    parser.add_argument("--node", default=os.getenv("RENDER_FARM_NODE") or socket.gethostname())
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=int(os.getenv("RENDER_FARM_SLOTS", "0")) or os.cpu_count() or 1,
+    )
+    args = parser.parse_args(argv)
+    queue = get_render_queue()
+    if queue is None:
+        parser.error("RENDER_FARM_DB must point at the shared queue database")
+    node = FarmNode(queue, args.node, args.slots)
+    node.start()
+    print(f"Render node {args.node} serving {args.slots} slots from {queue.path}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        node.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Pool of pre-warmed Manim render workers.
+
+Spawning the `manim` CLI per job pays for interpreter startup, importing
+manim/numpy/cairo/pango, config parsing and font discovery before the first
+frame. Pool workers do all of that once. Each job then runs in a child forked
+from the warm worker, so it starts with everything imported but cannot leak
+module, config or mobject state into later jobs. Workers are recycled after
+`max_jobs_per_worker` jobs or once their own RSS, or a job's peak RSS,
+passes `max_rss_mb`.
+
+POSIX only (relies on os.fork).
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import signal
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from manimator.utils.render_worker import run_job, warm_up
+from manimator.utils.sandbox import POLL_SECONDS, RenderLimits, check_limits
+
+
+class RenderTimeout(Exception):
+    """Raised when a pooled render does not finish within its timeout."""
+
+
+def _maxrss_mb(usage) -> float:
+    # ru_maxrss is KB on Linux and bytes on macOS
+    peak = usage.ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _rss_mb() -> float:
+    """Peak RSS of the current process in MB."""
+    return _maxrss_mb(resource.getrusage(resource.RUSAGE_SELF))
+
+
+def _run_forked(runner: Callable[[Dict], Dict], job: Dict) -> Dict:
+    """Runs a job in a forked child of the warm worker and returns its result.
+
+    The result's "rss_mb" is the child's peak RSS: the job runs there, so
+    the worker's own RSS does not see it.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 1
+        try:
+            result = runner(job)
+            with os.fdopen(write_fd, "w") as out:
+                json.dump(result, out)
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        payload = pipe.read()
+    _, status, usage = os.wait4(pid, 0)
+    if payload:
+        result = json.loads(payload)
+    else:
+        result = {"ok": False, "error": f"Render process exited with status {status}"}
+    result["rss_mb"] = _maxrss_mb(usage)
+    return result
+
+
+def _worker_main(conn, warm: Callable[[], None], runner: Callable[[Dict], Dict],
+                 max_jobs: int, max_rss_mb: float) -> None:
+    """Render worker loop: warm up once, then serve jobs until recycled."""
+    # Own process group, so a timed-out job can be killed together with its child
+    os.setsid()
+    warm()
+    jobs = 0
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        result = _run_forked(runner, job)
+        jobs += 1
+        result["recycle"] = jobs >= max_jobs or max(_rss_mb(), result["rss_mb"]) > max_rss_mb
+        conn.send(result)
+        if result["recycle"]:
+            return
+
+
+class _Worker:
+    def __init__(self, context, warm, runner, max_jobs, max_rss_mb):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, warm, runner, max_jobs, max_rss_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+
+
+class RenderWorkerPool:
+    """A fixed-size pool of warm render workers.
+
+    Args:
+        size (int): Number of workers (concurrent renders)
+        max_jobs_per_worker (int): Jobs a worker serves before it is replaced
+        max_rss_mb (float): Worker RSS, or a job's peak RSS, above which the
+            worker is replaced after the job
+        warm (Callable): Runs once per worker at startup
+        runner (Callable): Runs one job dict in the forked child
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_jobs_per_worker: int = 50,
+        max_rss_mb: float = 1024,
+        warm: Callable[[], None] = warm_up,
+        runner: Callable[[Dict], Dict] = run_job,
+    ):
+        self._context = multiprocessing.get_context("spawn")
+        self._args = (warm, runner, max_jobs_per_worker, max_rss_mb)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.size = size
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, *self._args)
+
+    def submit(
+        self,
+        job: Dict,
+        timeout: Optional[float] = None,
+        limits: Optional[RenderLimits] = None,
+        output_dir: Optional[str] = None,
+    ) -> Dict:
+        """Runs a job on an idle worker, blocking until one is free.
+
+        Args:
+            job (Dict): Job dict passed to the runner
+            timeout (Optional[float]): Seconds to wait for the render itself
+            limits (Optional[RenderLimits]): CPU, RSS and output limits of the
+                job process, sampled while it runs
+            output_dir (Optional[str]): Directory whose size counts as output
+
+        Returns:
+            Dict: Runner result
+
+        Raises:
+            RenderTimeout: If the render exceeds `timeout`
+            RenderLimitExceeded: If the job crosses one of `limits`
+            (In both cases the worker and its job process are killed and replaced)
+        """
+
+        worker = self._idle.get()
+        replace = True
+        try:
+            if not worker.process.is_alive():
+                worker = self._spawn()
+            worker.conn.send(job)
+            started = time.monotonic()
+            while not worker.conn.poll(POLL_SECONDS if limits else timeout):
+                if timeout is not None and time.monotonic() - started > timeout:
+                    worker.kill()
+                    raise RenderTimeout(f"Render exceeded {timeout:.0f}s")
+                # The warm worker itself is not charged to the job
+                violation = limits and check_limits(
+                    limits, worker.process.pid, output_dir, exclude={worker.process.pid}
+                )
+                if violation:
+                    worker.kill()
+                    raise violation
+                if not limits:
+                    worker.kill()
+                    raise RenderTimeout(f"Render exceeded {timeout:.0f}s")
+            try:
+                result = worker.conn.recv()
+            except EOFError:
+                worker.kill()
+                return {"ok": False, "error": "Render worker exited unexpectedly"}
+            replace = result.pop("recycle", False)
+            if replace:
+                worker.process.join(timeout=5)
+            return result
+        finally:
+            if replace:
+                worker = self._spawn() if not self._closed else None
+            if worker is not None:
+                self._idle.put(worker)
+
+    def close(self) -> None:
+        """Stops all idle workers."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+
+_pool: Optional[RenderWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> Optional[RenderWorkerPool]:
+    """Returns the process-wide render pool, creating it on first use.
+
+    Configured by MANIM_RENDER_POOL_SIZE (0 or unset disables the pool),
+    MANIM_RENDER_POOL_MAX_JOBS and MANIM_RENDER_POOL_MAX_RSS_MB.
+
+    Returns:
+        Optional[RenderWorkerPool]: The pool, or None when disabled or unsupported
+    """
+
+    global _pool
+    size = int(os.getenv("MANIM_RENDER_POOL_SIZE", "0"))
+    if size <= 0 or not hasattr(os, "fork"):
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderWorkerPool(
+                size,
+                max_jobs_per_worker=int(os.getenv("MANIM_RENDER_POOL_MAX_JOBS", "50")),
+                max_rss_mb=float(os.getenv("MANIM_RENDER_POOL_MAX_RSS_MB", "1024")),
+            )
+        return _pool
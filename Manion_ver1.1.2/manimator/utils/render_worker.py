@@ -0,0 +1,472 @@
+"""In-process Manim rendering, used by warm render workers.
+
+Everything here imports manim lazily so that the API process never pays for
+it; only render worker processes do, once, at startup.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import traceback
+import uuid
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from manimator.utils.layout import LayoutRecorder
+from manimator.utils.sandbox import LIMIT_EXIT_CODE, LIMIT_MARKER
+from manimator.utils.scheduler import encode_slot, pin_to_cpus
+from manimator.utils.tex_cache import flush_tex_cache_stats, install_tex_cache
+
+# Prefix of the result line a `--dry-run` invocation prints; manim logs to stdout too
+DRY_RUN_MARKER = "manimator-dry-run:"
+
+# Video duration limit of the render running in this process (None = no limit)
+_max_video_seconds: Optional[float] = None
+_duration_limit_installed = False
+
+# File the render running in this process appends finished partial movies to
+_segment_log: Optional[str] = None
+_segment_log_installed = False
+_encode_limit_installed = False
+
+# Video frames [start, end) the render running in this process writes (None = all)
+_frame_slice: Optional[Tuple[int, Optional[int]]] = None
+_frame_slice_installed = False
+
+
+class VideoDurationExceeded(BaseException):
+    """Raised before an animation that would push the video past its duration limit.
+
+    A BaseException so that manim's CLI, which reports and swallows every
+    Exception from a scene, lets it through to main().
+    """
+
+    def __init__(self, duration: float, maximum: float):
+        self.duration = duration
+        self.maximum = maximum
+        super().__init__(f"Video would reach {duration:.1f}s (limit {maximum:g}s)")
+
+
+def install_duration_limit() -> None:
+    """Checks each animation's run_time against the limit before it renders (idempotent).
+
+    Every play() and wait() goes through Scene.compile_animation_data, which
+    sets the animation's duration before any frame is drawn.
+    """
+
+    global _duration_limit_installed
+    if _duration_limit_installed:
+        return
+    from manim import Scene
+
+    original = Scene.compile_animation_data
+
+    def compile_animation_data(self, *args, **kwargs):
+        result = original(self, *args, **kwargs)
+        if _max_video_seconds is not None:
+            duration = self.renderer.time + (self.duration or 0)
+            if duration > _max_video_seconds:
+                raise VideoDurationExceeded(duration, _max_video_seconds)
+        return result
+
+    Scene.compile_animation_data = compile_animation_data
+    _duration_limit_installed = True
+
+
+def install_segment_log() -> None:
+    """Reports every finished partial movie file while the scene renders (idempotent).
+
+    When a segment log is set, each play() and wait() appends
+    "<partial movie path>\t<duration>" to it as soon as its file is
+    complete (freshly encoded or taken from the cache), so the video can be
+    published piece by piece before the render ends.
+    """
+
+    global _segment_log_installed
+    if _segment_log_installed:
+        return
+    from manim import Scene
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    original_compile = Scene.compile_animation_data
+    original_end = SceneFileWriter.end_animation
+
+    def compile_animation_data(self, *args, **kwargs):
+        result = original_compile(self, *args, **kwargs)
+        self.renderer.file_writer.segment_duration = self.duration
+        return result
+
+    def end_animation(self, *args, **kwargs):
+        original_end(self, *args, **kwargs)
+        path = self.partial_movie_files[-1] if self.partial_movie_files else None
+        if _segment_log and path and os.path.exists(path):
+            with open(_segment_log, "a") as f:
+                f.write(f"{path}\t{getattr(self, 'segment_duration', 0) or 0}\n")
+
+    Scene.compile_animation_data = compile_animation_data
+    SceneFileWriter.end_animation = end_animation
+    _segment_log_installed = True
+
+
+def install_encode_limit() -> None:
+    """Combines partial movies only while holding an encode slot (idempotent).
+
+    The final ffmpeg pass is pure encoding work; capping it across processes
+    keeps bursts of finishing renders from starving the ones still drawing.
+    """
+
+    global _encode_limit_installed
+    if _encode_limit_installed:
+        return
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    original = SceneFileWriter.combine_to_movie
+
+    def combine_to_movie(self, *args, **kwargs):
+        with encode_slot():
+            return original(self, *args, **kwargs)
+
+    SceneFileWriter.combine_to_movie = combine_to_movie
+    _encode_limit_installed = True
+
+
+class SliceUnsupported(Exception):
+    """Raised when a scene's frames depend on more than its construct() state, so it cannot be time-sliced."""
+
+
+def slice_blocker(scene) -> Optional[str]:
+    """Why the animation the scene is about to play cannot be time-sliced, if it cannot.
+
+    A slice replays everything before its first frame with animations
+    skipped, so only the end state of each earlier play() is reproduced.
+    Updaters (add_updater, always_redraw) run once per frame and would see
+    other dt values than in a whole render; wait_until() has no length known
+    up front.
+
+    Returns:
+        Optional[str]: The reason, or None if the animation can be sliced
+    """
+
+    if scene.stop_condition is not None:
+        return "wait_until() has no fixed length"
+    if getattr(scene, "updaters", None) or any(
+        mobject.get_family_updaters() for mobject in scene.mobjects
+    ):
+        return "updaters (add_updater, always_redraw) need every frame before the slice"
+    return None
+
+
+def install_frame_slice() -> None:
+    """Writes only the frames of the current frame slice (idempotent).
+
+    Every process rendering a slice runs construct() from the start, so the
+    scene reaches exactly the state the full render would have. Frames are
+    counted across the whole video as play() and wait() would emit them:
+    plays entirely before the slice run with animations skipped, frames
+    before the slice inside a play are stepped (updaters run) but never
+    drawn, and the scene ends at the first play after the slice.
+    """
+
+    global _frame_slice_installed
+    if _frame_slice_installed:
+        return
+    import numpy as np
+    from manim import Scene, config
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.utils.exceptions import EndSceneEarlyException
+
+    original_compile = Scene.compile_animation_data
+    original_render = CairoRenderer.render
+    original_add_frame = CairoRenderer.add_frame
+
+    def compile_animation_data(self, *args, **kwargs):
+        result = original_compile(self, *args, **kwargs)
+        if _frame_slice is None:
+            return result
+        start, end = _frame_slice
+        renderer = self.renderer
+        blocker = slice_blocker(self)
+        if blocker:
+            raise SliceUnsupported(f"{blocker}; the scene cannot be time-sliced")
+        # The frame counts play_internal and freeze_current_frame produce
+        step = 1 / config["frame_rate"]
+        if self.is_current_animation_frozen_frame():
+            frames = int(self.duration / step)
+        else:
+            frames = len(np.arange(0, self.duration, step))
+        first = getattr(renderer, "slice_cursor", 0)
+        if end is not None and first >= end:
+            raise EndSceneEarlyException()
+        renderer.slice_frame = first
+        renderer.slice_cursor = first + frames
+        if first + frames <= start:
+            # Entirely before the slice: replayed for its end state only
+            renderer.skip_animations = True
+        return result
+
+    def render(self, scene, time, moving_mobjects):
+        if _frame_slice is not None and not self.skip_animations:
+            start, end = _frame_slice
+            if self.slice_frame < start or (end is not None and self.slice_frame >= end):
+                self.add_frame(None)
+                return
+        original_render(self, scene, time, moving_mobjects)
+
+    def add_frame(self, frame, num_frames: int = 1):
+        if _frame_slice is None or self.skip_animations:
+            return original_add_frame(self, frame, num_frames)
+        start, end = _frame_slice
+        first = self.slice_frame
+        self.slice_frame += num_frames
+        last = first + num_frames if end is None else min(first + num_frames, end)
+        written = max(0, last - max(first, start))
+        self.time += (num_frames - written) / self.camera.frame_rate
+        if written:
+            original_add_frame(self, frame, written)
+
+    Scene.compile_animation_data = compile_animation_data
+    CairoRenderer.render = render
+    CairoRenderer.add_frame = add_frame
+    _frame_slice_installed = True
+
+
+def warm_up() -> None:
+    """Imports manim and its native dependencies and primes font discovery.
+
+    Called once when a render worker starts, so each job only pays for scene
+    construction and frame rendering.
+    """
+
+    import manim  # noqa: F401  (manim, numpy, cairo, pango, config parsing)
+    import manimpango
+
+    manimpango.list_fonts()
+    install_tex_cache()
+    install_duration_limit()
+    install_segment_log()
+    install_encode_limit()
+    install_frame_slice()
+
+
+def load_scene_class(scene_file: str, scene_name: str):
+    """Imports a scene file under a unique module name and returns the scene class.
+
+    Args:
+        scene_file (str): Path to the Python file containing the scene
+        scene_name (str): Name of the scene class
+
+    Returns:
+        type: The scene class
+    """
+
+    module_name = f"manimator_scene_{uuid.uuid4().hex}"
+    spec = importlib.util.spec_from_file_location(module_name, scene_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, scene_name)
+
+
+def render_in_process(
+    scene_file: str,
+    scene_name: str,
+    media_dir: str,
+    config_overrides: Optional[Dict] = None,
+) -> str:
+    """Renders a scene in the current process.
+
+    Mirrors `manim <scene_file> <scene_name> --media_dir <media_dir>`: the input
+    file is set so output lands under videos/<file stem>/<quality>/ exactly as
+    with the CLI.
+
+    Args:
+        scene_file (str): Path to the Python file containing the scene
+        scene_name (str): Name of the scene class to render
+        media_dir (str): Directory for output media files
+        config_overrides (Optional[Dict]): Extra manim config values
+
+    Returns:
+        str: Path to the rendered movie file
+    """
+
+    from manim import tempconfig
+
+    overrides = {"media_dir": media_dir, "input_file": scene_file, "preview": False}
+    overrides.update(config_overrides or {})
+    with tempconfig(overrides):
+        scene = load_scene_class(scene_file, scene_name)()
+        scene.render()
+        return str(scene.renderer.file_writer.movie_file_path)
+
+
+def dry_run_in_process(
+    scene_file: str,
+    scene_name: str,
+    media_dir: str,
+    config_overrides: Optional[Dict] = None,
+    layout: bool = False,
+    previews: Optional[Dict[str, str]] = None,
+) -> Dict:
+    """Runs a scene's construct() without drawing, writing or encoding frames.
+
+    manim's dry_run disables all file output, and save_last_frame makes the
+    renderer skip every animation: play() and wait() still build and
+    interpolate their animations to the end state (so bad kwargs, wrong
+    methods and LaTeX errors surface) but no frame is rendered except the
+    final one.
+
+    Args:
+        scene_file (str): Path to the Python file containing the scene
+        scene_name (str): Name of the scene class to check
+        media_dir (str): Directory for TeX and text caches
+        config_overrides (Optional[Dict]): Extra manim config values
+        layout (bool): Also check the layout after every play() and wait()
+        previews (Optional[Dict[str, str]]): Preview artifacts to write, by
+            name ("poster", "contact_sheet", "loop"); the frame at the end of
+            each play() is drawn once for them
+
+    Returns:
+        Dict: "duration" (planned video seconds), "animations" (play and
+            wait calls), "slice_blocker" (why the scene cannot be
+            time-sliced, or None), with layout "layout" (LayoutIssue dicts)
+            and with previews "previews" (the artifacts written)
+    """
+
+    from manim import tempconfig
+
+    overrides = {"media_dir": media_dir, "input_file": scene_file, "preview": False}
+    overrides.update(config_overrides or {})
+    overrides.update({"dry_run": True, "save_last_frame": True, "write_to_movie": False})
+    with tempconfig(overrides):
+        scene = load_scene_class(scene_file, scene_name)()
+        recorder = LayoutRecorder()
+        if layout:
+            recorder.install(scene)
+        if previews:
+            from manimator.utils.previews import KeyframeRecorder, write_previews
+
+            keyframes = KeyframeRecorder()
+            keyframes.install(scene)
+        blockers = []
+        compile_animation_data = scene.compile_animation_data
+
+        def check_sliceable(*args, **kwargs):
+            result = compile_animation_data(*args, **kwargs)
+            blockers.append(slice_blocker(scene))
+            return result
+
+        scene.compile_animation_data = check_sliceable
+        scene.render()
+        planned = {
+            "duration": scene.renderer.time,
+            "animations": scene.renderer.num_plays,
+            "slice_blocker": next((blocker for blocker in blockers if blocker), None),
+        }
+        if layout:
+            planned["layout"] = [asdict(issue) for issue in recorder.issues()]
+        if previews:
+            # save_last_frame drew the final state when the scene finished
+            poster = scene.renderer.camera.get_image()
+            planned["previews"] = write_previews(keyframes, poster, previews)
+        return planned
+
+
+def run_job(job: Dict) -> Dict:
+    """Runs one render job dict and reports the outcome instead of raising.
+
+    Args:
+        job (Dict): scene_file, scene_name, media_dir and optional config,
+            max_video_seconds, segment_log, cpus, frame_slice, dry_run,
+            layout and previews
+
+    Returns:
+        Dict: {"ok": True, "video_path": ...} (or, for a dry run,
+            {"ok": True, "duration": ..., "animations": ...}) or
+            {"ok": False, "error": ...}; a duration limit failure also
+            carries "limit" and "value"
+    """
+
+    global _max_video_seconds, _segment_log, _frame_slice
+    _max_video_seconds = job.get("max_video_seconds")
+    _segment_log = job.get("segment_log")
+    _frame_slice = tuple(job["frame_slice"]) if job.get("frame_slice") else None
+    try:
+        # The job process and the ffmpeg it starts stay on the slot's cores
+        pin_to_cpus(job.get("cpus"))
+        if job.get("dry_run"):
+            planned = dry_run_in_process(
+                job["scene_file"],
+                job["scene_name"],
+                job["media_dir"],
+                job.get("config"),
+                layout=job.get("layout", False),
+                previews=job.get("previews"),
+            )
+            return {"ok": True, **planned}
+        video_path = render_in_process(
+            job["scene_file"], job["scene_name"], job["media_dir"], job.get("config")
+        )
+        return {"ok": True, "video_path": video_path}
+    except VideoDurationExceeded as e:
+        return {
+            "ok": False,
+            "error": str(e),
+            "limit": "max_video_seconds",
+            "value": e.duration,
+        }
+    except BaseException:
+        return {"ok": False, "error": traceback.format_exc()}
+    finally:
+        flush_tex_cache_stats()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Runs the manim CLI with the shared TeX cache installed.
+
+    `python -m manimator.utils.render_worker <manim args>` behaves like
+    `manim <manim args>`; the CLI render path uses it so that spawned renders
+    share compiled formulas with pooled ones. MANIMATOR_MAX_VIDEO_SECONDS sets
+    the video duration limit; hitting it exits with LIMIT_EXIT_CODE after
+    writing LIMIT_MARKER to stderr. MANIMATOR_SEGMENT_LOG sets the segment
+    log (see install_segment_log); MANIMATOR_CPUS (comma-separated) pins the
+    render to cores. MANIMATOR_FRAME_SLICE ("start,end", end may be empty)
+    renders one time slice (see install_frame_slice).
+
+    `python -m manimator.utils.render_worker --dry-run <job json>` instead
+    runs a dry-run job (see run_job) and prints its result as JSON after
+    DRY_RUN_MARKER.
+    """
+
+    global _max_video_seconds, _segment_log, _frame_slice
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--dry-run"]:
+        install_tex_cache()
+        install_duration_limit()
+        result = run_job({**json.loads(argv[1]), "dry_run": True})
+        print(f"{DRY_RUN_MARKER} {json.dumps(result)}", flush=True)
+        return
+
+    from manim.__main__ import main as manim_main
+
+    install_tex_cache()
+    install_duration_limit()
+    install_segment_log()
+    install_encode_limit()
+    install_frame_slice()
+    pin_to_cpus([int(cpu) for cpu in os.getenv("MANIMATOR_CPUS", "").split(",") if cpu])
+    _max_video_seconds = float(os.getenv("MANIMATOR_MAX_VIDEO_SECONDS", "0")) or None
+    _segment_log = os.getenv("MANIMATOR_SEGMENT_LOG") or None
+    if os.getenv("MANIMATOR_FRAME_SLICE"):
+        start, _, end = os.environ["MANIMATOR_FRAME_SLICE"].partition(",")
+        _frame_slice = (int(start), int(end) if end else None)
+    try:
+        manim_main(args=argv, prog_name="manim")
+    except VideoDurationExceeded as e:
+        sys.stderr.write(f"{e}\n{LIMIT_MARKER} max_video_seconds={e.duration}\n")
+        sys.exit(LIMIT_EXIT_CODE)
+    finally:
+        flush_tex_cache_stats()
+
+
+if __name__ == "__main__":
+    main()
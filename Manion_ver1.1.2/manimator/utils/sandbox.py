@@ -0,0 +1,237 @@
+"""Resource limits for render processes.
+
+Generated scenes can loop forever, build huge mobject groups or ask for
+enormous run_times. Every render runs in its own process group, and a monitor
+samples that group while it runs: CPU seconds and RSS summed over the group
+(read from /proc), plus the size of the render's output directory. The first
+limit crossed kills the whole group and surfaces as a RenderLimitExceeded
+naming it. Video duration is enforced inside the render process itself (see
+render_worker), before the frames of an over-long animation are rendered.
+
+CPU, RSS and output sampling needs /proc (Linux); elsewhere only the
+wall-clock and video duration limits apply.
+"""
+
+import os
+import signal
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Collection, Optional, Tuple
+
+from fastapi import HTTPException
+
+POLL_SECONDS = 0.25
+
+# Exit code and stderr marker of a render process that stopped itself on a limit
+LIMIT_EXIT_CODE = 3
+LIMIT_MARKER = "manimator-limit:"
+
+
+class RenderLimitExceeded(HTTPException):
+    """Raised when a render crosses one of its resource limits.
+
+    Attributes:
+        limit (str): Name of the limit, a RenderLimits field
+        value (float): Measured value when the render was stopped
+        maximum (float): Configured limit
+    """
+
+    def __init__(self, limit: str, value: float, maximum: float, status_code: int = 422):
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+        super().__init__(
+            status_code=status_code,
+            detail={
+                "error": "render_limit_exceeded",
+                "limit": limit,
+                "value": round(value, 2),
+                "maximum": maximum,
+                "message": f"Render stopped: {limit} reached {value:.1f} (limit {maximum:g})",
+            },
+        )
+
+
+@dataclass
+class RenderLimits:
+    """Per-render resource limits; None disables a limit.
+
+    Attributes:
+        wall_seconds: Elapsed time
+        cpu_seconds: CPU time summed over the render's process group
+        max_rss_mb: Resident memory summed over the process group
+        max_output_mb: Size of the render's media directory
+        max_video_seconds: Duration of the rendered video
+    """
+
+    wall_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    max_rss_mb: Optional[float] = None
+    max_output_mb: Optional[float] = None
+    max_video_seconds: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, wall_seconds: Optional[float] = None) -> "RenderLimits":
+        """Limits from RENDER_CPU_SECONDS, RENDER_MAX_RSS_MB, RENDER_MAX_OUTPUT_MB
+        and RENDER_MAX_VIDEO_SECONDS (0 disables one)."""
+
+        def read(name: str, default: str) -> Optional[float]:
+            value = float(os.getenv(name, default))
+            return value if value > 0 else None
+
+        return cls(
+            wall_seconds=wall_seconds,
+            cpu_seconds=read("RENDER_CPU_SECONDS", "1800"),
+            max_rss_mb=read("RENDER_MAX_RSS_MB", "4096"),
+            max_output_mb=read("RENDER_MAX_OUTPUT_MB", "2048"),
+            max_video_seconds=read("RENDER_MAX_VIDEO_SECONDS", "600"),
+        )
+
+
+def _group_usage(pgid: int, exclude: Collection[int] = ()) -> Tuple[float, float]:
+    """CPU seconds and RSS in MB summed over the processes of a process group.
+
+    A child that has exited no longer has a /proc entry; once reaped its CPU
+    time is in its parent's cutime/cstime, so that is counted too.
+    """
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    cpu = 0.0
+    rss = 0.0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit() or int(entry) in exclude:
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the parenthesised command name, starting at field 3 (state)
+        fields = stat[stat.rindex(")") + 2:].split()
+        if int(fields[2]) != pgid:
+            continue
+        # utime, stime, cutime, cstime (stat fields 14-17)
+        cpu += sum(int(ticks_used) for ticks_used in fields[11:15]) / ticks
+        rss += int(fields[21]) * page_mb
+    return cpu, rss
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total / (1024 * 1024)
+
+
+def check_limits(
+    limits: RenderLimits,
+    pgid: int,
+    output_dir: Optional[str] = None,
+    exclude: Collection[int] = (),
+) -> Optional[RenderLimitExceeded]:
+    """Samples a render's process group and output against its limits.
+
+    Args:
+        limits (RenderLimits): Limits to enforce
+        pgid (int): Process group of the render
+        output_dir (Optional[str]): Media directory of the render
+        exclude (Collection[int]): Pids of the group not charged to the render
+
+    Returns:
+        Optional[RenderLimitExceeded]: The first limit crossed, if any
+    """
+
+    if os.path.isdir("/proc") and (limits.cpu_seconds or limits.max_rss_mb):
+        cpu, rss = _group_usage(pgid, exclude)
+        if limits.cpu_seconds and cpu > limits.cpu_seconds:
+            return RenderLimitExceeded("cpu_seconds", cpu, limits.cpu_seconds)
+        if limits.max_rss_mb and rss > limits.max_rss_mb:
+            return RenderLimitExceeded("max_rss_mb", rss, limits.max_rss_mb)
+    if limits.max_output_mb and output_dir:
+        size = _dir_size_mb(output_dir)
+        if size > limits.max_output_mb:
+            return RenderLimitExceeded("max_output_mb", size, limits.max_output_mb)
+    return None
+
+
+def parse_limit_marker(stderr: str, limits: RenderLimits) -> Optional[RenderLimitExceeded]:
+    """Reads the limit a render process reported before exiting with LIMIT_EXIT_CODE."""
+    for line in reversed((stderr or "").splitlines()):
+        if line.startswith(LIMIT_MARKER):
+            limit, _, value = line[len(LIMIT_MARKER):].strip().partition("=")
+            return RenderLimitExceeded(limit, float(value), getattr(limits, limit))
+    return None
+
+
+def kill_group(pgid: int) -> None:
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_limited(
+    cmd: list, limits: RenderLimits, output_dir: Optional[str] = None, env: Optional[dict] = None
+) -> subprocess.CompletedProcess:
+    """Runs a command in its own process group under resource limits.
+
+    Args:
+        cmd (list): Command to run
+        limits (RenderLimits): Limits to enforce
+        output_dir (Optional[str]): Directory whose size counts as the output
+        env (Optional[dict]): Environment of the command
+
+    Returns:
+        subprocess.CompletedProcess: The finished process, stdout and stderr as text
+
+    Raises:
+        subprocess.TimeoutExpired: If wall_seconds elapses first
+        subprocess.CalledProcessError: If the command fails
+        RenderLimitExceeded: If another limit is crossed; the group is killed
+    """
+
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+        start_new_session=True,
+    )
+    started = time.monotonic()
+    violation: Optional[Exception] = None
+    try:
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=POLL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            elapsed = time.monotonic() - started
+            if limits.wall_seconds is not None and elapsed > limits.wall_seconds:
+                violation = subprocess.TimeoutExpired(cmd, limits.wall_seconds)
+            else:
+                violation = check_limits(limits, process.pid, output_dir)
+            if violation is not None:
+                kill_group(process.pid)
+                process.communicate()
+                raise violation
+    finally:
+        if process.poll() is None:
+            kill_group(process.pid)
+            process.wait()
+
+    # Orphaned grandchildren (e.g. latex) must not outlive the render
+    kill_group(process.pid)
+    if process.returncode == LIMIT_EXIT_CODE:
+        reported = parse_limit_marker(stderr, limits)
+        if reported is not None:
+            raise reported
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
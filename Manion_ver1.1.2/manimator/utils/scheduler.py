@@ -0,0 +1,232 @@
+"""Shortest-job-first scheduling of renders onto CPU slots.
+
+Render requests used to reach the workers in arrival order, so a quick
+preview could sit behind several minutes of HD rendering. Every render and
+dry run now asks the scheduler for a slot with its predicted cost (from the
+render-time estimator) and the cheapest waiting job gets the next free slot.
+Each second a job waits lowers its effective cost by RENDER_SCHEDULER_AGING
+seconds, so a long render is never starved by a stream of short ones.
+
+Each slot owns a fixed, disjoint set of cores. The render process (and the
+ffmpeg it pipes frames into) is pinned to its slot's cores, so concurrent
+renders do not bounce between cores and thrash each other's caches. Slots
+only get cores when there are at least two per slot; otherwise renders are
+not pinned.
+
+Pure ffmpeg work (manim combining partial movies, our concats and remuxes)
+is capped separately by encode slots shared across processes, so a burst of
+encodes cannot crowd out Cairo rasterization.
+
+Standard library only: render worker processes import this too.
+"""
+
+import fcntl
+import itertools
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from manimator.utils.deadline import Deadline
+
+POLICIES = ("sjf", "fifo")
+
+
+@dataclass
+class _Ticket:
+    cost: float
+    enqueued: float
+    sequence: int
+    slot: Optional[int] = field(default=None)
+
+
+def core_sets(slots: int, cpus: Optional[List[int]] = None) -> List[List[int]]:
+    """Splits the cores this process may use into one fixed set per slot.
+
+    With fewer than two cores per slot nothing is pinned (empty sets): a
+    render confined to one core could not overlap Cairo rasterization with
+    the ffmpeg it pipes frames into, and would sit idle behind a busy
+    neighbour while other cores were free.
+    """
+
+    if cpus is None:
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    if len(cpus) < 2 * slots:
+        return [[] for _ in range(slots)]
+    per_slot = len(cpus) // slots
+    return [cpus[index * per_slot:(index + 1) * per_slot] for index in range(slots)]
+
+
+class RenderScheduler:
+    """Hands out render slots, cheapest waiting job first, with aging.
+
+    Args:
+        slots (int): Concurrent renders
+        aging (float): Seconds of cost forgiven per second of waiting
+        policy (str): "sjf" (shortest job first) or "fifo" (arrival order)
+        pin_cpus (bool): Give each slot a fixed set of cores
+    """
+
+    def __init__(self, slots: int, aging: float = 0.5, policy: str = "sjf", pin_cpus: bool = True):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}'. Choose from: {', '.join(POLICIES)}")
+        self.slots = slots
+        self.aging = aging
+        self.policy = policy
+        self.cpu_sets = core_sets(slots) if pin_cpus else [[] for _ in range(slots)]
+        self._free = list(range(slots))
+        self._waiting: List[_Ticket] = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self.dispatched = 0
+
+    def _priority(self, ticket: _Ticket, now: float):
+        if self.policy == "fifo":
+            return (ticket.sequence,)
+        return (ticket.cost - self.aging * (now - ticket.enqueued), ticket.sequence)
+
+    def _next(self) -> _Ticket:
+        now = time.monotonic()
+        return min(self._waiting, key=lambda ticket: self._priority(ticket, now))
+
+    @contextmanager
+    def slot(self, cost: float, deadline: Optional["Deadline"] = None) -> Iterator[List[int]]:
+        """Waits for a slot and holds it for the duration of the block.
+
+        Args:
+            cost (float): Predicted seconds the job occupies the slot
+            deadline (Optional[Deadline]): Request deadline bounding the wait
+
+        Yields:
+            List[int]: Cores the job should run on (empty when not pinning)
+
+        Raises:
+            DeadlineExceeded: If the deadline runs out while waiting; the job
+                leaves the queue
+        """
+
+        ticket = _Ticket(cost, time.monotonic(), next(self._sequence))
+        with self._cond:
+            self._waiting.append(ticket)
+            try:
+                while not (self._free and self._next() is ticket):
+                    if deadline is not None:
+                        deadline.check("render_queue")
+                    self._cond.wait(deadline.remaining() if deadline else None)
+            except BaseException:
+                self._waiting.remove(ticket)
+                # This job may have been the one the others were waiting behind
+                self._cond.notify_all()
+                raise
+            self._waiting.remove(ticket)
+            ticket.slot = self._free.pop(0)
+            self.dispatched += 1
+            # Another slot may still be free for the next job in line
+            self._cond.notify_all()
+        try:
+            yield self.cpu_sets[ticket.slot]
+        finally:
+            with self._cond:
+                self._free.append(ticket.slot)
+                self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """Queue length, busy slots and the predicted cost of the waiting jobs."""
+        with self._cond:
+            return {
+                "policy": self.policy,
+                "slots": self.slots,
+                "running": self.slots - len(self._free),
+                "waiting": len(self._waiting),
+                "waiting_cost": round(sum(t.cost for t in self._waiting), 1),
+                "dispatched": self.dispatched,
+            }
+
+
+_scheduler: Optional[RenderScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_render_scheduler() -> RenderScheduler:
+    """Returns the process-wide render scheduler, creating it on first use.
+
+    Slots come from RENDER_SLOTS, else MANIM_RENDER_POOL_SIZE when the pool
+    is on (so the pool never queues a job itself), else the CPU count.
+    Configured further by RENDER_SCHEDULER (sjf or fifo),
+    RENDER_SCHEDULER_AGING and RENDER_PIN_CPUS.
+    """
+
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            slots = (
+                int(os.getenv("RENDER_SLOTS", "0"))
+                or int(os.getenv("MANIM_RENDER_POOL_SIZE", "0"))
+                or os.cpu_count()
+                or 1
+            )
+            _scheduler = RenderScheduler(
+                slots,
+                aging=float(os.getenv("RENDER_SCHEDULER_AGING", "0.5")),
+                policy=os.getenv("RENDER_SCHEDULER", "sjf"),
+                pin_cpus=os.getenv("RENDER_PIN_CPUS", "1") == "1",
+            )
+        return _scheduler
+
+
+def pin_to_cpus(cpus: Optional[List[int]]) -> None:
+    """Pins the calling process, and the processes it starts later, to cores."""
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+
+def encode_slot_count() -> int:
+    """FFMPEG_ENCODE_SLOTS, default half the cores (0 turns the cap off)."""
+    return int(os.getenv("FFMPEG_ENCODE_SLOTS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+@contextmanager
+def encode_slot(timeout: Optional[float] = None, poll_seconds: float = 0.05) -> Iterator[None]:
+    """Holds one of the encode slots shared by every process on this host.
+
+    Slots are lock files in FFMPEG_SLOT_DIR (default <tmp>/manimator-encode-slots);
+    the kernel releases a slot even if its holder dies.
+
+    Args:
+        timeout (Optional[float]): Longest wait for a free slot (None: no limit)
+        poll_seconds (float): How often the slots are tried
+
+    Raises:
+        TimeoutError: If no slot came free within the timeout
+    """
+
+    slots = encode_slot_count()
+    if slots <= 0:
+        yield
+        return
+    directory = os.getenv("FFMPEG_SLOT_DIR") or os.path.join(
+        tempfile.gettempdir(), "manimator-encode-slots"
+    )
+    os.makedirs(directory, exist_ok=True)
+    give_up = None if timeout is None else time.monotonic() + timeout
+    while True:
+        for index in range(slots):
+            handle = open(os.path.join(directory, f"slot{index}.lock"), "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                handle.close()
+            return
+        if give_up is not None and time.monotonic() >= give_up:
+            raise TimeoutError(f"No encode slot came free within {timeout:.0f}s")
+        time.sleep(poll_seconds)
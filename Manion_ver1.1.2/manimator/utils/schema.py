@@ -1,11 +1,83 @@
+import json
 import os
 import re
+import shutil
 import subprocess
+import sys
 import tempfile
+import time
 from contextlib import contextmanager
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 from fastapi import HTTPException
 
+from manimator.utils.deadline import Deadline, DeadlineExceeded, stage_timeout
+from manimator.utils.estimator import predict_seconds, record_render, scene_features
+from manimator.utils.ffmpeg import faststart
+from manimator.utils.artifacts import handoff, new_artifact_path
+from manimator.utils.layout import LayoutIssue
+from manimator.utils.movie_cache import get_partial_movie_cache, partial_movie_dir
+from manimator.utils.render_pool import RenderTimeout, RenderWorkerPool, get_render_pool
+from manimator.utils.render_worker import DRY_RUN_MARKER
+from manimator.utils.sandbox import RenderLimitExceeded, RenderLimits, run_limited
+from manimator.utils.scheduler import get_render_scheduler
+from manimator.utils.sections import render_sections
+from manimator.utils.tex_precompile import precompile_tex
+from manimator.utils.timeslice import render_time_sliced
+from manimator.utils.validator import ValidationResult, validate_code
+from manimator.utils.workspace import get_workspace_pool
+from manimator.utils.quality import (
+    quality_cli_args,
+    quality_config,
+    quality_dir,
+    resolve_quality,
+)
+
+
+@dataclass
+class DryRunResult:
+    """Outcome of a dry-run validation render.
+
+    Attributes:
+        ok: Whether construct() ran to the end
+        duration: Planned video duration in seconds
+        animations: Number of play() and wait() calls
+        error: The runtime error with its traceback, if construct() failed
+        scene_file: The checked file, whose frames summary() keeps
+        layout: Overlapping and off-screen mobjects, when checked
+        previews: Preview images in the artifact store by name ("poster",
+            "contact_sheet", "loop"), when requested; owned by the caller
+        slice_blocker: Why the scene cannot be time-sliced (wait_until,
+            updaters), or None
+    """
+
+    ok: bool
+    duration: float = 0.0
+    animations: int = 0
+    error: Optional[str] = None
+    scene_file: Optional[str] = None
+    layout: List[LayoutIssue] = field(default_factory=list)
+    previews: Dict[str, str] = field(default_factory=dict)
+    slice_blocker: Optional[str] = None
+
+    def summary(self) -> str:
+        """The error line and the scene code lines that led to it, for messages and repair prompts.
+
+        Only the scene file's own frames are kept, named without their server
+        path, so the summary is safe to return to clients.
+        """
+        if not self.error:
+            return ""
+        lines = self.error.strip().splitlines()
+        marker = f'File "{self.scene_file}"'
+        name = f'File "{os.path.basename(self.scene_file or "")}"'
+        frames = [line.strip().replace(marker, name) for line in lines if marker in line]
+        return "\n".join(frames[-3:] + lines[-1:])
+
+    def layout_summary(self) -> str:
+        """Layout issues as one line each, for messages and repair prompts."""
+        return "\n".join(str(issue) for issue in self.layout)
+
 
 class ManimProcessor:
     """Handles Manim animation processing, including code extraction and video rendering.
@@ -14,8 +86,15 @@ class ManimProcessor:
     - Creating temporary directories for processing
     - Extracting Python code from model response
     - Saving and rendering Manim scenes
+
+    Attributes:
+        bytes_copied (int): Video bytes copied while handing rendered files
+            to the artifact store; stays 0 on a single filesystem
     """
 
+    def __init__(self):
+        self.bytes_copied = 0
+
     @contextmanager
     def create_temp_dir(self):
         """Creates and manages a temporary directory for processing Manim files.
@@ -24,20 +103,21 @@ class ManimProcessor:
             str: Path to the temporary directory
 
         Note:
-            Automatically cleans up directory and contents when context exits
+            Taken from the workspace pool (RENDER_WORKSPACE_DIR) when it is
+            on and has room (see workspace), otherwise created on disk.
+            Emptied when the context exits
         """
 
+        pool = get_workspace_pool()
+        if pool is not None:
+            with pool.workspace() as temp_dir:
+                yield temp_dir
+            return
         temp_dir = tempfile.mkdtemp()
         try:
             yield temp_dir
         finally:
-            if os.path.exists(temp_dir):
-                for root, dirs, files in os.walk(temp_dir, topdown=False):
-                    for name in files:
-                        os.remove(os.path.join(root, name))
-                    for name in dirs:
-                        os.rmdir(os.path.join(root, name))
-                os.rmdir(temp_dir)
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
     def extract_code(self, response: str) -> Optional[str]:
         """Extracts Python code blocks from the model's response.
@@ -53,6 +133,19 @@ class ManimProcessor:
         match = re.search(pattern, response, re.DOTALL)
         return match.group(1).strip() if match else None
 
+    def validate_code(self, code: str) -> ValidationResult:
+        """Statically checks code before it is saved and rendered.
+
+        Args:
+            code (str): Extracted Manim code
+
+        Returns:
+            ValidationResult: Renderable scene classes and diagnostics; render
+                only if `ok`
+        """
+
+        return validate_code(code)
+
     def save_code(self, code: str, temp_dir: str) -> str:
         """Saves Manim code to a temporary Python file.
 
@@ -70,8 +163,138 @@ class ManimProcessor:
             f.write(code)
         return scene_file
 
+    def dry_run(
+        self,
+        scene_file: str,
+        scene_name: str,
+        temp_dir: str,
+        deadline: Optional[Deadline] = None,
+        layout: Optional[bool] = None,
+        previews: Optional[bool] = None,
+    ) -> DryRunResult:
+        """Runs the scene's construct() without rendering, as a check before the real render.
+
+        Every animation is built and advanced to its end state, so runtime
+        errors (bad keyword arguments, missing mobject methods, LaTeX errors)
+        show up within seconds instead of minutes into an encode. Runs on the
+        warm worker pool when there is one, otherwise in a render_worker
+        process, under the same resource limits as a render.
+
+        Args:
+            scene_file (str): Path to the Python file containing the scene
+            scene_name (str): Name of the scene class to check
+            temp_dir (str): Working directory; compiled TeX left here is
+                reused by the render
+            deadline (Optional[Deadline]): Request deadline. Without one,
+                DRY_RUN_TIMEOUT_SECONDS applies
+            layout (Optional[bool]): Snapshot mobject bounding boxes after
+                every play() and wait() and report overlaps and mobjects
+                outside the frame. Defaults to RENDER_LAYOUT_CHECK
+            previews (Optional[bool]): Draw the end frame of every play() once
+                and write a poster frame, a contact sheet and a low-fps loop
+                (PREVIEW_LOOP_FORMAT, gif or webp) to the artifact store.
+                Defaults to PREVIEW_ARTIFACTS
+
+        Returns:
+            DryRunResult: Planned duration, animation count, layout issues and
+                previews, or the error. Running out of time or over a limit is
+                reported as an error too
+
+        Raises:
+            DeadlineExceeded: If the request deadline runs out
+        """
+
+        timeout = float(os.getenv("DRY_RUN_TIMEOUT_SECONDS", "120"))
+        if layout is None:
+            layout = os.getenv("RENDER_LAYOUT_CHECK", "1") == "1"
+        if previews is None:
+            previews = os.getenv("PREVIEW_ARTIFACTS", "0") == "1"
+        preview_paths = {}
+        if previews:
+            loop_format = os.getenv("PREVIEW_LOOP_FORMAT", "gif")
+            preview_paths = {
+                "poster": new_artifact_path(".png"),
+                "contact_sheet": new_artifact_path(".png"),
+                "loop": new_artifact_path(f".{loop_format}"),
+            }
+        job = {
+            "scene_file": scene_file,
+            "scene_name": scene_name,
+            "media_dir": temp_dir,
+            "config": quality_config("preview"),
+            "max_video_seconds": RenderLimits.from_env().max_video_seconds,
+            "layout": layout,
+            "previews": preview_paths,
+        }
+
+        pool = get_render_pool()
+        try:
+            # Dry runs are the interactive fast path: zero cost, so they go
+            # ahead of every waiting render
+            with get_render_scheduler().slot(0.0, deadline) as cpus:
+                # The budget left once the slot is ours
+                timeout = stage_timeout(deadline, "dry_run", timeout)
+                limits = RenderLimits.from_env(wall_seconds=timeout)
+                job["cpus"] = cpus
+                if pool is not None:
+                    result = pool.submit(
+                        dict(job, dry_run=True),
+                        timeout=timeout,
+                        limits=limits,
+                        output_dir=temp_dir,
+                    )
+                else:
+                    cmd = [
+                        sys.executable,
+                        "-m",
+                        "manimator.utils.render_worker",
+                        "--dry-run",
+                        json.dumps(job),
+                    ]
+                    completed = run_limited(cmd, limits, output_dir=temp_dir)
+                    marker = [
+                        line for line in completed.stdout.splitlines() if line.startswith(DRY_RUN_MARKER)
+                    ]
+                    result = json.loads(marker[-1][len(DRY_RUN_MARKER):]) if marker else {
+                        "ok": False, "error": completed.stderr or "Dry run produced no result"
+                    }
+        except (RenderTimeout, subprocess.TimeoutExpired):
+            if deadline is not None and deadline.remaining() <= 0:
+                raise DeadlineExceeded("dry_run")
+            return DryRunResult(
+                ok=False,
+                error=f"construct() did not finish within {timeout:.0f}s",
+                scene_file=scene_file,
+            )
+        except RenderLimitExceeded as e:
+            return DryRunResult(ok=False, error=e.detail["message"], scene_file=scene_file)
+        except subprocess.CalledProcessError as e:
+            return DryRunResult(ok=False, error=e.stderr or str(e), scene_file=scene_file)
+
+        if not result["ok"]:
+            return DryRunResult(ok=False, error=result["error"], scene_file=scene_file)
+        return DryRunResult(
+            ok=True,
+            duration=result["duration"],
+            animations=result["animations"],
+            layout=[LayoutIssue(**issue) for issue in result.get("layout", [])],
+            previews=result.get("previews", {}),
+            slice_blocker=result.get("slice_blocker"),
+        )
+
     def render_scene(
-        self, scene_file: str, scene_name: str, temp_dir: str
+        self,
+        scene_file: str,
+        scene_name: str,
+        temp_dir: str,
+        deadline: Optional[Deadline] = None,
+        quality: Optional[str] = None,
+        sections: Optional[bool] = None,
+        segment_log: Optional[str] = None,
+        time_slices: Optional[int] = None,
+        frame_slice: Optional[Tuple[int, Optional[int]]] = None,
+        planned: Optional[DryRunResult] = None,
+        fast_start: Optional[bool] = None,
     ) -> Optional[str]:
         """Renders a Manim scene to video.
 
@@ -79,36 +302,239 @@ class ManimProcessor:
             scene_file (str): Path to the Python file containing the scene
             scene_name (str): Name of the scene class to render
             temp_dir (str): Directory for output media files
+            deadline (Optional[Deadline]): Request deadline bounding the render.
+                Without one, RENDER_TIMEOUT_SECONDS applies
+            quality (Optional[str]): Quality profile from QUALITY_PROFILES.
+                Defaults to RENDER_QUALITY, then "low" (480p15)
+            sections (Optional[bool]): Render the scene's sections in parallel
+                and join them. Defaults to RENDER_PARALLEL_SECTIONS; scenes
+                without sections are rendered whole
+            segment_log (Optional[str]): File to append each finished partial
+                movie to while rendering, for streaming (see streaming). Off
+                with sections, which finish out of order
+            time_slices (Optional[int]): Experimental: render the video as this
+                many contiguous time slices in parallel and join them.
+                Defaults to RENDER_TIME_SLICES (0, off); used when sections
+                do not apply
+            frame_slice (Optional[Tuple[int, Optional[int]]]): Render only
+                video frames [start, end) (end None: to the last frame), as
+                one slice of a time-sliced render
+            planned (Optional[DryRunResult]): This scene's dry run, if the
+                caller already did one; a time-sliced render reads its length
+                from it instead of running another
+            fast_start (Optional[bool]): Move the MP4's moov atom to the front.
+                Defaults to RENDER_FASTSTART; off for time slices, which are
+                joined into a faststart file anyway
+
+        Note:
+            Renders on the warm worker pool when MANIM_RENDER_POOL_SIZE > 0,
+            otherwise spawns the manim CLI. Partial movie files are shared
+            across jobs through the partial movie cache. The final MP4 gets
+            its moov atom at the front (see fast_start). Renders wait for a
+            slot of the shortest-job-first scheduler, predicted cost from the
+            render-time estimator, at most until the deadline; the render
+            timeout is what is left once the slot is taken. They run pinned
+            to the slot's cores. Render
+            times are recorded to calibrate the estimator (RENDER_TIMINGS)
 
         Returns:
-            Optional[str]: Path to rendered video file if successful, None otherwise
+            Optional[str]: Path to the rendered video in the artifact store
+                (owned by the caller) if successful, None otherwise
 
         Raises:
-            HTTPException: If rendering fails with status code 500
+            HTTPException: If the quality is unknown (400), rendering fails
+                (500) or times out (504)
+            RenderLimitExceeded: If the render crosses a RenderLimits limit
+                (RENDER_CPU_SECONDS, RENDER_MAX_RSS_MB, RENDER_MAX_OUTPUT_MB,
+                RENDER_MAX_VIDEO_SECONDS or the timeout); its process group
+                is killed and the detail names the limit
         """
 
+        try:
+            quality = resolve_quality(quality)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        with open(scene_file) as f:
+            code = f.read()
+        # Compile the scene's formulas in parallel up front; the render then
+        # only reads cached SVGs
+        precompile_tex(
+            code,
+            timeout=stage_timeout(
+                deadline,
+                "tex_precompile",
+                float(os.getenv("TEX_PRECOMPILE_TIMEOUT_SECONDS", "60")),
+            ),
+        )
+
+        if sections is None:
+            sections = os.getenv("RENDER_PARALLEL_SECTIONS", "0") == "1"
+        if sections and segment_log is None and frame_slice is None:
+            video_path = render_sections(
+                self, scene_file, scene_name, temp_dir, deadline=deadline, quality=quality
+            )
+            if video_path:
+                return video_path
+        if time_slices is None:
+            time_slices = int(os.getenv("RENDER_TIME_SLICES", "0"))
+        if time_slices > 1 and segment_log is None and frame_slice is None:
+            video_path = render_time_sliced(
+                self, scene_file, scene_name, temp_dir, deadline, quality, time_slices, planned
+            )
+            if video_path:
+                return video_path
+
+        # Segments this scene rendered in earlier jobs are linked in, so manim
+        # only encodes the animations that changed. A slice's segments hold
+        # only part of their animation, so slices neither use nor fill it
+        movie_cache = get_partial_movie_cache() if frame_slice is None else None
+        partial_dir = partial_movie_dir(temp_dir, scene_file, scene_name, quality)
+        cached = encoded = 0
+        if movie_cache is not None:
+            cached = movie_cache.populate(partial_dir, scene_name, quality)
+
+        pool = get_render_pool()
+        features = scene_features(code, [scene_name]).get(scene_name)
+        cost = predict_seconds(features, quality) if features is not None else 0.0
+        try:
+            # Cheapest predicted render first; waiting long enough ages a job forward
+            with get_render_scheduler().slot(cost, deadline) as cpus:
+                # The budget left once the slot is ours
+                timeout = stage_timeout(
+                    deadline, "render", float(os.getenv("RENDER_TIMEOUT_SECONDS", "1800"))
+                )
+                limits = RenderLimits.from_env(wall_seconds=timeout)
+                # Only the render itself is timed, not the wait for the slot
+                started = time.monotonic()
+                if pool is not None:
+                    video_path = self._render_pooled(
+                        pool, scene_file, scene_name, temp_dir, quality, limits, deadline,
+                        segment_log, cpus, frame_slice,
+                    )
+                else:
+                    video_path = self._render_cli(
+                        scene_file, scene_name, temp_dir, quality, limits, deadline,
+                        segment_log, cpus, frame_slice,
+                    )
+                render_seconds = time.monotonic() - started
+        finally:
+            # Also after a failure: the segments before it are valid for the retry
+            if movie_cache is not None:
+                encoded = movie_cache.harvest(partial_dir, scene_name, quality)
+
+        if not video_path or not os.path.exists(video_path):
+            return None
+        if fast_start is None:
+            fast_start = os.getenv("RENDER_FASTSTART", "1") == "1"
+        if fast_start:
+            faststart(video_path, timeout=stage_timeout(deadline, "faststart", 300))
+
+        # Renamed out of temp_dir before it is deleted, not copied
+        artifact_path, copied = handoff(video_path)
+        self.bytes_copied += copied
+        # A render served mostly from cached segments says little about the
+        # scene's cost, so it is not recorded
+        if (
+            os.getenv("RENDER_TIMINGS", "1") == "1"
+            and features is not None
+            and frame_slice is None
+            and cached <= encoded
+        ):
+            try:
+                record_render(features, quality, render_seconds)
+            except OSError:
+                pass  # Calibration data is best-effort
+        return artifact_path
+
+    def _render_cli(
+        self,
+        scene_file: str,
+        scene_name: str,
+        temp_dir: str,
+        quality: str,
+        limits: RenderLimits,
+        deadline: Optional[Deadline],
+        segment_log: Optional[str] = None,
+        cpus: Optional[List[int]] = None,
+        frame_slice: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> str:
+        """Renders by spawning the manim CLI under limits and returns the expected video path."""
+
+        # No -p: renders run on headless servers, there is no player to open.
+        # The render_worker entry point is the manim CLI plus the shared TeX cache
         cmd = [
-            "manim",
-            "-pql",
+            sys.executable,
+            "-m",
+            "manimator.utils.render_worker",
+            *quality_cli_args(quality),
+            *(["--disable_caching"] if frame_slice else []),
             "--media_dir",
             temp_dir,
             scene_file,
             scene_name,
         ]
 
+        env = dict(
+            os.environ,
+            MANIMATOR_MAX_VIDEO_SECONDS=str(limits.max_video_seconds or 0),
+            MANIMATOR_SEGMENT_LOG=segment_log or "",
+            MANIMATOR_CPUS=",".join(str(cpu) for cpu in cpus or []),
+            MANIMATOR_FRAME_SLICE=(
+                f"{frame_slice[0]},{'' if frame_slice[1] is None else frame_slice[1]}"
+                if frame_slice
+                else ""
+            ),
+        )
         try:
-            subprocess.run(cmd, check=True, capture_output=True, text=True)
-            video_path = os.path.join(
-                temp_dir, "videos", "scene", "480p15", f"{scene_name}.mp4"
-            )
+            run_limited(cmd, limits, output_dir=temp_dir, env=env)
+        except subprocess.TimeoutExpired:
+            self._raise_timeout(limits.wall_seconds, deadline)
+        except subprocess.CalledProcessError as e:
+            raise HTTPException(status_code=500, detail=f"Render error: {e.stderr}")
+        return os.path.join(
+            temp_dir, "videos", "scene", quality_dir(quality), f"{scene_name}.mp4"
+        )
 
-            if not os.path.exists(video_path):
-                return None
+    def _render_pooled(
+        self,
+        pool: RenderWorkerPool,
+        scene_file: str,
+        scene_name: str,
+        temp_dir: str,
+        quality: str,
+        limits: RenderLimits,
+        deadline: Optional[Deadline],
+        segment_log: Optional[str] = None,
+        cpus: Optional[List[int]] = None,
+        frame_slice: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> str:
+        """Renders on a warm pool worker under limits and returns the rendered video path."""
 
-            temp_video = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-            with open(video_path, "rb") as f:
-                temp_video.write(f.read())
-            return temp_video.name
+        job = {
+            "scene_file": scene_file,
+            "scene_name": scene_name,
+            "media_dir": temp_dir,
+            "config": dict(quality_config(quality), disable_caching=bool(frame_slice)),
+            "max_video_seconds": RenderLimits.from_env().max_video_seconds,
+            "segment_log": segment_log,
+            "cpus": cpus,
+            "frame_slice": frame_slice,
+        }
+        try:
+            result = pool.submit(
+                job, timeout=limits.wall_seconds, limits=limits, output_dir=temp_dir
+            )
+        except RenderTimeout:
+            self._raise_timeout(limits.wall_seconds, deadline)
+        if result.get("limit"):
+            limit = result["limit"]
+            raise RenderLimitExceeded(limit, result["value"], getattr(limits, limit))
+        if not result["ok"]:
+            raise HTTPException(status_code=500, detail=f"Render error: {result['error']}")
+        return result["video_path"]
 
-        except subprocess.CalledProcessError as e:
-            raise HTTPException(status_code=500, detail=f"Render error: {e.stderr}")
+    @staticmethod
+    def _raise_timeout(timeout: Optional[float], deadline: Optional[Deadline]) -> None:
+        if deadline is not None and deadline.remaining() <= 0:
+            raise DeadlineExceeded("render")
+        raise RenderLimitExceeded("wall_seconds", timeout, timeout, status_code=504)
@@ -0,0 +1,211 @@
+"""Section-parallel rendering of a single scene.
+
+Generated scenes call one helper method per concept from `construct`. The
+construct body is cut into sections at those calls (and after top-level
+FadeOut plays), and one sub-scene per section is rendered in parallel. Each
+sub-scene re-runs the earlier sections with manim's
+`next_section(skip_animations=True)`, so it starts from exactly the state the
+full render would have reached, without rendering or encoding those frames.
+The section videos are then joined with ffmpeg stream copy.
+"""
+
+import ast
+import os
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional
+
+from manimator.utils.artifacts import new_artifact_path
+from manimator.utils.deadline import Deadline, stage_timeout
+from manimator.utils.ffmpeg import concat_videos
+
+if TYPE_CHECKING:
+    from manimator.utils.schema import ManimProcessor
+
+MIN_SECTIONS = 2
+
+
+def _find_scene_class(tree: ast.Module, scene_name: str) -> Optional[ast.ClassDef]:
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == scene_name:
+            return node
+    return None
+
+
+def _self_call(stmt: ast.stmt) -> Optional[str]:
+    """Method name if stmt is a bare `self.<name>(...)` call."""
+    if not isinstance(stmt, ast.Expr) or not isinstance(stmt.value, ast.Call):
+        return None
+    func = stmt.value.func
+    if (
+        isinstance(func, ast.Attribute)
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "self"
+    ):
+        return func.attr
+    return None
+
+
+def _is_fade_out_play(stmt: ast.stmt) -> bool:
+    return _self_call(stmt) == "play" and any(
+        isinstance(node, ast.Name) and node.id == "FadeOut" for node in ast.walk(stmt)
+    )
+
+
+def split_sections(code: str, scene_name: str) -> Optional[List[List[ast.stmt]]]:
+    """Cuts a scene's construct body into sections.
+
+    A new section starts at every call to a helper method of the scene and
+    after every top-level `self.play(FadeOut(...))`; trailing `self.wait()`
+    calls stay with the section they follow.
+
+    Args:
+        code (str): Manim code
+        scene_name (str): Scene class to split
+
+    Returns:
+        Optional[List[List[ast.stmt]]]: Statements of each section, or None if
+            the code does not parse or yields fewer than MIN_SECTIONS sections
+    """
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    scene = _find_scene_class(tree, scene_name)
+    if scene is None:
+        return None
+    methods = {
+        node.name: node
+        for node in scene.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+    construct = methods.get("construct")
+    if construct is None:
+        return None
+
+    sections: List[List[ast.stmt]] = [[]]
+    cut_pending = False
+    for stmt in construct.body:
+        name = _self_call(stmt)
+        starts_section = cut_pending and name != "wait"
+        if name in methods and name != "construct" and sections[-1]:
+            starts_section = True
+        if starts_section:
+            sections.append([])
+            cut_pending = False
+        sections[-1].append(stmt)
+        if (name in methods and name != "construct") or _is_fade_out_play(stmt):
+            cut_pending = True
+
+    sections = [section for section in sections if section]
+    return sections if len(sections) >= MIN_SECTIONS else None
+
+
+def _section_class_name(scene_name: str, index: int) -> str:
+    return f"{scene_name}Section{index:02d}"
+
+
+def build_section_scenes(code: str, scene_name: str) -> Optional[tuple]:
+    """Appends one sub-scene class per section to the code.
+
+    Sub-scene k subclasses the scene and overrides construct with sections
+    0..k: the earlier ones run with animations skipped, section k renders.
+
+    Returns:
+        Optional[tuple]: (code with sub-scenes, sub-scene class names), or None
+            if the scene cannot be split
+    """
+
+    sections = split_sections(code, scene_name)
+    if sections is None:
+        return None
+
+    def body(statements: List[ast.stmt]) -> str:
+        return textwrap.indent(
+            "\n".join(ast.unparse(stmt) for stmt in statements), " " * 8
+        )
+
+    names = []
+    classes = []
+    for index, section in enumerate(sections):
+        name = _section_class_name(scene_name, index)
+        names.append(name)
+        lines = [f"class {name}({scene_name}):", "    def construct(self):"]
+        if index > 0:
+            lines.append("        self.next_section(skip_animations=True)")
+            lines.append(body([stmt for earlier in sections[:index] for stmt in earlier]))
+        lines.append(f"        self.next_section({name!r})")
+        lines.append(body(section))
+        classes.append("\n".join(lines))
+    return code + "\n\n\n" + "\n\n\n".join(classes) + "\n", names
+
+
+def render_sections(
+    processor: "ManimProcessor",
+    scene_file: str,
+    scene_name: str,
+    temp_dir: str,
+    deadline: Optional[Deadline] = None,
+    quality: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Optional[str]:
+    """Renders a scene section by section in parallel and joins the result.
+
+    Args:
+        processor (ManimProcessor): Processor used to render each section
+        scene_file (str): Path to the saved scene file
+        scene_name (str): Scene class to render
+        temp_dir (str): Working directory of this render
+        deadline (Optional[Deadline]): Request deadline bounding every section
+        quality (Optional[str]): Quality profile for every section
+        workers (Optional[int]): Concurrent section renders. Defaults to
+            SECTION_RENDER_WORKERS, then the CPU count
+
+    Returns:
+        Optional[str]: Path to the joined video, or None if the scene has no
+            sections to split on (the caller should render it whole)
+    """
+
+    with open(scene_file) as f:
+        built = build_section_scenes(f.read(), scene_name)
+    if built is None:
+        return None
+    code, section_names = built
+
+    section_root = os.path.join(temp_dir, "sections")
+    os.makedirs(section_root)
+    # Same file name as the whole-scene render, so outputs land in videos/scene/
+    section_file = os.path.join(section_root, "scene.py")
+    with open(section_file, "w") as f:
+        f.write(code)
+
+    def render(index_name):
+        index, name = index_name
+        media_dir = os.path.join(section_root, f"media{index:02d}")
+        os.makedirs(media_dir)
+        return processor.render_scene(
+            section_file, name, media_dir, deadline=deadline, quality=quality, sections=False
+        )
+
+    workers = workers or int(os.getenv("SECTION_RENDER_WORKERS", "0")) or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, len(section_names))) as executor:
+        futures = [executor.submit(render, item) for item in enumerate(section_names)]
+    pieces = [future.result() for future in futures if not future.exception()]
+    try:
+        for future in futures:
+            if future.exception():
+                raise future.exception()
+        if not all(pieces):
+            return None
+        output = new_artifact_path()
+        try:
+            return concat_videos(pieces, output, timeout=stage_timeout(deadline, "render"))
+        except Exception:
+            if os.path.exists(output):
+                os.remove(output)
+            raise
+    finally:
+        for piece in pieces:
+            if piece and os.path.exists(piece):
+                os.remove(piece)
@@ -0,0 +1,148 @@
+"""Local retrieval index over the curated Manim snippet library."""
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from manimator.few_shot.manim_snippets import MANIM_SNIPPETS, MANIM_SNIPPETS_VERSION
+
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9]+")
+_TAG_WEIGHT = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase word tokens with a light plural stemming.
+
+    Args:
+        text (str): Free text to tokenize
+
+    Returns:
+        List[str]: Normalized tokens
+    """
+
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class SnippetIndex:
+    """BM25 index over snippet names, titles and tags.
+
+    Tags are repeated so that curated keywords outweigh incidental words in the
+    title. The index is tiny and built in memory, so no external search service
+    is needed.
+    """
+
+    def __init__(self, snippets: List[Dict], k1: float = 1.2, b: float = 0.75):
+        self.snippets = snippets
+        self.k1 = k1
+        self.b = b
+        self.documents = [self._document_terms(snippet) for snippet in snippets]
+        self.avg_length = (
+            sum(len(doc) for doc in self.documents) / len(self.documents)
+            if self.documents
+            else 0.0
+        )
+        self.term_counts = [Counter(doc) for doc in self.documents]
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        total = len(self.documents)
+        self.idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5))
+            for term, freq in document_frequency.items()
+        }
+
+    @staticmethod
+    def _document_terms(snippet: Dict) -> List[str]:
+        terms = tokenize(snippet["name"].replace("_", " ")) + tokenize(snippet["title"])
+        for tag in snippet["tags"]:
+            terms.extend(tokenize(tag) * _TAG_WEIGHT)
+        return terms
+
+    def score(self, query: str) -> List[float]:
+        """Scores every snippet against a query.
+
+        Args:
+            query (str): Scene description or prompt text
+
+        Returns:
+            List[float]: BM25 score per snippet, in library order
+        """
+
+        query_terms = set(tokenize(query))
+        scores = []
+        for doc, counts in zip(self.documents, self.term_counts):
+            length_norm = 1 - self.b + self.b * len(doc) / (self.avg_length or 1)
+            total = 0.0
+            for term in query_terms:
+                freq = counts.get(term)
+                if not freq:
+                    continue
+                total += self.idf[term] * freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+            scores.append(total)
+        return scores
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0) -> List[Dict]:
+        """Returns the top-k snippets for a query.
+
+        Args:
+            query (str): Scene description or prompt text
+            k (int): Maximum number of snippets to return
+            min_score (float): Snippets scoring at or below this are dropped
+
+        Returns:
+            List[Dict]: Matching snippets, best first
+        """
+
+        ranked = sorted(
+            zip(self.score(query), range(len(self.snippets))),
+            key=lambda item: (-item[0], item[1]),
+        )
+        return [self.snippets[i] for score, i in ranked[:k] if score > min_score]
+
+
+@lru_cache(maxsize=None)
+def get_default_index() -> SnippetIndex:
+    """Builds (once) the index over the bundled snippet library."""
+    return SnippetIndex(MANIM_SNIPPETS)
+
+
+def retrieve_snippets(query: str, k: int = 3, index: Optional[SnippetIndex] = None) -> List[Dict]:
+    """Retrieves the snippets most relevant to a scene description.
+
+    Args:
+        query (str): Scene description or prompt text
+        k (int): Maximum number of snippets to return
+        index (Optional[SnippetIndex]): Index to search. Defaults to the bundled library
+
+    Returns:
+        List[Dict]: Matching snippets, best first
+    """
+
+    return (index or get_default_index()).search(query, k=k)
+
+
+def format_snippets(snippets: List[Dict]) -> str:
+    """Renders snippets as a prompt section of fenced reference code.
+
+    Args:
+        snippets (List[Dict]): Snippets returned by retrieve_snippets
+
+    Returns:
+        str: Markdown block to embed in the system prompt
+    """
+
+    parts = []
+    for snippet in snippets:
+        parts.append(f"# {snippet['title']}\n```python\n{snippet['code']}\n```")
+    header = (
+        f"Known-good reference snippets (verified against Manim Community v{MANIM_SNIPPETS_VERSION}). "
+        "Reuse these APIs and patterns; do not copy them verbatim:"
+    )
+    return header + "\n\n" + "\n\n".join(parts)
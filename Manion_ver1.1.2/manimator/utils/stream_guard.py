@@ -0,0 +1,110 @@
+"""Incremental guard rules for streamed code generation completions."""
+
+import os
+import re
+from typing import Optional
+
+# Rough chars-per-token ratio for English text and Python code; exact token
+# counts are not needed to decide that a completion has gone off the rails.
+CHARS_PER_TOKEN = 4
+
+_FENCE_OPEN = "```python"
+_SCENE_CLASS_PATTERN = re.compile(r"^\s*class\s+\w+\s*\(\s*(?:\w+\.)*\w*Scene\s*\)\s*:", re.MULTILINE)
+
+
+class StreamGuardViolation(Exception):
+    """Raised when a streamed completion breaks a guard rule."""
+
+    def __init__(self, rule: str, detail: str):
+        self.rule = rule
+        self.detail = detail
+        super().__init__(f"{rule}: {detail}")
+
+
+class StreamGuard:
+    """Evaluates guard rules on a completion as it streams in.
+
+    Rules:
+        - no_code_fence: no ```python fence within `fence_within_tokens`
+        - extra_scene: more than `max_scenes` Scene subclasses in the code block
+        - length_cap: output longer than `max_tokens`
+
+    feed() returns True once the first python block has closed, which is all
+    extract_code ever uses, so callers can stop reading the stream there.
+    """
+
+    def __init__(
+        self,
+        fence_within_tokens: int = 300,
+        max_tokens: int = 6000,
+        max_scenes: Optional[int] = 1,
+    ):
+        self.fence_within_tokens = fence_within_tokens
+        self.max_tokens = max_tokens
+        self.max_scenes = max_scenes
+        self.text = ""
+        self.code_start: Optional[int] = None
+        self._scanned_to = 0
+        self.scene_count = 0
+
+    @classmethod
+    def from_env(cls) -> "StreamGuard":
+        """Builds a guard from CODE_GEN_STREAM_* env variables."""
+        max_scenes = int(os.getenv("CODE_GEN_STREAM_MAX_SCENES", "1"))
+        return cls(
+            fence_within_tokens=int(os.getenv("CODE_GEN_STREAM_FENCE_TOKENS", "300")),
+            max_tokens=int(os.getenv("CODE_GEN_STREAM_MAX_TOKENS", "6000")),
+            max_scenes=max_scenes if max_scenes > 0 else None,
+        )
+
+    @property
+    def approx_tokens(self) -> int:
+        return len(self.text) // CHARS_PER_TOKEN
+
+    def feed(self, delta: str) -> bool:
+        """Adds a streamed delta and checks every rule.
+
+        Args:
+            delta (str): Newly received completion text
+
+        Returns:
+            bool: True if the code block is complete and streaming can stop
+
+        Raises:
+            StreamGuardViolation: If a rule is broken
+        """
+
+        self.text += delta
+        if self.approx_tokens > self.max_tokens:
+            raise StreamGuardViolation(
+                "length_cap", f"output exceeded ~{self.max_tokens} tokens"
+            )
+
+        if self.code_start is None:
+            fence = self.text.find(_FENCE_OPEN)
+            if fence < 0:
+                if self.approx_tokens > self.fence_within_tokens:
+                    raise StreamGuardViolation(
+                        "no_code_fence",
+                        f"no ```python fence within ~{self.fence_within_tokens} tokens",
+                    )
+                return False
+            self.code_start = fence + len(_FENCE_OPEN)
+            self._scanned_to = self.code_start
+
+        closing = self.text.find("```", self.code_start)
+        code_end = closing if closing >= 0 else len(self.text)
+
+        # Only scan complete lines that have not been scanned yet
+        last_newline = self.text.rfind("\n", self._scanned_to, code_end)
+        scan_end = code_end if closing >= 0 else last_newline + 1
+        if scan_end > self._scanned_to:
+            self.scene_count += len(_SCENE_CLASS_PATTERN.findall(self.text, self._scanned_to, scan_end))
+            self._scanned_to = scan_end
+            if self.max_scenes is not None and self.scene_count > self.max_scenes:
+                raise StreamGuardViolation(
+                    "extra_scene",
+                    f"found {self.scene_count} Scene classes, expected at most {self.max_scenes}",
+                )
+
+        return closing >= 0
@@ -0,0 +1,256 @@
+"""Streaming renders: HLS segments published while the scene is still rendering.
+
+manim encodes one partial movie file per play()/wait(), each starting on a
+keyframe. The render worker appends every finished one to a segment log (see
+render_worker.install_segment_log); a publisher thread tails that log,
+stream-copies each partial movie into an MPEG-TS segment and appends it to a
+growing HLS event playlist. Clients can start playing the opening animations
+while later ones are still being rendered. When the render ends the playlist
+is closed and the faststart MP4 is published next to it.
+"""
+
+import math
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+from manimator.utils.artifacts import artifact_dir, new_artifact_path
+from manimator.utils.ffmpeg import concat_videos, remux_to_ts
+from manimator.utils.schema import ManimProcessor
+
+PLAYLIST_NAME = "index.m3u8"
+POLL_SECONDS = 0.25
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("STREAMING_RENDER_WORKERS", "2")),
+    thread_name_prefix="streaming-render",
+)
+_streams: "OrderedDict[str, StreamingRender]" = OrderedDict()
+_streams_lock = threading.Lock()
+_MAX_TRACKED_STREAMS = 512
+
+
+class HlsPlaylist:
+    """An HLS event playlist that grows as segments are published.
+
+    Every change rewrites the file atomically, so a client never reads a
+    half-written playlist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.segments: List[Tuple[str, float]] = []
+        # Indices of segments that follow a gap in the stream
+        self.discontinuities: Set[int] = set()
+        self.ended = False
+        self._write()
+
+    def add(self, name: str, duration: float, discontinuity: bool = False) -> None:
+        if discontinuity:
+            self.discontinuities.add(len(self.segments))
+        self.segments.append((name, duration))
+        self._write()
+
+    def end(self) -> None:
+        self.ended = True
+        self._write()
+
+    def render(self) -> str:
+        target = max([1, *(math.ceil(duration) for _, duration in self.segments)])
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+        ]
+        for index, (name, duration) in enumerate(self.segments):
+            if index in self.discontinuities:
+                lines.append("#EXT-X-DISCONTINUITY")
+            lines += [f"#EXTINF:{duration:.3f},", name]
+        if self.ended:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def _write(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.path)
+
+
+class SegmentPublisher(threading.Thread):
+    """Tails a segment log and publishes each listed partial movie as an HLS segment."""
+
+    def __init__(self, segment_log: str, playlist: HlsPlaylist):
+        super().__init__(daemon=True, name="segment-publisher")
+        self.segment_log = segment_log
+        self.playlist = playlist
+        self.elapsed = 0.0
+        self.error: Optional[str] = None
+        self._offset = 0
+        self._gap = False
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        while True:
+            stopping = self._stopping.is_set()
+            self.publish_pending()
+            if stopping:
+                return
+            self._stopping.wait(POLL_SECONDS)
+
+    def publish_pending(self) -> None:
+        """Publishes the partial movies logged since the last call."""
+        if not os.path.exists(self.segment_log):
+            return
+        with open(self.segment_log) as f:
+            f.seek(self._offset)
+            lines = f.readlines()
+        for line in lines:
+            if not line.endswith("\n"):
+                break  # The worker is still writing this entry
+            self._offset += len(line.encode())
+            path, _, duration = line.rstrip("\n").partition("\t")
+            name = f"segment{len(self.playlist.segments):05d}.ts"
+            try:
+                remux_to_ts(
+                    path, os.path.join(os.path.dirname(self.playlist.path), name), self.elapsed
+                )
+            except Exception as e:
+                # The segment's time still passes, so later segments keep
+                # their timestamps; players are told to expect the jump
+                self.error = getattr(e, "detail", None) or str(e)
+                self.elapsed += float(duration)
+                self._gap = True
+                continue
+            self.playlist.add(name, float(duration), discontinuity=self._gap)
+            self.elapsed += float(duration)
+            self._gap = False
+
+    def stop(self) -> None:
+        """Publishes what is left in the log and waits for the thread to end."""
+        self._stopping.set()
+        self.join()
+
+
+@dataclass
+class StreamingRender:
+    """A render whose video is published as HLS segments while it runs.
+
+    Attributes:
+        stream_id: Id for looking the stream up later
+        directory: Directory holding the playlist, segments and final video
+        video_path: Final faststart MP4, once the render has finished
+        error: Render error, if it failed (segments published so far stay)
+    """
+
+    stream_id: str
+    directory: str
+    video_path: Optional[str] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def playlist_path(self) -> str:
+        return os.path.join(self.directory, PLAYLIST_NAME)
+
+    @property
+    def done(self) -> bool:
+        return self.future is None or self.future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Blocks until the render ends and returns the final video path."""
+        if self.future is not None:
+            self.future.exception(timeout=timeout)
+        return self.video_path
+
+
+def _render(stream: StreamingRender, code: str, scene_names: List[str], quality: Optional[str]) -> None:
+    playlist = HlsPlaylist(stream.playlist_path)
+    processor = ManimProcessor()
+    try:
+        with processor.create_temp_dir() as temp_dir:
+            segment_log = os.path.join(temp_dir, "segments.log")
+            publisher = SegmentPublisher(segment_log, playlist)
+            publisher.start()
+            videos = []
+            try:
+                scene_file = processor.save_code(code, temp_dir)
+                # Scenes one after another, so segments arrive in playback order
+                for index, name in enumerate(scene_names):
+                    media_dir = os.path.join(temp_dir, f"media{index:02d}")
+                    os.makedirs(media_dir)
+                    video = processor.render_scene(
+                        scene_file, name, media_dir, quality=quality, segment_log=segment_log
+                    )
+                    if not video:
+                        raise RuntimeError(f"Failed to render {name}")
+                    videos.append(video)
+            finally:
+                # Drained before temp_dir and its partial movies are removed
+                publisher.stop()
+        if len(videos) > 1:
+            joined = concat_videos(videos, new_artifact_path())
+            for video in videos:
+                os.remove(video)
+            videos = [joined]
+        stream.video_path = os.path.join(stream.directory, "video.mp4")
+        os.replace(videos[0], stream.video_path)
+    except Exception as e:
+        stream.error = getattr(e, "detail", None) or str(e)
+        raise
+    finally:
+        playlist.end()
+
+
+def start_streaming_render(
+    code: str, scene_names: List[str], quality: Optional[str] = None
+) -> StreamingRender:
+    """Starts rendering code in the background, publishing HLS segments as they finish.
+
+    Args:
+        code (str): Manim code to render
+        scene_names (List[str]): Scene classes to render, in playback order
+        quality (Optional[str]): Quality profile (RENDER_QUALITY by default)
+
+    Returns:
+        StreamingRender: Handle whose playlist starts filling right away
+    """
+
+    stream_id = uuid.uuid4().hex
+    directory = os.path.join(artifact_dir(), "streams", stream_id)
+    os.makedirs(directory)
+    stream = StreamingRender(stream_id=stream_id, directory=directory)
+    # The playlist exists before the first segment, so clients can poll it
+    HlsPlaylist(stream.playlist_path)
+    stream.future = _executor.submit(_render, stream, code, scene_names, quality)
+    with _streams_lock:
+        _streams[stream_id] = stream
+    _prune_streams()
+    # Streams still rendering are never evicted, so prune again as each ends
+    stream.future.add_done_callback(lambda _: _prune_streams())
+    return stream
+
+
+def _prune_streams() -> None:
+    """Forgets the oldest finished streams beyond _MAX_TRACKED_STREAMS and removes their files."""
+    with _streams_lock:
+        excess = len(_streams) - _MAX_TRACKED_STREAMS
+        if excess <= 0:
+            return
+        finished = [stream_id for stream_id, stream in _streams.items() if stream.done]
+        evicted = [_streams.pop(stream_id) for stream_id in finished[:excess]]
+    for stream in evicted:
+        shutil.rmtree(stream.directory, ignore_errors=True)
+
+
+def get_streaming_render(stream_id: str) -> Optional[StreamingRender]:
+    """Looks up a streaming render started in this process."""
+    with _streams_lock:
+        return _streams.get(stream_id)
@@ -1,4 +1,4 @@
-MANIM_SYSTEM_PROMPT = """```You are an expert in creating educational animations using Manim. Your task is to generate Python code for a Manim animation that visually explains a given topic or concept. Follow these steps:
+MANIM_INSTRUCTIONS = """```You are an expert in creating educational animations using Manim. Your task is to generate Python code for a Manim animation that visually explains a given topic or concept. Follow these steps:
 
 1. **Understand the Topic**:
    - Analyze the user's topic to identify the key concepts that need to be visualized.
@@ -26,7 +26,9 @@ MANIM_SYSTEM_PROMPT = """```You are an expert in creating educational animations
    - Provide the complete Python script that can be run using Manim.
    - Include instructions on how to run the script (e.g., command to render the animation).
    - Verify all scenes have proper cleanup and transitions.
+"""
 
+MANIM_EXAMPLE_SCENE = """
 **Example Input**:
 - Topic: "Neural Networks"
 - Key Points: "neurons and layers, weights and biases, activation functions"
@@ -183,6 +185,42 @@ if __name__ == "__main__":
     
 NOTE!!!: Make sure the objects or text in the generated code are not overlapping at any point in the video. Make sure that each scene is properly cleaned up before transitioning to the next scene."""
 
+MANIM_SYSTEM_PROMPT = MANIM_INSTRUCTIONS + MANIM_EXAMPLE_SCENE
+
+MANIM_COMPACT_INSTRUCTIONS = """You are an expert Manim Community developer. Write one Python file that animates the user's topic as an educational video.
+
+Rules:
+- Output a single ```python code block starting with `from manim import *` and defining one Scene subclass.
+- Structure `construct` as calls to helper methods, one per key concept, each ending with self.play(FadeOut(*self.mobjects)).
+- Keep every object inside x in [-7.5, 7.5] and y in [-4, 4]; space elements so nothing overlaps at any point.
+- Use Text for prose and MathTex for formulas; add self.wait() after important animations.
+- Only use public Manim APIs; prefer the patterns in the reference snippets.
+"""
+
+MANIM_MINIMAL_INSTRUCTIONS = """Write a Manim Community scene for the user's topic. Reply with one ```python block containing `from manim import *` and a single Scene subclass. Keep objects on screen (x in [-7.5, 7.5], y in [-4, 4]), never overlapping, and FadeOut(*self.mobjects) between sections.
+"""
+
+# Named prompt profiles for code generation. "full" reproduces the original
+# prompt (snippets or the example scene); the smaller profiles trade guidance
+# for fewer prompt tokens. snippet_count=0 disables retrieval for a profile.
+MANIM_PROMPT_PROFILES = {
+    "full": {
+        "instructions": MANIM_INSTRUCTIONS,
+        "example": MANIM_EXAMPLE_SCENE,
+        "snippet_count": 3,
+    },
+    "compact": {
+        "instructions": MANIM_COMPACT_INSTRUCTIONS,
+        "example": "",
+        "snippet_count": 2,
+    },
+    "minimal": {
+        "instructions": MANIM_MINIMAL_INSTRUCTIONS,
+        "example": "",
+        "snippet_count": 1,
+    },
+}
+
 
 SCENE_SYSTEM_PROMPT = """# Content Structure System
 
@@ -0,0 +1,129 @@
+"""Persistent TeX → SVG cache shared by all render processes.
+
+manim compiles every Tex/MathTex string with latex + dvisvgm into the job's
+tex_dir, which is a throwaway temp dir here, so the same formulas are
+recompiled by every job. `install_tex_cache` wraps manim's `tex_to_svg_file`
+so compiled SVGs are stored in a DiskCache keyed by the full TeX source
+(template, environment and expression) plus compiler settings. A hit is
+hard-linked into the job's tex_dir and no LaTeX runs at all.
+
+Hit and miss counts are persisted to the cache directory, so rates cover
+every worker and CLI render, not just the calling process.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+from manimator.utils.disk_cache import DiskCache
+
+_installed = False
+
+
+@lru_cache(maxsize=1)
+def get_tex_cache() -> Optional[DiskCache]:
+    """Returns the process-wide TeX cache.
+
+    Configured by TEX_CACHE_DIR (default ~/.cache/manimator/tex) and
+    TEX_CACHE_MB (default 512, 0 disables the cache).
+
+    Returns:
+        Optional[DiskCache]: The cache, or None when disabled
+    """
+
+    max_mb = float(os.getenv("TEX_CACHE_MB", "512"))
+    if max_mb <= 0:
+        return None
+    root = os.getenv("TEX_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "manimator", "tex"
+    )
+    return DiskCache(root, int(max_mb * 1024 * 1024))
+
+
+def tex_cache_key(texcode: str, tex_compiler: str, output_format: str) -> str:
+    """Cache key of a complete TeX document compiled with the given toolchain."""
+    digest = hashlib.sha256(
+        "\0".join([tex_compiler, output_format, texcode]).encode()
+    ).hexdigest()
+    return f"{digest}.svg"
+
+
+def texcode_for(expression: str, environment: Optional[str], tex_template) -> str:
+    """The TeX document manim would compile for an expression."""
+    if environment is not None:
+        return tex_template.get_texcode_for_expression_in_env(expression, environment)
+    return tex_template.get_texcode_for_expression(expression)
+
+
+def cached_tex_to_svg_file(compile_svg, expression, environment=None, tex_template=None):
+    """tex_to_svg_file backed by the shared cache.
+
+    Args:
+        compile_svg (Callable): manim's original tex_to_svg_file
+        expression, environment, tex_template: As for tex_to_svg_file
+
+    Returns:
+        Path: SVG file inside the job's tex_dir
+    """
+
+    from pathlib import Path
+
+    from manim import config
+
+    cache = get_tex_cache()
+    if cache is None:
+        return compile_svg(expression, environment=environment, tex_template=tex_template)
+    if tex_template is None:
+        tex_template = config["tex_template"]
+    key = tex_cache_key(
+        texcode_for(expression, environment, tex_template),
+        tex_template.tex_compiler,
+        tex_template.output_format,
+    )
+
+    local = Path(config.get_dir("tex_dir")) / f"cached-{key}"
+    local.parent.mkdir(parents=True, exist_ok=True)
+    if local.exists() or cache.link_to(key, str(local)):
+        return local
+    svg_file = compile_svg(expression, environment=environment, tex_template=tex_template)
+    cache.put_file(key, str(svg_file))
+    return svg_file
+
+
+def install_tex_cache() -> None:
+    """Routes manim's TeX compilation through the shared cache (idempotent)."""
+
+    global _installed
+    if _installed or get_tex_cache() is None:
+        return
+    import manim.mobject.text.tex_mobject as tex_mobject
+    import manim.utils.tex_file_writing as tex_file_writing
+
+    original = tex_file_writing.tex_to_svg_file
+
+    def tex_to_svg_file(expression, environment=None, tex_template=None):
+        return cached_tex_to_svg_file(original, expression, environment, tex_template)
+
+    tex_file_writing.tex_to_svg_file = tex_to_svg_file
+    # tex_mobject imported the function by name
+    tex_mobject.tex_to_svg_file = tex_to_svg_file
+    _installed = True
+
+
+def flush_tex_cache_stats() -> None:
+    """Adds this process's hits and misses to the persisted totals and evicts."""
+    cache = get_tex_cache()
+    if cache is None:
+        return
+    _, misses = cache.persist_stats()
+    if misses:
+        cache.evict()
+
+
+def tex_cache_stats() -> Dict[str, float]:
+    """Hit/miss totals of every process sharing the cache."""
+    cache = get_tex_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.load_stats()}
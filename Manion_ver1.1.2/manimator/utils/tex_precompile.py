@@ -0,0 +1,206 @@
+"""Ahead-of-time LaTeX compilation of the formulas in generated scene code.
+
+Without it, cold formulas compile one at a time whenever `construct()`
+reaches them. This stage reads the code's AST, collects every Tex/MathTex
+call whose TeX-relevant arguments are literals, and builds those mobjects in a
+pool of warm processes before the render starts. Building goes through the
+shared TeX cache (see tex_cache), so the render itself only links cached SVGs.
+
+Precompilation is best effort: a formula that cannot be collected or fails to
+compile here is simply compiled by the render as before.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import Dict, List, Optional
+
+from manimator.utils.tex_cache import flush_tex_cache_stats, get_tex_cache, install_tex_cache
+
+TEX_CLASSES = {"MathTex", "Tex", "SingleStringMathTex"}
+
+# Keyword arguments that change the compiled TeX; colors, sizes etc. do not
+TEX_KWARGS = {"arg_separator", "substrings_to_isolate", "tex_environment"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_in_flight: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+def collect_tex_calls(code: str) -> List[Dict]:
+    """Finds the Tex/MathTex constructions whose TeX source is known statically.
+
+    Args:
+        code (str): Manim code
+
+    Returns:
+        List[Dict]: Unique specs {"cls", "args", "kwargs"}; a tex_template from
+            TexTemplateLibrary is recorded as kwargs["tex_template"] = its name
+    """
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+
+    specs = {}
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in TEX_CLASSES
+        ):
+            continue
+        try:
+            args = [ast.literal_eval(arg) for arg in node.args]
+        except ValueError:
+            continue
+        if not args or not all(isinstance(arg, str) for arg in args):
+            continue
+
+        kwargs = {}
+        literal = True
+        for keyword in node.keywords:
+            if keyword.arg in TEX_KWARGS:
+                try:
+                    kwargs[keyword.arg] = ast.literal_eval(keyword.value)
+                except ValueError:
+                    literal = False
+            elif keyword.arg == "tex_to_color_map":
+                # Only the keys split the TeX source; the colors do not matter
+                if isinstance(keyword.value, ast.Dict) and all(
+                    isinstance(key, ast.Constant) for key in keyword.value.keys
+                ):
+                    kwargs["substrings_to_isolate"] = [
+                        *kwargs.get("substrings_to_isolate", []),
+                        *(key.value for key in keyword.value.keys),
+                    ]
+                else:
+                    literal = False
+            elif keyword.arg == "tex_template":
+                value = keyword.value
+                if (
+                    isinstance(value, ast.Attribute)
+                    and isinstance(value.value, ast.Name)
+                    and value.value.id == "TexTemplateLibrary"
+                ):
+                    kwargs["tex_template"] = value.attr
+                else:
+                    literal = False
+            elif keyword.arg is None:
+                literal = False
+        if not literal:
+            continue
+
+        spec = {"cls": node.func.id, "args": args, "kwargs": kwargs}
+        specs[_spec_key(spec)] = spec
+    return list(specs.values())
+
+
+def _spec_key(spec: Dict) -> str:
+    digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+    return f"spec-{digest}"
+
+
+_worker_media_dir: Optional[str] = None
+
+
+def _init_worker() -> None:
+    """Imports manim once per pool process and routes TeX through the cache."""
+    global _worker_media_dir
+    import manim  # noqa: F401
+
+    install_tex_cache()
+    _worker_media_dir = tempfile.mkdtemp(prefix="tex-precompile-")
+
+
+def _compile_spec(spec: Dict) -> bool:
+    """Builds one Tex mobject, which compiles and caches its SVG."""
+    import manim
+    from manim import TexTemplateLibrary, tempconfig
+
+    kwargs = dict(spec["kwargs"])
+    if "tex_template" in kwargs:
+        kwargs["tex_template"] = getattr(TexTemplateLibrary, kwargs["tex_template"])
+    try:
+        with tempconfig({"media_dir": _worker_media_dir}):
+            getattr(manim, spec["cls"])(*spec["args"], **kwargs)
+    finally:
+        flush_tex_cache_stats()
+        shutil.rmtree(_worker_media_dir, ignore_errors=True)
+        os.makedirs(_worker_media_dir, exist_ok=True)
+    get_tex_cache().put_bytes(_spec_key(spec), b"")
+    return True
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if get_tex_cache() is None or os.getenv("TEX_PRECOMPILE", "1") != "1":
+        return None
+    if importlib.util.find_spec("manim") is None:
+        return None
+    with _lock:
+        if _executor is None:
+            workers = int(os.getenv("TEX_PRECOMPILE_WORKERS", "0")) or os.cpu_count() or 1
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker
+            )
+        return _executor
+
+
+def start_tex_precompile(code: str) -> List[Future]:
+    """Starts compiling the code's uncached formulas in the background.
+
+    Formulas already compiled by an earlier precompile are skipped, and ones
+    in flight (e.g. started when the code block closed mid-stream) are joined
+    rather than submitted twice.
+
+    Args:
+        code (str): Manim code
+
+    Returns:
+        List[Future]: One future per formula still compiling
+    """
+
+    executor = _get_executor()
+    if executor is None or not code:
+        return []
+    cache = get_tex_cache()
+    futures = []
+    for spec in collect_tex_calls(code):
+        key = _spec_key(spec)
+        if os.path.exists(cache.path(key)):
+            continue
+        with _lock:
+            future = _in_flight.get(key)
+            if future is None:
+                future = executor.submit(_compile_spec, spec)
+                _in_flight[key] = future
+                future.add_done_callback(lambda _, key=key: _in_flight.pop(key, None))
+        futures.append(future)
+    return futures
+
+
+def precompile_tex(code: str, timeout: Optional[float] = None) -> Dict[str, int]:
+    """Compiles the code's uncached formulas in parallel and waits for them.
+
+    Args:
+        code (str): Manim code
+        timeout (Optional[float]): Seconds to wait; the render starts anyway
+            after that and compiles whatever is still missing itself
+
+    Returns:
+        Dict[str, int]: Counts of formulas "compiled", "failed" and "pending"
+    """
+
+    futures = start_tex_precompile(code)
+    done, pending = wait(futures, timeout=timeout)
+    failed = sum(1 for future in done if future.exception() is not None)
+    return {"compiled": len(done) - failed, "failed": failed, "pending": len(pending)}
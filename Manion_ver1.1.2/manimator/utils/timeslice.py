@@ -0,0 +1,126 @@
+"""Experimental time-sliced rendering of a single scene.
+
+Section splitting needs a construct() body with natural cut points. A scene
+that is one long play() (a graph sweep over a minute, say) has none, and its
+frames are drawn one after another by a single Cairo thread. Here the video
+is cut into K contiguous frame ranges instead, rendered by K processes at
+once. Each process replays the scene up to its first frame without drawing
+(see render_worker.install_frame_slice), draws and encodes only its own
+frames, and the slice videos are joined with ffmpeg stream copy.
+
+The frame count comes from a dry run, which also reports what rules
+slicing out: a wait_until() has no length known up front, and updaters
+(add_updater, always_redraw) need every frame before the slice. Such scenes,
+and videos too short to split, fall back to a whole render; an error while
+rendering a slice is raised as it would be from a whole render.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from manimator.utils.artifacts import new_artifact_path
+from manimator.utils.deadline import Deadline, stage_timeout
+from manimator.utils.ffmpeg import concat_videos
+from manimator.utils.quality import QUALITY_PROFILES, resolve_quality
+
+if TYPE_CHECKING:
+    from manimator.utils.schema import DryRunResult, ManimProcessor
+
+# Slices shorter than this cost more in replay and process start than they save
+MIN_SLICE_SECONDS = 2.0
+
+
+def slice_bounds(total_frames: int, slices: int) -> List[Tuple[int, Optional[int]]]:
+    """Contiguous frame ranges [start, end) covering a video, the last one open-ended.
+
+    The open end keeps the join complete even if the dry run's frame count is
+    slightly off.
+    """
+
+    starts = [round(total_frames * index / slices) for index in range(slices)]
+    return [(start, end) for start, end in zip(starts, starts[1:] + [None])]
+
+
+def render_time_sliced(
+    processor: "ManimProcessor",
+    scene_file: str,
+    scene_name: str,
+    temp_dir: str,
+    deadline: Optional[Deadline] = None,
+    quality: Optional[str] = None,
+    slices: Optional[int] = None,
+    planned: Optional["DryRunResult"] = None,
+) -> Optional[str]:
+    """Renders one scene as contiguous time slices in parallel and joins them.
+
+    Args:
+        processor (ManimProcessor): Processor used to render each slice
+        scene_file (str): Path to the saved scene file
+        scene_name (str): Scene class to render
+        temp_dir (str): Working directory of this render
+        deadline (Optional[Deadline]): Request deadline bounding every slice
+        quality (Optional[str]): Quality profile for every slice
+        slices (Optional[int]): Number of slices. Defaults to
+            RENDER_TIME_SLICES; fewer are used for short videos
+        planned (Optional[DryRunResult]): The scene's dry run, if the caller
+            already did one (otherwise one is run here)
+
+    Returns:
+        Optional[str]: Path to the joined video, or None if the scene should
+            be rendered whole (too short, failed its dry run, or not sliceable)
+    """
+
+    quality = resolve_quality(quality)
+    slices = slices or int(os.getenv("RENDER_TIME_SLICES", "0"))
+    if planned is None:
+        planned = processor.dry_run(
+            scene_file, scene_name, temp_dir, deadline=deadline, layout=False, previews=False
+        )
+    if not planned.ok or planned.slice_blocker:
+        return None
+    slices = min(slices, int(planned.duration // MIN_SLICE_SECONDS))
+    if slices < 2:
+        return None
+    total_frames = round(planned.duration * QUALITY_PROFILES[quality]["frame_rate"])
+
+    slice_root = os.path.join(temp_dir, "slices")
+    os.makedirs(slice_root)
+
+    def render(index_bounds):
+        index, bounds = index_bounds
+        media_dir = os.path.join(slice_root, f"media{index:02d}")
+        os.makedirs(media_dir)
+        # The joined file gets faststart, so the slices skip it
+        return processor.render_scene(
+            scene_file,
+            scene_name,
+            media_dir,
+            deadline=deadline,
+            quality=quality,
+            frame_slice=bounds,
+            fast_start=False,
+        )
+
+    with ThreadPoolExecutor(max_workers=slices) as executor:
+        futures = [executor.submit(render, item) for item in enumerate(slice_bounds(total_frames, slices))]
+    pieces = [future.result() for future in futures if not future.exception()]
+    try:
+        for future in futures:
+            if future.exception():
+                raise future.exception()
+        if not all(pieces):
+            raise HTTPException(status_code=500, detail="A time slice produced no video")
+        output = new_artifact_path()
+        try:
+            return concat_videos(pieces, output, timeout=stage_timeout(deadline, "render"))
+        except Exception:
+            if os.path.exists(output):
+                os.remove(output)
+            raise
+    finally:
+        for piece in pieces:
+            if piece and os.path.exists(piece):
+                os.remove(piece)
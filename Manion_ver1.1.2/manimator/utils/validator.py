@@ -0,0 +1,408 @@
+"""Static validation of generated Manim code before it is rendered.
+
+Everything here works on the AST and never imports or runs the code (or
+manim), so a check takes milliseconds and bad code is rejected before a
+render worker picks it up.
+"""
+
+import ast
+import builtins
+import importlib.util
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set
+
+# Scene base classes manim can render
+SCENE_BASES = {
+    "Scene",
+    "ThreeDScene",
+    "MovingCameraScene",
+    "ZoomedScene",
+    "VectorScene",
+    "LinearTransformationScene",
+    "SpecialThreeDScene",
+}
+
+# Modules generated code may import; anything else is rejected
+ALLOWED_IMPORTS = {
+    "manim",
+    "numpy",
+    "math",
+    "cmath",
+    "random",
+    "itertools",
+    "functools",
+    "operator",
+    "collections",
+    "dataclasses",
+    "typing",
+    "string",
+    "fractions",
+    "decimal",
+    "statistics",
+    "copy",
+    "enum",
+    "colorsys",
+}
+
+# Builtins that reach the file system, the network or arbitrary code, or
+# look names up by string and so get around the other checks
+FORBIDDEN_CALLS = {
+    "open",
+    "exec",
+    "eval",
+    "compile",
+    "__import__",
+    "input",
+    "breakpoint",
+    "getattr",
+    "vars",
+    "globals",
+    "locals",
+}
+
+# numpy functions, methods and modules that read or write files or load
+# native code
+NUMPY_FILE_ACCESS = {
+    "load",
+    "save",
+    "savez",
+    "savez_compressed",
+    "fromfile",
+    "tofile",
+    "loadtxt",
+    "savetxt",
+    "genfromtxt",
+    "fromregex",
+    "memmap",
+    "DataSource",
+    "npyio",
+    "ctypeslib",
+    "f2py",
+}
+
+# manim classes that read files when given a path
+FILE_MOBJECTS = {"ImageMobject", "SVGMobject", "Code"}
+
+
+@dataclass
+class Diagnostic:
+    """One validation finding.
+
+    Attributes:
+        severity: "error" (blocks the render) or "warning"
+        code: Machine-readable rule name
+        message: Human-readable description
+        line: 1-based source line, if known
+    """
+
+    severity: str
+    code: str
+    message: str
+    line: Optional[int] = None
+
+    def __str__(self) -> str:
+        where = f"line {self.line}: " if self.line else ""
+        return f"{where}{self.message}"
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating a piece of Manim code.
+
+    Attributes:
+        scenes: Renderable scene classes in source order
+        diagnostics: Findings, errors and warnings
+    """
+
+    scenes: List[str] = field(default_factory=list)
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[Diagnostic]:
+        return [d for d in self.diagnostics if d.severity == "error"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        """Errors as one line each, for messages and repair prompts."""
+        return "\n".join(str(d) for d in self.errors)
+
+
+def _module_file(package_dir: str, parts: List[str]) -> Optional[str]:
+    path = os.path.join(package_dir, *parts)
+    if os.path.isfile(os.path.join(path, "__init__.py")):
+        return os.path.join(path, "__init__.py")
+    if os.path.isfile(path + ".py"):
+        return path + ".py"
+    return None
+
+
+def _exports(path: str, package_dir: str, memo: Dict[str, Optional[Set[str]]]) -> Set[str]:
+    """Names `from <module> import *` binds, resolved statically."""
+    if path in memo:
+        # None while the module is still being resolved (an import cycle)
+        return memo[path] or set()
+    memo[path] = None
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    # Package the module belongs to, for resolving relative imports
+    package_parts = os.path.relpath(path, package_dir)[: -len(".py")].split(os.sep)[:-1]
+
+    names: Set[str] = set()
+    declared: Optional[List[str]] = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets
+        ):
+            try:
+                declared = list(ast.literal_eval(node.value))
+            except ValueError:
+                pass
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                names.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+        elif isinstance(node, ast.Import):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.names[0].name == "*":
+                if node.level:
+                    base = package_parts[: len(package_parts) - node.level + 1]
+                    target = _module_file(package_dir, base + (node.module or "").split("."))
+                    if target:
+                        names.update(_exports(target, package_dir, memo))
+            else:
+                names.update(a.asname or a.name for a in node.names)
+    if declared is None:
+        declared = [name for name in names if not name.startswith("_")]
+    memo[path] = set(declared)
+    return memo[path]
+
+
+@lru_cache(maxsize=4)
+def manim_names(package_dir: Optional[str] = None) -> Optional[FrozenSet[str]]:
+    """Names exported by `from manim import *` in the installed manim.
+
+    Read from manim's source files, without importing manim.
+
+    Args:
+        package_dir (Optional[str]): manim package directory. Defaults to the
+            installed manim
+
+    Returns:
+        Optional[FrozenSet[str]]: Exported names, or None if manim is not installed
+    """
+
+    if package_dir is None:
+        spec = importlib.util.find_spec("manim")
+        if spec is None or not spec.submodule_search_locations:
+            return None
+        package_dir = list(spec.submodule_search_locations)[0]
+    init = os.path.join(package_dir, "__init__.py")
+    if not os.path.isfile(init):
+        return None
+    return frozenset(_exports(init, package_dir, {}))
+
+
+def _bound_names(tree: ast.Module) -> Set[str]:
+    """Every name the code itself binds, anywhere."""
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((a.asname or a.name).split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+    return names
+
+
+def _find_scenes(tree: ast.Module) -> List[ast.ClassDef]:
+    """Classes deriving, directly or through other classes in the code, from a scene base."""
+    scene_names = set(SCENE_BASES)
+    scenes = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            bases = {b.id if isinstance(b, ast.Name) else getattr(b, "attr", None) for b in node.bases}
+            if bases & scene_names:
+                scene_names.add(node.name)
+                scenes.append(node)
+    return scenes
+
+
+def find_scene_classes(code: str) -> List[str]:
+    """Names of the renderable scene classes in code, in source order (empty if unparsable)."""
+    try:
+        return [node.name for node in _find_scenes(ast.parse(code))]
+    except SyntaxError:
+        return []
+
+
+def _base_names(scene: ast.ClassDef) -> List[str]:
+    return [b.id if isinstance(b, ast.Name) else getattr(b, "attr", None) for b in scene.bases]
+
+
+def _leaf_scenes(scenes: List[ast.ClassDef]) -> List[ast.ClassDef]:
+    bases = {name for scene in scenes for name in _base_names(scene)}
+    return [scene for scene in scenes if scene.name not in bases]
+
+
+def leaf_scene_classes(code: str) -> List[str]:
+    """Scene classes in code that no other scene class in it derives from.
+
+    A local scene base (shared helpers, no construct of its own) is not a
+    scene to render by itself; its subclasses are.
+    """
+    try:
+        return [scene.name for scene in _leaf_scenes(_find_scenes(ast.parse(code)))]
+    except SyntaxError:
+        return []
+
+
+def _defines_construct(
+    scene: ast.ClassDef, local: Dict[str, ast.ClassDef], seen: Optional[Set[str]] = None
+) -> bool:
+    """Whether a scene or one of its local base classes defines construct()."""
+    if any(isinstance(n, ast.FunctionDef) and n.name == "construct" for n in scene.body):
+        return True
+    seen = (seen or set()) | {scene.name}
+    return any(
+        name in local and name not in seen and _defines_construct(local[name], local, seen)
+        for name in _base_names(scene)
+    )
+
+
+def validate_code(code: str, known_names: Optional[FrozenSet[str]] = None) -> ValidationResult:
+    """Validates generated Manim code without running it.
+
+    Checks syntax, finds scene classes (Scene, ThreeDScene, MovingCameraScene
+    and other manim scene bases, including through local subclasses), flags
+    names neither defined in the code nor exported by the installed manim,
+    disallowed imports, file/network/exec access (numpy's file I/O and
+    string lookups such as getattr included), and obvious mistakes such as
+    `self.play()` without animations.
+
+    Args:
+        code (str): Manim code (with or without `from manim import *`)
+        known_names (Optional[FrozenSet[str]]): Names manim exports. Defaults
+            to the installed manim's; the name check is skipped without manim
+
+    Returns:
+        ValidationResult: Scene classes and diagnostics
+    """
+
+    result = ValidationResult()
+
+    def report(severity, rule, message, node=None):
+        result.diagnostics.append(
+            Diagnostic(severity, rule, message, getattr(node, "lineno", None))
+        )
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        report("error", "syntax", f"Syntax error: {e.msg}")
+        result.diagnostics[-1].line = e.lineno
+        return result
+
+    scenes = _find_scenes(tree)
+    # Local bases (shared helpers) are not rendered and need no construct()
+    leaves = _leaf_scenes(scenes)
+    result.scenes = [scene.name for scene in leaves]
+    if not scenes:
+        report("error", "no_scene", "No Scene/ThreeDScene/MovingCameraScene subclass found")
+    local = {scene.name: scene for scene in scenes}
+    for scene in leaves:
+        if not _defines_construct(scene, local):
+            report("error", "no_construct", f"{scene.name} has no construct() method", scene)
+
+    bound = _bound_names(tree)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if isinstance(node, ast.ImportFrom) and node.level:
+                report("error", "import", "Relative imports are not allowed", node)
+                continue
+            modules = [node.module] if isinstance(node, ast.ImportFrom) else [a.name for a in node.names]
+            for module in modules:
+                parts = (module or "").split(".")
+                if parts[0] not in ALLOWED_IMPORTS:
+                    report("error", "import", f"Import of '{module}' is not allowed", node)
+                elif parts[0] == "numpy" and NUMPY_FILE_ACCESS.intersection(parts):
+                    report("error", "file_access", f"Import of '{module}' is not allowed", node)
+            if isinstance(node, ast.ImportFrom) and (node.module or "").split(".")[0] == "numpy":
+                for alias in node.names:
+                    if alias.name in NUMPY_FILE_ACCESS:
+                        report("error", "file_access", f"numpy.{alias.name} reaches the file system", node)
+
+        elif isinstance(node, ast.Attribute) and node.attr.startswith("__") and node.attr.endswith("__"):
+            if node.attr not in {"__init__", "__name__", "__class__"}:
+                report("error", "dunder_access", f"Access to '{node.attr}' is not allowed", node)
+
+        elif isinstance(node, ast.Attribute) and node.attr in NUMPY_FILE_ACCESS:
+            # Whatever the object: numpy is reachable under any alias (and
+            # through manim's np), and tofile is an array method
+            report("error", "file_access", f"numpy.{node.attr} reaches the file system", node)
+
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            # Flagged when referenced, not only when called: `f = open` counts
+            if node.id in FORBIDDEN_CALLS:
+                report("error", "forbidden_call", f"Use of '{node.id}' is not allowed", node)
+            elif node.id in NUMPY_FILE_ACCESS and node.id not in bound:
+                # Brought in by `from numpy import *`
+                report("error", "file_access", f"numpy.{node.id} reaches the file system", node)
+
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name) and func.id in FILE_MOBJECTS and (
+                (node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str))
+                or any(k.arg in {"file_name", "filename"} for k in node.keywords)
+            ):
+                report("error", "file_access", f"{func.id} reads a file; generated scenes have no assets", node)
+            elif (
+                isinstance(func, ast.Attribute)
+                and isinstance(func.value, ast.Name)
+                and func.value.id == "self"
+            ):
+                if func.attr == "play" and not node.args:
+                    report("error", "empty_play", "self.play() called without animations", node)
+                elif func.attr == "add_sound":
+                    report("error", "file_access", "add_sound reads a file; generated scenes have no assets", node)
+                elif func.attr == "wait" and node.args and isinstance(node.args[0], ast.Constant):
+                    if isinstance(node.args[0].value, (int, float)) and node.args[0].value <= 0:
+                        report("error", "bad_duration", "self.wait() needs a positive duration", node)
+            for keyword in node.keywords:
+                if (
+                    keyword.arg == "run_time"
+                    and isinstance(keyword.value, ast.Constant)
+                    and isinstance(keyword.value.value, (int, float))
+                    and keyword.value.value <= 0
+                ):
+                    report("error", "bad_duration", "run_time must be positive", node)
+
+    known = known_names if known_names is not None else manim_names()
+    if known is not None:
+        defined = bound | set(dir(builtins))
+        unknown: Dict[str, ast.Name] = {}
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Name)
+                and isinstance(node.ctx, ast.Load)
+                and node.id not in defined
+                and node.id not in known
+            ):
+                unknown.setdefault(node.id, node)
+        for name, node in unknown.items():
+            report("error", "unknown_name", f"'{name}' is not defined in manim or the code", node)
+
+    return result
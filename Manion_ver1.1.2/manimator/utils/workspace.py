@@ -0,0 +1,206 @@
+"""Pool of reusable render workspaces, optionally on a RAM-backed filesystem.
+
+A render writes hundreds of partial movie files, TeX intermediates and
+frame caches that are thrown away when the job ends. Creating a fresh
+directory on disk for each job, and deleting those files one by one when it
+ends, adds disk I/O that competes with the artifact store. The pool keeps a
+fixed set of workspace directories under RENDER_WORKSPACE_DIR, e.g. on
+tmpfs (/dev/shm):
+
+- A job takes an idle workspace; none is created on the request path.
+- Releasing one renames it away (one syscall) and recreates it empty, so it
+  is reusable at once; the old contents are removed in the background.
+- Each workspace may grow to a quota, by default the render output limit
+  the sandbox already enforces (RENDER_MAX_OUTPUT_MB). A workspace is only
+  handed out while the root has room for a full quota on top of the quota
+  reserved by the workspaces in use, and the host keeps
+  RENDER_WORKSPACE_MIN_FREE_MB of RAM available; otherwise, or when all are
+  busy, the job gets a directory on disk instead.
+
+The pool is opt-in. The finished video is renamed into the artifact store
+and partial movies are hard-linked into and out of their cache, which only
+works within one filesystem: from tmpfs every handoff and cache link
+becomes a copy (counted in the handoff metrics). Put the workspaces on
+tmpfs only where that copy costs less than the disk I/O saved, or keep
+workspaces, caches and artifacts on one filesystem.
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+def available_memory_bytes() -> Optional[int]:
+    """MemAvailable from /proc/meminfo, or None where it is not available."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class WorkspacePool:
+    """Reusable workspaces under a (RAM-backed) root, with disk fallback.
+
+    Args:
+        root (str): Directory the workspaces are created in; this process
+            uses its own subdirectory, and those of dead processes are removed
+        size (int): Workspaces kept ready
+        quota_bytes (int): Space a workspace may use; a workspace is only
+            used while the root has that much free beyond the quota of the
+            workspaces in use
+        min_free_memory_bytes (int): Host RAM that must stay available
+        fallback_root (Optional[str]): Where disk workspaces are created
+            (default: the system temp dir)
+    """
+
+    def __init__(
+        self,
+        root: str,
+        size: int,
+        quota_bytes: int,
+        min_free_memory_bytes: int = 0,
+        fallback_root: Optional[str] = None,
+    ):
+        self.quota_bytes = quota_bytes
+        self.min_free_memory_bytes = min_free_memory_bytes
+        self.fallback_root = fallback_root
+        self.stats: Dict[str, int] = {"ram": 0, "disk": 0}
+        self.reserved_bytes = 0
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[str]" = queue.Queue()
+        os.makedirs(root, exist_ok=True)
+        self._remove_stale(root)
+        self.root = os.path.join(root, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(self.root)
+        for index in range(size):
+            path = os.path.join(self.root, f"ws{index:02d}")
+            os.makedirs(path)
+            self._idle.put(path)
+
+    @staticmethod
+    def _remove_stale(root: str) -> None:
+        """Removes the workspaces of processes that died without cleaning up."""
+        for name in os.listdir(root):
+            pid = name.split("-", 1)[0]
+            if pid.isdigit() and not _pid_alive(int(pid)):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    def _has_room(self) -> bool:
+        # What the workspaces in use already wrote counts against both the
+        # free space and their reservation, so this errs on the safe side
+        needed = self.reserved_bytes + self.quota_bytes
+        if shutil.disk_usage(self.root).free < needed:
+            return False
+        available = available_memory_bytes()
+        return available is None or available >= self.min_free_memory_bytes + needed
+
+    def _take(self) -> Optional[str]:
+        """An idle workspace with its quota reserved, or None."""
+        with self._lock:
+            if not self._has_room():
+                return None
+            try:
+                path = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            self.reserved_bytes += self.quota_bytes
+            self.stats["ram"] += 1
+            return path
+
+    def _release(self, path: str) -> None:
+        with self._lock:
+            self.reserved_bytes -= self.quota_bytes
+        self._idle.put(path)
+
+    def _reset(self, path: str) -> None:
+        """Empties a workspace: renamed away at once, deleted in the background."""
+        trash = f"{path}.trash-{uuid.uuid4().hex[:8]}"
+        os.rename(path, trash)
+        os.makedirs(path)
+        threading.Thread(target=shutil.rmtree, args=(trash, True), daemon=True).start()
+
+    @contextmanager
+    def workspace(self) -> Iterator[str]:
+        """An empty directory for one job, returned to the pool (emptied) afterwards.
+
+        Yields:
+            str: Workspace path; a pooled one when it is free and there is
+                room, otherwise a fresh directory on disk
+        """
+
+        path = self._take()
+        if path is None:
+            with self._lock:
+                self.stats["disk"] += 1
+            path = tempfile.mkdtemp(dir=self.fallback_root)
+            try:
+                yield path
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+            return
+
+        try:
+            yield path
+        finally:
+            try:
+                self._reset(path)
+            except OSError:
+                # Left in a bad state: replaced by a fresh one
+                shutil.rmtree(path, ignore_errors=True)
+                os.makedirs(path, exist_ok=True)
+            self._release(path)
+
+
+_pool: Optional[WorkspacePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_workspace_pool() -> Optional[WorkspacePool]:
+    """Returns the process-wide workspace pool, creating it on first use.
+
+    Configured by RENDER_WORKSPACE_DIR (unset by default, which disables the
+    pool; e.g. /dev/shm/manimator-workspaces for tmpfs), RENDER_WORKSPACES
+    (pool size, default twice the CPU count; 0 disables the pool),
+    RENDER_WORKSPACE_QUOTA_MB (default RENDER_MAX_OUTPUT_MB, then 2048) and
+    RENDER_WORKSPACE_MIN_FREE_MB (default 1024).
+
+    Returns:
+        Optional[WorkspacePool]: The pool, or None when disabled
+    """
+
+    global _pool
+    size = int(os.getenv("RENDER_WORKSPACES", str(2 * (os.cpu_count() or 1))))
+    root = os.getenv("RENDER_WORKSPACE_DIR")
+    if size <= 0 or not root:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            quota_mb = float(
+                os.getenv("RENDER_WORKSPACE_QUOTA_MB") or os.getenv("RENDER_MAX_OUTPUT_MB") or 2048
+            )
+            _pool = WorkspacePool(
+                root,
+                size,
+                quota_bytes=int(quota_mb * 1024 * 1024),
+                min_free_memory_bytes=int(float(os.getenv("RENDER_WORKSPACE_MIN_FREE_MB", "1024")) * 1024 * 1024),
+            )
+        return _pool
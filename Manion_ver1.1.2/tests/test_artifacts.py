@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Test that rendered videos are handed off without copying."""
+
+import errno
+import os
+import sys
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils import artifacts
+
+
+def make_video(directory, size=1024):
+    path = os.path.join(directory, "Scene.mp4")
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    return path
+
+
+def test_same_filesystem_handoff_is_a_rename(tmp_path, monkeypatch):
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    video = make_video(str(tmp_path))
+    inode = os.stat(video).st_ino
+    before = artifacts.handoff_stats()
+
+    dest, copied = artifacts.handoff(video)
+    assert copied == 0
+    assert os.stat(dest).st_ino == inode
+    assert not os.path.exists(video)
+    after = artifacts.handoff_stats()
+    assert after["zero_copy"] == before["zero_copy"] + 1
+    assert after["bytes_copied"] == before["bytes_copied"]
+
+
+def test_cross_filesystem_handoff_counts_bytes(tmp_path, monkeypatch):
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    video = make_video(str(tmp_path), size=4096)
+
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(artifacts.os, "replace", cross_device)
+    dest, copied = artifacts.handoff(video)
+    assert copied == 4096
+    assert os.path.getsize(dest) == 4096
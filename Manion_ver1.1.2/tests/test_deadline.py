@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test request deadline budgeting."""
+
+import os
+import sys
+import time
+
+import litellm
+import pytest
+import requests
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.api import animation_generation
+from manimator.utils import helpers
+from manimator.utils.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    check_timeout,
+    llm_limits,
+    stage_timeout,
+)
+
+
+def test_stage_timeout_uses_remaining_budget():
+    """Stages get the remaining budget, capped by their own default"""
+    deadline = Deadline(10)
+    assert 9 < stage_timeout(deadline, "ocr_mathpix") <= 10
+    assert stage_timeout(deadline, "ocr_mathpix", 3) == 3
+    assert stage_timeout(None, "ocr_mathpix", 3) == 3
+
+
+def test_expired_deadline_names_stage():
+    """An exhausted budget fails fast with the stage name"""
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    try:
+        deadline.timeout("render")
+    except DeadlineExceeded as e:
+        assert e.status_code == 504
+        assert e.detail == "Deadline exceeded at stage render"
+    else:
+        raise AssertionError("expected DeadlineExceeded")
+
+
+def test_max_tokens_scales_with_remaining_time():
+    """max_tokens shrinks as the deadline approaches"""
+    plenty = Deadline(600).max_tokens("code_generation", tokens_per_second=40, ceiling=4096)
+    tight = Deadline(20).max_tokens("code_generation", tokens_per_second=40, ceiling=4096)
+    assert plenty == 4096
+    assert 700 < tight < 800
+
+    try:
+        Deadline(5).max_tokens("code_generation", tokens_per_second=40, ceiling=4096)
+    except DeadlineExceeded:
+        pass
+    else:
+        raise AssertionError("expected DeadlineExceeded below the token floor")
+
+
+def test_llm_limits_reserves_time_for_later_stages():
+    """The code stage leaves the render reserve untouched"""
+    assert llm_limits(None, "code_generation") == {}
+    limits = llm_limits(Deadline(100), "code_generation", reserve=60)
+    assert limits["timeout"] <= 40
+
+
+def test_no_retries_under_a_deadline():
+    """A retry would get the full timeout again, overrunning the deadline"""
+    assert llm_limits(None, "scene_description", retries=2) == {"num_retries": 2}
+    assert llm_limits(Deadline(100), "scene_description", retries=2)["num_retries"] == 0
+    assert "num_retries" not in llm_limits(Deadline(100), "pdf_scene_description")
+
+
+def test_timeout_at_the_deadline_is_a_504(monkeypatch):
+    """A timeout is reported as the deadline only when the deadline bounded the call"""
+    check_timeout(None, "arxiv_download")
+    check_timeout(Deadline(100), "arxiv_download")
+    with pytest.raises(DeadlineExceeded):
+        check_timeout(Deadline(0.5), "arxiv_download")
+
+    def timing_out(url, timeout=None):
+        raise requests.Timeout("read timed out")
+
+    monkeypatch.setattr(helpers.requests, "get", timing_out)
+    with pytest.raises(DeadlineExceeded) as exceeded:
+        helpers.download_arxiv_pdf("https://arxiv.org/pdf/1", deadline=Deadline(0.5))
+    assert exceeded.value.status_code == 504
+    with pytest.raises(helpers.HTTPException) as failed:
+        helpers.download_arxiv_pdf("https://arxiv.org/pdf/1", deadline=Deadline(100))
+    assert failed.value.status_code == 500
+
+
+def test_code_generation_timeout_is_a_504(monkeypatch):
+    """A code model timeout is a 504, and a stage's own 504 passes through unchanged"""
+
+    def timing_out(stage, messages, **kwargs):
+        raise litellm.Timeout("timed out", model="code", llm_provider="openai")
+
+    monkeypatch.setenv("CODE_GEN_SNIPPETS", "0")
+    monkeypatch.setattr(animation_generation, "stage_completion", timing_out)
+    with pytest.raises(animation_generation.HTTPException) as failed:
+        animation_generation.generate_animation_response("a circle", stream=False)
+    assert failed.value.status_code == 504
+    assert not isinstance(failed.value, DeadlineExceeded)
+
+    def exceeded(stage, messages, **kwargs):
+        raise DeadlineExceeded("code_generation")
+
+    monkeypatch.setattr(animation_generation, "stage_completion", exceeded)
+    with pytest.raises(DeadlineExceeded):
+        animation_generation.generate_animation_response("a circle", stream=False)
+
+
+def main():
+    """Main test function"""
+    test_stage_timeout_uses_remaining_budget()
+    test_expired_deadline_names_stage()
+    test_max_tokens_scales_with_remaining_time()
+    test_llm_limits_reserves_time_for_later_stages()
+    test_no_retries_under_a_deadline()
+    print("✅ Deadline tests passed")
+
+
+if __name__ == "__main__":
+    main()
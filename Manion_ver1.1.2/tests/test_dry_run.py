@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test the dry-run validation render."""
+
+import os
+import sys
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils import schema
+from manimator.utils.render_pool import RenderWorkerPool
+from manimator.utils.schema import DryRunResult, ManimProcessor
+
+TRACEBACK = """Traceback (most recent call last):
+  File "/site-packages/manim/scene/scene.py", line 229, in render
+    self.construct()
+  File "/tmp/tmpabc/scene.py", line 7, in construct
+    circle = Circle(radius=1, colour=BLUE)
+  File "/site-packages/manim/mobject/geometry/arc.py", line 496, in __init__
+    super().__init__(**kwargs)
+TypeError: Mobject.__init__() got an unexpected keyword argument 'colour'
+"""
+
+GOOD_SCENE = """class Good(Scene):
+    def construct(self):
+        circle = Circle()
+        self.play(Create(circle), run_time=2)
+        self.wait(1.5)
+"""
+
+BAD_SCENE = """class Bad(Scene):
+    def construct(self):
+        circle = Circle()
+        self.play(Create(circle))
+        circle.no_such_method()
+"""
+
+
+def fake_warm():
+    """Stands in for importing manim once per worker"""
+
+
+def fake_runner(job):
+    """Stands in for running construct() on a pool worker"""
+    assert job["dry_run"]
+    return {"ok": True, "duration": 3.5, "animations": 2}
+
+
+def test_summary_keeps_scene_lines_and_error():
+    summary = DryRunResult(ok=False, error=TRACEBACK, scene_file="/tmp/tmpabc/scene.py").summary()
+    assert summary.splitlines() == [
+        'File "scene.py", line 7, in construct',
+        "TypeError: Mobject.__init__() got an unexpected keyword argument 'colour'",
+    ]
+    # No server paths in what clients see
+    assert "/tmp" not in summary
+    assert DryRunResult(ok=True).summary() == ""
+
+
+def test_dry_run_uses_the_pool(tmp_path, monkeypatch):
+    pool = RenderWorkerPool(1, warm=fake_warm, runner=fake_runner)
+    monkeypatch.setattr(schema, "get_render_pool", lambda: pool)
+    try:
+        result = ManimProcessor().dry_run(str(tmp_path / "scene.py"), "Good", str(tmp_path))
+    finally:
+        pool.close()
+    assert result == DryRunResult(ok=True, duration=3.5, animations=2)
+
+
+def test_dry_run_reports_duration_and_errors(monkeypatch):
+    pytest.importorskip("manim")
+    monkeypatch.setenv("MANIM_RENDER_POOL_SIZE", "0")
+    processor = ManimProcessor()
+    with processor.create_temp_dir() as temp_dir:
+        good = processor.dry_run(processor.save_code(GOOD_SCENE, temp_dir), "Good", temp_dir)
+        assert good.ok, good.error
+        assert good.duration == pytest.approx(3.5)
+        assert good.animations == 2
+        # Nothing was encoded
+        assert not os.path.exists(os.path.join(temp_dir, "videos"))
+
+        bad = processor.dry_run(processor.save_code(BAD_SCENE, temp_dir), "Bad", temp_dir)
+        assert not bad.ok
+        assert "no_such_method" in bad.summary()
+        assert "scene.py" in bad.summary()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Test render-time estimates from the scene AST."""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.estimator import (
+    SceneFeatures,
+    calibrate,
+    estimate_render,
+    feature_vector,
+    record_render,
+    scene_features,
+)
+
+CODE = """class Base(Scene):
+    def title(self, text):
+        self.play(Write(Text(text)), run_time=2)
+
+class Intro(Base):
+    def construct(self):
+        self.title("Intro")
+        for i in range(3):
+            self.play(Write(MathTex(f"x^{i}")), run_time=0.5)
+        self.wait(1.5)
+
+class Surf(ThreeDScene):
+    def construct(self):
+        surface = Surface(lambda u, v: [u, v, 0])
+        surface.add_updater(lambda m, dt: m.rotate(dt))
+        self.play(Create(surface))
+        self.wait()
+"""
+
+
+def test_scene_features():
+    features = scene_features(CODE)
+    assert list(features) == ["Intro", "Surf"]
+    assert features["Intro"] == SceneFeatures(duration=5.0, plays=5, tex=3, text=1)
+    assert features["Surf"] == SceneFeatures(
+        duration=2.0, plays=2, three_d=True, surfaces=1, updaters=1
+    )
+
+
+def test_estimates_grow_with_quality(tmp_path, monkeypatch):
+    monkeypatch.setenv("RENDER_TIMINGS_FILE", str(tmp_path / "timings.jsonl"))
+    estimate = estimate_render(CODE)
+    assert estimate.samples == 0
+    seconds = [estimate.seconds[q] for q in ("preview", "low", "medium", "high", "production")]
+    assert seconds == sorted(seconds) and seconds[0] > 0
+    assert estimate_render("not python(").scenes == []
+
+
+def test_calibration_follows_recorded_renders(tmp_path, monkeypatch):
+    monkeypatch.setenv("RENDER_TIMINGS_FILE", str(tmp_path / "timings.jsonl"))
+    features = scene_features(CODE)
+    # Renders on this machine take four times the default estimate
+    default = calibrate([])
+    for _ in range(50):
+        for name, f in features.items():
+            record_render(f, "low", 4 * float(feature_vector(f, "low") @ default))
+    estimate = estimate_render(CODE)
+    assert estimate.samples == 100
+    expected = 4 * sum(float(feature_vector(f, "low") @ default) for f in features.values())
+    assert estimate.seconds["low"] == pytest.approx(expected, rel=0.15)
+
+
+class FakeMovieCache:
+    def __init__(self, cached, encoded):
+        self.cached = cached
+        self.encoded = encoded
+
+    def populate(self, partial_dir, scene_name, quality):
+        return self.cached
+
+    def harvest(self, partial_dir, scene_name, quality):
+        return self.encoded
+
+
+@pytest.mark.parametrize("cached, encoded, recorded", [(0, 3, True), (3, 1, False)])
+def test_render_scene_records_only_the_render(tmp_path, monkeypatch, cached, encoded, recorded):
+    """The slot wait is not timed, and renders served mostly from cache are not recorded"""
+    from manimator.utils import schema
+    from manimator.utils.schema import ManimProcessor
+
+    def fake_render_cli(self, scene_file, scene_name, temp_dir, quality, *args):
+        time.sleep(0.05)
+        video = tmp_path / "Intro.mp4"
+        video.write_text("video")
+        return str(video)
+
+    @contextmanager
+    def slow_slot(cost, deadline=None):
+        time.sleep(0.5)
+        yield None
+
+    recorded_seconds = []
+    monkeypatch.setenv("MANIM_RENDER_POOL_SIZE", "0")
+    monkeypatch.setenv("RENDER_FASTSTART", "0")
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(schema, "precompile_tex", lambda code, timeout=None: None)
+    monkeypatch.setattr(schema, "get_partial_movie_cache", lambda: FakeMovieCache(cached, encoded))
+    monkeypatch.setattr(schema.get_render_scheduler(), "slot", slow_slot)
+    monkeypatch.setattr(ManimProcessor, "_render_cli", fake_render_cli)
+    monkeypatch.setattr(schema, "record_render", lambda f, quality, seconds: recorded_seconds.append(seconds))
+    scene_file = tmp_path / "scene.py"
+    scene_file.write_text(CODE)
+    assert ManimProcessor().render_scene(str(scene_file), "Intro", str(tmp_path), quality="low")
+    if recorded:
+        assert len(recorded_seconds) == 1 and 0.05 <= recorded_seconds[0] < 0.5
+    else:
+        assert recorded_seconds == []
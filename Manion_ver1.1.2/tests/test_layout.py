@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test the headless layout checker."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.layout import (
+    LayoutIssue,
+    check_boxes,
+    keyed_issues,
+    merge_issues,
+    out_of_frame,
+    overlapping_pairs,
+)
+from manimator.utils.schema import ManimProcessor
+
+BOXES = np.array(
+    [
+        [-2.0, -1.0, 0.0, 1.0],   # 0: overlaps 1
+        [-1.0, -1.0, 1.0, 1.0],   # 1
+        [0.2, -0.5, 0.8, 0.5],    # 2: inside 1, intentional
+        [3.0, 3.0, 4.0, 4.0],     # 3: alone, touching the top edge
+        [6.0, -1.0, 8.0, 1.0],    # 4: past the right edge
+        [-1.0, 1.0, 1.0, 2.0],    # 5: touches 1 along an edge only
+    ]
+)
+
+CROWDED_SCENE = """class Crowded(Scene):
+    def construct(self):
+        left = Square(side_length=2).shift(LEFT * 0.5)
+        right = Square(side_length=2).shift(RIGHT * 0.5)
+        self.play(Create(left), Create(right))
+        self.play(right.animate.shift(RIGHT * 3))
+        self.play(right.animate.shift(RIGHT * 5))
+"""
+
+
+def test_overlapping_pairs_skip_nesting_and_touching():
+    pairs = overlapping_pairs(BOXES)
+    assert [(i, j) for i, j, _ in pairs] == [(0, 1)]
+    assert pairs[0][2] == pytest.approx(0.5)
+
+
+def test_out_of_frame():
+    assert out_of_frame(BOXES).tolist() == [4]
+    assert out_of_frame(np.zeros((0, 4))).tolist() == []
+
+
+def test_issues_merge_over_consecutive_snapshots():
+    labels = [f"m{i}" for i in range(len(BOXES))]
+    ids = list(range(len(BOXES)))
+    snapshots = [
+        keyed_issues(BOXES, labels, 1.0, ids),
+        keyed_issues(BOXES, labels, 2.0, ids),
+        keyed_issues(BOXES[:2], labels[:2], 3.0, ids[:2]),
+        keyed_issues(BOXES[4:5], labels[4:5], 4.0, ids[4:5]),
+    ]
+    issues = merge_issues(snapshots)
+    assert [(i.kind, i.objects, i.start, i.end) for i in issues] == [
+        ("overlap", ["m0", "m1"], 1.0, 3.0),
+        ("out_of_frame", ["m4"], 1.0, 2.0),
+        ("out_of_frame", ["m4"], 4.0, 4.0),
+    ]
+    assert str(issues[0]) == "1.0s-3.0s: overlap of m0 and m1 (50% overlap)"
+
+
+def test_same_label_issues_stay_apart():
+    # Two separate Text overlaps: same labels, different mobjects
+    boxes = np.array([BOXES[0], BOXES[1], BOXES[0] + [0, 2, 0, 2], BOXES[1] + [0, 2, 0, 2]])
+    labels = ["Text"] * 4
+    assert len(check_boxes(boxes, labels, 1.0)) == 2
+    issues = merge_issues([keyed_issues(boxes, labels, 1.0, ["a", "b", "c", "d"])])
+    assert [(i.kind, i.objects) for i in issues] == [("overlap", ["Text", "Text"])] * 2
+
+
+def test_dry_run_reports_layout_with_timestamps(monkeypatch):
+    pytest.importorskip("manim")
+    monkeypatch.setenv("MANIM_RENDER_POOL_SIZE", "0")
+    processor = ManimProcessor()
+    with processor.create_temp_dir() as temp_dir:
+        scene_file = processor.save_code(CROWDED_SCENE, temp_dir)
+        result = processor.dry_run(scene_file, "Crowded", temp_dir, layout=True)
+    assert result.ok, result.error
+    assert [(i.kind, i.start, i.end) for i in result.layout] == [
+        ("overlap", 1.0, 1.0),
+        ("out_of_frame", 3.0, 3.0),
+    ]
+    assert all(isinstance(i, LayoutIssue) for i in result.layout)
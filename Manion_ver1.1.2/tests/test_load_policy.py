@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Test load-aware degradation of new renders and their deferred re-render.
+
+Scheduler load is given as stats dicts; render_scene is replaced by a
+stand-in that writes the quality name into the output file.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.load_policy import LoadPolicy, RerenderQueue
+from manimator.utils.schema import ManimProcessor
+
+SCENES = """class Intro(Scene):
+    def construct(self):
+        self.play(Create(Circle()), run_time=10)
+
+class Body(Scene):
+    def construct(self):
+        self.play(Create(Square()), run_time=15)
+
+class Outro(Scene):
+    def construct(self):
+        self.wait(20)
+"""
+
+
+def load(waiting=0, waiting_cost=0.0, slots=4):
+    return {"slots": slots, "waiting": waiting, "waiting_cost": waiting_cost}
+
+
+class FakeScheduler:
+    def __init__(self, stats):
+        self.load = stats
+
+    def stats(self):
+        return self.load
+
+
+def fake_render_scene(self, scene_file, scene_name, temp_dir, deadline=None, quality=None):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as f:
+        f.write(quality.encode())
+    return f.name
+
+
+def test_idle_render_is_unchanged():
+    decision = LoadPolicy().decide(SCENES, ["Intro"], "high", stats=load(waiting=2))
+    assert decision.level == "normal" and decision.quality == "high"
+    assert decision.extras and not decision.degraded and decision.headers() == {}
+
+
+def test_busy_caps_quality_and_extras():
+    policy = LoadPolicy(queue_depth=1, wait_seconds=60)
+    # Four renders waiting on four slots
+    decision = policy.decide(SCENES, ["Intro"], "high", stats=load(waiting=4))
+    assert decision.level == "busy" and decision.quality == "low"
+    assert decision.degraded and not decision.extras
+    assert decision.headers()["X-Render-Requested-Quality"] == "high"
+    # A predicted wait of a minute per slot counts the same
+    assert policy.level(load(waiting=1, waiting_cost=240)) == "busy"
+    # Already below the cap: same video, only the extras are off
+    preview = policy.decide(SCENES, ["Intro"], "preview", stats=load(waiting=4))
+    assert not preview.degraded and not preview.extras
+
+    # Extras the request asked for count as degradation, but the video does not need redoing
+    stream = policy.decide(SCENES, ["Intro"], "preview", stats=load(waiting=4), extras=["stream"])
+    assert stream.degraded and not stream.video_degraded
+    assert stream.headers()["X-Render-Dropped-Extras"] == "stream"
+    assert stream.describe()["dropped_extras"] == ["stream"]
+
+
+def test_premium_renders_are_not_degraded():
+    policy = LoadPolicy(premium_keys=["gold"])
+    assert policy.is_premium("gold") and not policy.is_premium("silver") and not policy.is_premium(None)
+    assert not policy.is_premium("골드")
+    decision = policy.decide(SCENES, ["Intro"], "high", premium=True, stats=load(waiting=40))
+    assert decision.level == "overloaded" and decision.quality == "high" and decision.extras
+
+
+def test_overload_caps_video_length():
+    policy = LoadPolicy(max_seconds=30)
+    overloaded = load(waiting=8)
+    decision = policy.decide(SCENES, ["Intro", "Body", "Outro"], "high", stats=overloaded)
+    assert decision.quality == "preview"
+    assert decision.scene_names == ["Intro", "Body"] and decision.dropped_scenes == ["Outro"]
+    assert decision.frame_slice is None
+
+    # A first scene longer than the cap is cut short: 15 s at 10 fps
+    policy.max_seconds = 15
+    decision = policy.decide(SCENES, ["Outro", "Intro"], "high", stats=overloaded)
+    assert decision.scene_names == ["Outro"] and decision.dropped_scenes == ["Intro"]
+    assert decision.frame_slice == (0, 150)
+    assert decision.describe()["cut_at_frame"] == 150
+
+
+def test_degraded_render_is_rerendered_once_load_drops(monkeypatch):
+    monkeypatch.setattr(ManimProcessor, "render_scene", fake_render_scene)
+    policy = LoadPolicy()
+    scheduler = FakeScheduler(load(waiting=4))
+    decision = policy.decide(SCENES, ["Intro"], "high", stats=scheduler.stats())
+    degraded = fake_render_scene(None, "scene.py", "Intro", None, quality=decision.quality)
+
+    rerenders = RerenderQueue(policy, scheduler, poll_seconds=3600)
+    render = rerenders.add(degraded, SCENES, "Intro", decision)
+    assert not render.done and render.quality == "low"
+    assert rerenders.run_once() is None
+
+    # Below the busy threshold but not yet half of it
+    scheduler.load = load(waiting=3)
+    assert rerenders.run_once() is None
+    scheduler.load = load(waiting=1)
+    assert rerenders.run_once() is render
+    assert render.wait(timeout=10) == degraded
+    assert render.quality == "high" and render.error is None
+    with open(degraded) as f:
+        assert f.read() == "high"
+    assert rerenders.stats() == {"pending": 0, "running": False}
+    os.remove(degraded)
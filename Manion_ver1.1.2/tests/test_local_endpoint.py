@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Test local OpenAI-compatible endpoints with pooled connections and hosted failover.
+
+Two stand-in servers play the local model and the hosted provider, so no API
+keys or network access are needed.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Read once when litellm is imported; it only stops a network fetch
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.deadline import Deadline, DeadlineExceeded
+from manimator.utils.llm_client import stage_completion
+
+
+def start_standin_server(name, status=200, delay=0.0):
+    """Starts an OpenAI-compatible chat completions server on a free port"""
+    client_ports = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            client_ports.append(self.client_address[1])
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(delay)
+            if status != 200:
+                payload = json.dumps({"error": {"message": "overloaded"}}).encode()
+            else:
+                payload = json.dumps({
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"{name}:{body['model']}"},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/v1", client_ports
+
+
+MESSAGES = [{"role": "user", "content": "Explain Fourier Transform"}]
+
+HOSTED_BASE, HOSTED_PORTS = start_standin_server("hosted")
+
+
+def use_hosted(monkeypatch):
+    """Points the hosted provider at its stand-in server"""
+    monkeypatch.setenv("OPENAI_API_BASE", HOSTED_BASE)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("PROMPT_SCENE_GEN_MODEL", "openai/hosted-model")
+    return monkeypatch
+
+
+@pytest.fixture
+def hosted(monkeypatch):
+    return use_hosted(monkeypatch)
+
+
+def configure_local(monkeypatch, base_url, max_concurrency=4):
+    monkeypatch.setenv("PROMPT_SCENE_GEN_API_BASE", base_url)
+    monkeypatch.setenv("PROMPT_SCENE_GEN_LOCAL_MODEL", "local-model")
+    monkeypatch.setenv("PROMPT_SCENE_GEN_MAX_CONCURRENCY", str(max_concurrency))
+
+
+def content(response):
+    return response.choices[0].message.content
+
+
+def test_local_endpoint_reuses_connection(hosted):
+    """Calls go to the local server over one keep-alive connection"""
+    base_url, ports = start_standin_server("local")
+    configure_local(hosted, base_url)
+    for _ in range(3):
+        assert content(stage_completion("scene", MESSAGES)) == "local:local-model"
+    assert len(ports) == 3
+    assert len(set(ports)) == 1
+
+
+def test_overloaded_local_endpoint_fails_over(hosted):
+    """A 503 from the local server falls back to the hosted model"""
+    base_url, _ = start_standin_server("local", status=503)
+    configure_local(hosted, base_url)
+    assert content(stage_completion("scene", MESSAGES)) == "hosted:hosted-model"
+
+
+def test_saturated_local_endpoint_fails_over(hosted):
+    """When every local slot is busy the extra request goes to the hosted model"""
+    base_url, _ = start_standin_server("local", delay=0.5)
+    configure_local(hosted, base_url, max_concurrency=1)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = sorted(content(r) for r in pool.map(lambda _: stage_completion("scene", MESSAGES), range(2)))
+    assert results == ["hosted:hosted-model", "local:local-model"]
+
+
+def test_fallback_gets_the_remaining_budget(hosted):
+    """The hosted call is re-limited after a slow local failure, or skipped at the deadline"""
+    base_url, _ = start_standin_server("local", status=503, delay=0.5)
+    configure_local(hosted, base_url)
+    timeouts = []
+
+    def limits(deadline):
+        # Timeout only: max_tokens would refuse a budget this small up front
+        timeouts.append(deadline.timeout("scene_description"))
+        return {"timeout": timeouts[-1]}
+
+    deadline = Deadline(10)
+    assert content(stage_completion("scene", MESSAGES, limits=partial(limits, deadline))) == "hosted:hosted-model"
+    assert len(timeouts) == 2
+    assert timeouts[1] <= timeouts[0] - 0.5
+
+    hosted_calls = len(HOSTED_PORTS)
+    with pytest.raises(DeadlineExceeded):
+        stage_completion("scene", MESSAGES, limits=partial(limits, Deadline(1.3)))
+    assert len(timeouts) == 3
+    assert len(HOSTED_PORTS) == hosted_calls
+
+
+def main():
+    """Main test function"""
+    for test in (
+        test_local_endpoint_reuses_connection,
+        test_overloaded_local_endpoint_fails_over,
+        test_saturated_local_endpoint_fails_over,
+        test_fallback_gets_the_remaining_budget,
+    ):
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            test(use_hosted(monkeypatch))
+    print("✅ Local endpoint tests passed")
+
+
+if __name__ == "__main__":
+    main()
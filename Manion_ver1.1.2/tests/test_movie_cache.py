@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test the cross-job partial movie cache with stand-in segment files."""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.disk_cache import DiskCache
+from manimator.utils.movie_cache import PartialMovieCache, partial_movie_dir
+
+
+def write_segments(partial_dir, names, size=100):
+    os.makedirs(partial_dir, exist_ok=True)
+    for name in names:
+        with open(os.path.join(partial_dir, f"{name}.mp4"), "wb") as f:
+            f.write(name.encode().ljust(size, b"\0"))
+
+
+def test_partial_movie_dir_matches_manim_layout():
+    assert partial_movie_dir("/m", "/tmp/x/scene.py", "Intro", "low") == (
+        "/m/videos/scene/480p15/partial_movie_files/Intro"
+    )
+
+
+def test_rerender_reuses_unchanged_segments(tmp_path):
+    """A second job of the same scene starts with the first job's segments"""
+    cache = PartialMovieCache(str(tmp_path / "cache"), max_bytes=10**6)
+    first = str(tmp_path / "job1")
+    write_segments(first, ["111_1", "222_2", "uncached_00000"])
+    assert cache.harvest(first, "Intro", "low") == 2
+
+    second = str(tmp_path / "job2")
+    assert cache.populate(second, "Intro", "low") == 2
+    assert sorted(os.listdir(second)) == ["111_1.mp4", "222_2.mp4"]
+    # Hard links, not copies
+    assert os.stat(os.path.join(second, "111_1.mp4")).st_ino == os.stat(
+        os.path.join(first, "111_1.mp4")
+    ).st_ino
+    # Other qualities and scenes do not share segments
+    assert cache.populate(str(tmp_path / "job3"), "Intro", "high") == 0
+    assert cache.populate(str(tmp_path / "job4"), "Other", "low") == 0
+
+    # An edit changes one animation: only the new segment is added
+    write_segments(second, ["333_3"])
+    os.remove(os.path.join(second, "222_2.mp4"))
+    assert cache.harvest(second, "Intro", "low") == 1
+    third = str(tmp_path / "job5")
+    cache.populate(third, "Intro", "low")
+    assert sorted(os.listdir(third)) == ["111_1.mp4", "333_3.mp4"]
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), max_bytes=250)
+    source = str(tmp_path / "segments")
+    write_segments(source, ["a", "b", "c"])
+    for name in ["a", "b", "c"]:
+        cache.put_file(name, os.path.join(source, f"{name}.mp4"))
+        past = time.time() - 100 + ord(name)
+        os.utime(cache.path(name), (past, past))
+    assert cache.get("a")  # "a" becomes the most recently used
+    assert cache.evict() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats()["hits"] == 3
+
+
+def test_concurrent_puts_of_one_key(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), max_bytes=10**6)
+    source = str(tmp_path / "segments")
+    write_segments(source, ["same"])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = set(pool.map(lambda _: cache.put_file("same", os.path.join(source, "same.mp4")), range(32)))
+    assert len(paths) == 1
+    assert os.listdir(os.path.dirname(paths.pop())) == ["same"]
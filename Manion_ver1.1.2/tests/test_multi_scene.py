@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Test rendering every scene class of a generated file.
+
+render_scene and dry_run are replaced by stand-ins, so no manim install is
+needed.
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.layout import LayoutIssue
+from manimator.utils.multi_scene import (
+    dry_run_scenes,
+    render_scenes,
+    render_scenes_joined,
+    scenes_to_render,
+)
+from manimator.utils.schema import DryRunResult, ManimProcessor
+from manimator.utils.validator import leaf_scene_classes
+
+CODE = """class Base(Scene):
+    def title(self, text):
+        self.play(Write(Text(text)))
+
+class Intro(Base):
+    def construct(self):
+        self.title("Intro")
+
+class Surface(ThreeDScene):
+    def construct(self):
+        self.play(Create(Surface(lambda u, v: [u, v, 0])))
+
+class Zoom(MovingCameraScene):
+    def construct(self):
+        self.play(self.camera.frame.animate.scale(0.5))
+"""
+
+
+def make_fake_render(active, peak, fail=None):
+    def fake_render_scene(self, scene_file, scene_name, temp_dir, deadline=None, quality=None, sections=None):
+        """Stands in for manim: the video content is the scene name"""
+        with active["lock"]:
+            active["now"] += 1
+            peak.append(active["now"])
+        time.sleep(0.2)
+        with active["lock"]:
+            active["now"] -= 1
+        if scene_name == fail:
+            raise RuntimeError(f"{scene_name} failed")
+        path = os.path.join(temp_dir, f"{scene_name}.mp4")
+        with open(path, "w") as f:
+            f.write(scene_name)
+        return path
+    return fake_render_scene
+
+
+def test_leaf_scenes_skip_local_bases():
+    assert leaf_scene_classes(CODE) == ["Intro", "Surface", "Zoom"]
+    assert scenes_to_render(CODE, "first") == ["Intro"]
+    assert scenes_to_render(CODE, "playlist") == ["Intro", "Surface", "Zoom"]
+    with pytest.raises(ValueError):
+        scenes_to_render(CODE, "shuffle")
+
+
+def test_scenes_render_concurrently_in_order(tmp_path, monkeypatch):
+    active, peak = {"now": 0, "lock": threading.Lock()}, []
+    monkeypatch.setattr(ManimProcessor, "render_scene", make_fake_render(active, peak))
+    videos = render_scenes(
+        ManimProcessor(), "scene.py", ["Intro", "Surface", "Zoom"], str(tmp_path), workers=3
+    )
+    assert [open(v).read() for v in videos] == ["Intro", "Surface", "Zoom"]
+    assert max(peak) == 3
+
+
+def test_failed_scene_removes_the_others(tmp_path, monkeypatch):
+    active, peak = {"now": 0, "lock": threading.Lock()}, []
+    monkeypatch.setattr(
+        ManimProcessor, "render_scene", make_fake_render(active, peak, fail="Surface")
+    )
+    with pytest.raises(RuntimeError, match="Surface failed"):
+        render_scenes(
+            ManimProcessor(), "scene.py", ["Intro", "Surface", "Zoom"], str(tmp_path), workers=3
+        )
+    assert not any(name.endswith(".mp4") for _, _, files in os.walk(tmp_path) for name in files)
+
+
+def test_dry_runs_combine_with_layout_times_offset(monkeypatch):
+    def fake_dry_run(self, scene_file, scene_name, temp_dir, deadline=None, previews=None):
+        issue = LayoutIssue("overlap", ["a", "b"], 1.0, 2.0, "50% overlap")
+        return DryRunResult(ok=True, duration=4.0, animations=3, layout=[issue])
+
+    monkeypatch.setattr(ManimProcessor, "dry_run", fake_dry_run)
+    result = dry_run_scenes(ManimProcessor(), "scene.py", ["Intro", "Zoom"], "/tmp")
+    assert result.ok and result.duration == 8.0 and result.animations == 6
+    assert [(i.start, i.end) for i in result.layout] == [(1.0, 2.0), (5.0, 6.0)]
+
+    def failing_dry_run(self, scene_file, scene_name, temp_dir, deadline=None, previews=None):
+        if scene_name == "Zoom":
+            return DryRunResult(ok=False, error="AttributeError: frame")
+        return fake_dry_run(self, scene_file, scene_name, temp_dir)
+
+    monkeypatch.setattr(ManimProcessor, "dry_run", failing_dry_run)
+    result = dry_run_scenes(ManimProcessor(), "scene.py", ["Intro", "Zoom"], "/tmp")
+    assert not result.ok and result.error == "AttributeError: frame"
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="needs ffmpeg")
+def test_joined_scenes(tmp_path, monkeypatch):
+    def ffmpeg_render(self, scene_file, scene_name, temp_dir, deadline=None, quality=None, sections=None):
+        path = os.path.join(temp_dir, f"{scene_name}.mp4")
+        os.system(
+            f"ffmpeg -loglevel error -f lavfi -i color=c=black:s=64x64:d=1 -r 15 {path}"
+        )
+        return path
+
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(ManimProcessor, "render_scene", ffmpeg_render)
+    joined = render_scenes_joined(ManimProcessor(), "scene.py", ["Intro", "Zoom"], str(tmp_path))
+    assert os.path.getsize(joined) > 0
+    assert os.listdir(tmp_path / "artifacts") == [os.path.basename(joined)]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test the poster, contact sheet and loop preview artifacts."""
+
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.previews import KeyframeRecorder, contact_sheet, write_previews
+from manimator.utils.schema import ManimProcessor
+
+SCENE = """class Steps(Scene):
+    def construct(self):
+        square = Square()
+        self.play(Create(square))
+        self.wait()
+        self.play(square.animate.shift(RIGHT))
+        self.play(FadeOut(square))
+"""
+
+
+def frames(count, size=(320, 180)):
+    return [Image.new("RGB", size, (40 * i, 0, 0)) for i in range(count)]
+
+
+def test_contact_sheet_grid():
+    sheet = contact_sheet(frames(6), [float(i) for i in range(6)], columns=4)
+    # 4 columns, 2 rows, 4px gaps
+    assert sheet.size == (4 * 324 + 4, 2 * 184 + 4)
+
+
+def test_write_previews(tmp_path):
+    recorder = KeyframeRecorder()
+    recorder.frames = frames(3)
+    recorder.times = [1.0, 2.0, 3.0]
+    paths = {
+        "poster": str(tmp_path / "poster.png"),
+        "contact_sheet": str(tmp_path / "sheet.png"),
+        "loop": str(tmp_path / "loop.gif"),
+    }
+    written = write_previews(recorder, Image.new("RGBA", (854, 480)), paths, frame_ms=500)
+    assert written == paths
+    assert Image.open(paths["poster"]).size == (854, 480)
+    loop = Image.open(paths["loop"])
+    assert loop.n_frames == 3
+    assert loop.info["duration"] == 500
+
+
+def test_static_scene_previews_use_the_poster(tmp_path):
+    paths = {"contact_sheet": str(tmp_path / "sheet.png"), "loop": str(tmp_path / "loop.webp")}
+    written = write_previews(KeyframeRecorder(), Image.new("RGBA", (854, 480)), paths)
+    assert set(written) == {"contact_sheet", "loop"}
+    assert Image.open(paths["contact_sheet"]).size == (328, 188)
+
+
+def test_dry_run_writes_previews(tmp_path, monkeypatch):
+    pytest.importorskip("manim")
+    monkeypatch.setenv("MANIM_RENDER_POOL_SIZE", "0")
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    processor = ManimProcessor()
+    with processor.create_temp_dir() as temp_dir:
+        scene_file = processor.save_code(SCENE, temp_dir)
+        result = processor.dry_run(scene_file, "Steps", temp_dir, previews=True)
+    assert result.ok, result.error
+    assert set(result.previews) == {"poster", "contact_sheet", "loop"}
+    # Three plays, the wait adds no keyframe
+    assert Image.open(result.previews["loop"]).n_frames == 3
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Test render quality profiles and the progressive preview → final swap.
+
+render_scene is replaced by a stand-in that writes the quality name into the
+output file, so no manim install is needed.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils import progressive
+from manimator.utils.quality import quality_cli_args, quality_dir, resolve_quality
+from manimator.utils.schema import ManimProcessor
+
+
+def fake_render_scene(self, scene_file, scene_name, temp_dir, deadline=None, quality=None):
+    """Stands in for manim: the video content is the quality name"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as f:
+        f.write(quality.encode())
+    return f.name
+
+
+def test_quality_profiles(monkeypatch):
+    """Profiles map to manim flags and output directories"""
+    monkeypatch.delenv("RENDER_QUALITY", raising=False)
+    assert resolve_quality() == "low"
+    assert quality_dir("low") == "480p15"
+    assert quality_dir("high") == "1080p60"
+    assert quality_cli_args("high") == ["--resolution", "1920,1080", "--frame_rate", "60"]
+    monkeypatch.setenv("RENDER_QUALITY", "medium")
+    assert resolve_quality() == "medium"
+    with pytest.raises(ValueError):
+        resolve_quality("8k")
+
+
+def test_progressive_swaps_in_final_render(monkeypatch):
+    """The preview path is returned first and later holds the final render"""
+    monkeypatch.setattr(ManimProcessor, "render_scene", fake_render_scene)
+    render = progressive.render_progressive("class A(Scene): pass", "A", final_quality="high")
+    assert render.quality in ("preview", "high")
+    assert render.wait(timeout=10) == render.artifact_path
+    assert render.done and render.error is None
+    assert render.quality == "high"
+    with open(render.artifact_path) as f:
+        assert f.read() == "high"
+    assert progressive.get_progressive_render(render.render_id) is render
+    os.remove(render.artifact_path)
+
+
+def test_failed_upgrade_keeps_preview(monkeypatch):
+    """If the final render fails the preview stays in place"""
+    def failing_render(self, scene_file, scene_name, temp_dir, deadline=None, quality=None):
+        if quality != "preview":
+            raise RuntimeError("boom")
+        return fake_render_scene(self, scene_file, scene_name, temp_dir, quality=quality)
+
+    monkeypatch.setattr(ManimProcessor, "render_scene", failing_render)
+    render = progressive.render_progressive("class A(Scene): pass", "A")
+    render.wait(timeout=10)
+    assert render.error == "boom"
+    assert render.quality == "preview"
+    with open(render.artifact_path) as f:
+        assert f.read() == "preview"
+    os.remove(render.artifact_path)
+
+
+def test_unknown_final_quality_fails_before_the_preview(monkeypatch):
+    """A bad final quality is a 422 up front, not a failed background render"""
+    calls = []
+
+    def recording_render(self, scene_file, scene_name, temp_dir, deadline=None, quality=None):
+        calls.append(quality)
+        return fake_render_scene(self, scene_file, scene_name, temp_dir, quality=quality)
+
+    monkeypatch.setattr(ManimProcessor, "render_scene", recording_render)
+    with pytest.raises(progressive.HTTPException) as e:
+        progressive.render_progressive("class A(Scene): pass", "A", final_quality="8k")
+    assert e.value.status_code == 422
+    monkeypatch.setenv("PROGRESSIVE_FINAL_QUALITY", "8k")
+    with pytest.raises(progressive.HTTPException):
+        progressive.render_progressive("class A(Scene): pass", "A")
+    assert calls == []
+
+
+def test_workers_are_read_when_first_needed(monkeypatch):
+    """PROGRESSIVE_HD_WORKERS set after import still sizes the pool"""
+    monkeypatch.setattr(ManimProcessor, "render_scene", fake_render_scene)
+    monkeypatch.setattr(progressive, "_executor", None)
+    monkeypatch.setenv("PROGRESSIVE_HD_WORKERS", "3")
+    render = progressive.render_progressive("class A(Scene): pass", "A", final_quality="medium")
+    render.wait(timeout=10)
+    assert progressive._executor._max_workers == 3
+    progressive._executor.shutdown()
+    os.remove(render.artifact_path)
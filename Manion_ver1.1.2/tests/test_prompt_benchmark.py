@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Test the prompt profile benchmark's scoring on recorded replies.
+
+Replies come from an in-memory recording, so no model is called; the
+manim dry-run check is switched off.
+"""
+
+import os
+import sys
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.api.animation_generation import build_code_system_prompt
+from manimator.prompt_benchmark import BENCHMARK_CORPUS, run_case, summarize
+
+GOOD_REPLY = """Here you go:
+
+```python
+from manim import *
+
+class Intro(Scene):
+    def construct(self):
+        self.play(Write(Text("Hi")))
+```"""
+
+
+def test_recorded_replies_are_scored_per_profile():
+    prompt = BENCHMARK_CORPUS[0]
+    recording = {
+        ("full", prompt): {"response": GOOD_REPLY, "latency": 2.0},
+        ("minimal", prompt): {"response": "Sorry, I can't help with that.", "latency": 1.0},
+    }
+    results = [
+        run_case(profile, prompt, "recorded", None, recording, render=False)
+        for profile in ("full", "minimal", "compact")
+    ]
+    assert results[0]["extracted"] and results[0]["valid"]
+    assert not results[1]["extracted"] and not results[1]["valid"]
+    assert results[2]["response"] is None and results[2]["latency"] is None
+
+    summary = summarize(results)
+    assert summary["full"]["extraction_rate"] == 1.0 and summary["full"]["avg_latency"] == 2.0
+    assert summary["minimal"]["extraction_rate"] == 0.0
+    assert summary["compact"]["avg_latency"] is None and summary["compact"]["dry_run_rate"] is None
+    # Smaller profiles send fewer prompt tokens
+    assert summary["minimal"]["avg_prompt_tokens"] < summary["full"]["avg_prompt_tokens"]
+
+
+def test_snippet_count_env_overrides_profile(monkeypatch):
+    monkeypatch.delenv("CODE_GEN_SNIPPET_COUNT", raising=False)
+    prompt = BENCHMARK_CORPUS[0]
+    default = build_code_system_prompt(prompt, "minimal")
+    monkeypatch.setenv("CODE_GEN_SNIPPET_COUNT", "3")
+    assert len(build_code_system_prompt(prompt, "minimal")) > len(default)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Test the render farm queue as a single-machine cluster.
+
+Nodes are threads sharing one SQLite queue file; rendering is replaced by a
+stand-in that writes the job's scene names to the artifact store.
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.artifacts import new_artifact_path
+from manimator.utils.render_farm import DONE, FAILED, QUEUED, FarmNode, RenderQueue, get_render_queue
+
+
+def fake_render(job):
+    if "Broken" in job.scene_names:
+        raise RuntimeError("Broken failed")
+    time.sleep(0.05)
+    path = new_artifact_path()
+    with open(path, "w") as f:
+        f.write(",".join(job.scene_names))
+    return path
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    return RenderQueue(str(tmp_path / "farm.db"), lease_seconds=5)
+
+
+def test_jobs_go_to_the_least_loaded_node(queue):
+    queue.heartbeat("a", 1)
+    queue.heartbeat("b", 2)
+    first = queue.submit("code 1", ["One"], "low", 10.0)
+    second = queue.submit("code 2", ["Two"], "low", 10.0)
+    third = queue.submit("code 3", ["Three"], "low", 10.0)
+    # b has twice the slots, so it takes two jobs before a gets a second
+    assert sorted([first.node, second.node, third.node]) == ["a", "b", "b"]
+
+
+def test_idle_node_steals_from_busy_node(queue):
+    queue.heartbeat("busy", 1)
+    jobs = [queue.submit(f"code {i}", [f"S{i}"], "low", float(i + 1)) for i in range(4)]
+    assert {job.node for job in jobs} == {"busy"}
+
+    thief = FarmNode(queue, "idle", slots=2, render=fake_render, poll_seconds=0.01)
+    thief.start()
+    try:
+        finished = [queue.wait(job.job_id, timeout=10, poll_seconds=0.02) for job in jobs]
+    finally:
+        thief.stop()
+    assert all(job.status == DONE and job.node == "idle" for job in finished)
+    assert thief.completed == 4
+
+
+def test_two_nodes_share_the_queue(queue):
+    nodes = [FarmNode(queue, name, slots=2, render=fake_render, poll_seconds=0.01) for name in "ab"]
+    for node in nodes:
+        node.start()
+    try:
+        jobs = [queue.submit(f"code {i}", [f"S{i}"], "low", 1.0) for i in range(12)]
+        finished = [queue.wait(job.job_id, timeout=10, poll_seconds=0.02) for job in jobs]
+    finally:
+        for node in nodes:
+            node.stop()
+    assert all(job.status == DONE for job in finished)
+    assert sum(node.completed for node in nodes) == 12
+    with open(os.path.join(os.environ["RENDER_ARTIFACT_DIR"], finished[3].artifact)) as f:
+        assert f.read() == "S3"
+
+
+def test_repeated_render_is_served_from_cache(queue):
+    node = FarmNode(queue, "a", render=fake_render)
+    job = queue.submit("code", ["Intro"], "low", 1.0)
+    assert queue.submit("code", ["Intro"], "low", 1.0).job_id == job.job_id
+    assert node.run_one()
+    again = queue.submit("code", ["Intro"], "low", 1.0)
+    assert again.job_id == job.job_id and again.status == DONE
+    # Another quality is another render
+    assert queue.submit("code", ["Intro"], "high", 5.0).job_id != job.job_id
+
+
+def test_failed_render_is_reported(queue):
+    node = FarmNode(queue, "a", render=fake_render)
+    job = queue.submit("code", ["Broken"], "low", 1.0)
+    assert node.run_one()
+    failed = queue.get(job.job_id)
+    assert failed.status == FAILED and failed.error == "Broken failed"
+
+
+def test_dead_node_jobs_are_requeued(queue):
+    queue.heartbeat("dead", 1)
+    job = queue.submit("code", ["Intro"], "low", 1.0)
+    assert queue.claim("dead").job_id == job.job_id
+    queue.lease_seconds = 0.05
+    time.sleep(0.1)
+    queue.heartbeat("alive", 1)
+    requeued = queue.get(job.job_id)
+    assert requeued.status == QUEUED and requeued.node == "alive"
+    # The dead node's late result no longer counts
+    assert not queue.finish(job.job_id, "dead", artifact="late.mp4")
+
+
+def test_render_of_a_lost_lease_is_removed(queue):
+    rendered = []
+
+    def render_after_lease_lost(job):
+        # The node stalls past its lease; another node takes the job back
+        queue.lease_seconds = 0.05
+        time.sleep(0.1)
+        queue.heartbeat("alive", 1)
+        queue.lease_seconds = 5
+        rendered.append(fake_render(job))
+        return rendered[-1]
+
+    node = FarmNode(queue, "a", render=render_after_lease_lost)
+    job = queue.submit("code", ["Intro"], "low", 1.0)
+    assert node.run_one()
+    assert queue.get(job.job_id).status == QUEUED
+    assert not os.path.exists(rendered[0])
+
+
+def test_queue_is_shared_per_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("RENDER_FARM_DB", str(tmp_path / "farm.db"))
+    assert get_render_queue() is get_render_queue()
+    monkeypatch.setenv("RENDER_FARM_DB", str(tmp_path / "other.db"))
+    assert get_render_queue().path == str(tmp_path / "other.db")
+
+
+def test_node_survives_queue_errors(queue, monkeypatch):
+    """A locked database is logged and retried; the claim and heartbeat threads keep running"""
+    failures = {"claim": 2, "heartbeat": 2, "finish": 1}
+    # start() registers the node itself before its threads run
+    calls = {"heartbeat": 0}
+
+    def flaky(name, method):
+        def call(*args, **kwargs):
+            calls[name] = calls.get(name, 0) + 1
+            if failures[name] and (name != "heartbeat" or calls[name] > 1):
+                failures[name] -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return method(*args, **kwargs)
+        return call
+
+    for name in failures:
+        monkeypatch.setattr(queue, name, flaky(name, getattr(queue, name)))
+    queue.lease_seconds = 0.1
+    node = FarmNode(queue, "a", render=fake_render, poll_seconds=0.01)
+    node.start()
+    try:
+        job = queue.submit("code", ["Intro"], "low", 1.0)
+        assert queue.wait(job.job_id, timeout=10, poll_seconds=0.02).status == DONE
+        time.sleep(0.2)
+        assert failures == {"claim": 0, "heartbeat": 0, "finish": 0}
+        assert all(thread.is_alive() for thread in node._threads)
+    finally:
+        node.stop()
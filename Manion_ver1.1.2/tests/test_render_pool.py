@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Test the warm render worker pool with stand-in warm-up and job functions."""
+
+import os
+import sys
+import time
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.render_pool import RenderTimeout, RenderWorkerPool
+
+WARM = {"imported": False}
+JOB_STATE = {"count": 0}
+
+
+def fake_warm():
+    """Stands in for importing manim once per worker"""
+    WARM["imported"] = True
+
+
+def fake_runner(job):
+    """Stands in for rendering; mutates module state to check isolation"""
+    time.sleep(job.get("sleep", 0))
+    # Written, not just reserved, so it counts towards the job's peak RSS
+    ballast = b"x" * (job.get("allocate_mb", 0) * 1024 * 1024)
+    del ballast
+    JOB_STATE["count"] += 1
+    return {
+        "ok": True,
+        "warm": WARM["imported"],
+        "count": JOB_STATE["count"],
+        "worker_pid": os.getppid(),
+        "job_pid": os.getpid(),
+    }
+
+
+def test_jobs_run_warm_and_isolated():
+    """Jobs see the warm imports but never each other's state"""
+    pool = RenderWorkerPool(1, max_jobs_per_worker=10, warm=fake_warm, runner=fake_runner)
+    try:
+        first = pool.submit({})
+        second = pool.submit({})
+        assert first["warm"] and second["warm"]
+        assert first["count"] == second["count"] == 1
+        assert first["worker_pid"] == second["worker_pid"]
+        assert first["job_pid"] != second["job_pid"]
+    finally:
+        pool.close()
+
+
+def test_worker_recycled_after_max_jobs():
+    """A worker is replaced once it has served max_jobs_per_worker jobs"""
+    pool = RenderWorkerPool(1, max_jobs_per_worker=2, warm=fake_warm, runner=fake_runner)
+    try:
+        workers = [pool.submit({})["worker_pid"] for _ in range(3)]
+        assert workers[0] == workers[1] != workers[2]
+    finally:
+        pool.close()
+
+
+def test_worker_recycled_after_large_job():
+    """A job's peak RSS counts, although it ran in a forked child"""
+    pool = RenderWorkerPool(1, max_rss_mb=400, warm=fake_warm, runner=fake_runner)
+    try:
+        small = pool.submit({})
+        large = pool.submit({"allocate_mb": 500})
+        after = pool.submit({})
+        assert small["rss_mb"] < 400 < large["rss_mb"]
+        assert small["worker_pid"] == large["worker_pid"] != after["worker_pid"]
+    finally:
+        pool.close()
+
+
+def test_timeout_kills_job_and_keeps_pool_usable():
+    """A stuck job is killed and the pool keeps serving"""
+    pool = RenderWorkerPool(1, warm=fake_warm, runner=fake_runner)
+    try:
+        try:
+            pool.submit({"sleep": 30}, timeout=1)
+        except RenderTimeout:
+            pass
+        else:
+            raise AssertionError("expected RenderTimeout")
+        assert pool.submit({})["ok"]
+    finally:
+        pool.close()
+
+
+def main():
+    """Main test function"""
+    test_jobs_run_warm_and_isolated()
+    test_worker_recycled_after_max_jobs()
+    test_worker_recycled_after_large_job()
+    test_timeout_kills_job_and_keeps_pool_usable()
+    print("✅ Render pool tests passed")
+
+
+if __name__ == "__main__":
+    main()
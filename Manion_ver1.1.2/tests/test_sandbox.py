@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test render resource limits with small stand-in workloads."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.render_pool import RenderWorkerPool
+from manimator.utils.sandbox import (
+    LIMIT_EXIT_CODE,
+    LIMIT_MARKER,
+    RenderLimitExceeded,
+    RenderLimits,
+    run_limited,
+)
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_cpu_limit_kills_busy_loop():
+    with pytest.raises(RenderLimitExceeded) as e:
+        run_limited(python("while True: pass"), RenderLimits(wall_seconds=20, cpu_seconds=0.5))
+    assert e.value.limit == "cpu_seconds"
+    assert e.value.detail["limit"] == "cpu_seconds"
+
+
+def test_rss_limit_counts_the_whole_process_tree(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    hog = (
+        "import os, subprocess, sys, time\n"
+        f"child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "data = bytearray(200 * 1024 * 1024)\n"
+        "time.sleep(60)\n"
+    )
+    with pytest.raises(RenderLimitExceeded) as e:
+        run_limited(python(hog), RenderLimits(wall_seconds=20, max_rss_mb=100))
+    assert e.value.limit == "max_rss_mb"
+    # The grandchild was killed with the group (gone, or a zombie awaiting reaping)
+    child = int(pid_file.read_text())
+    time.sleep(0.2)
+    try:
+        with open(f"/proc/{child}/stat") as f:
+            assert f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except FileNotFoundError:
+        pass
+
+
+def test_cpu_limit_counts_exited_children():
+    """Short CPU-bound children each stay under the limit but add up past it"""
+    burner = (
+        "import subprocess, sys, time\n"
+        "burn = 'import time\\nend = time.process_time() + 0.4\\nwhile time.process_time() < end: pass'\n"
+        "for _ in range(10):\n"
+        "    subprocess.run([sys.executable, '-c', burn])\n"
+        "time.sleep(60)\n"
+    )
+    with pytest.raises(RenderLimitExceeded) as e:
+        run_limited(python(burner), RenderLimits(wall_seconds=20, cpu_seconds=1.0))
+    assert e.value.limit == "cpu_seconds"
+
+
+def test_output_limit(tmp_path):
+    writer = f"open({str(tmp_path / 'out.bin')!r}, 'wb').write(b'0' * 8 * 1024 * 1024); import time; time.sleep(60)"
+    with pytest.raises(RenderLimitExceeded) as e:
+        run_limited(python(writer), RenderLimits(wall_seconds=20, max_output_mb=4), output_dir=str(tmp_path))
+    assert e.value.limit == "max_output_mb"
+
+
+def test_wall_clock_and_reported_limits():
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_limited(python("import time; time.sleep(60)"), RenderLimits(wall_seconds=0.5))
+    reporter = f"import sys; sys.stderr.write('{LIMIT_MARKER} max_video_seconds=900.0\\n'); sys.exit({LIMIT_EXIT_CODE})"
+    with pytest.raises(RenderLimitExceeded) as e:
+        run_limited(python(reporter), RenderLimits(max_video_seconds=600))
+    assert e.value.limit == "max_video_seconds"
+    assert e.value.value == 900.0
+
+
+def noop_warm():
+    pass
+
+
+def memory_hog(job):
+    data = bytearray(job["mb"] * 1024 * 1024)
+    time.sleep(30)
+    return {"ok": True, "size": len(data)}
+
+
+def test_pool_job_over_rss_limit_is_killed_and_replaced():
+    pool = RenderWorkerPool(1, warm=noop_warm, runner=memory_hog)
+    try:
+        started = time.monotonic()
+        with pytest.raises(RenderLimitExceeded) as e:
+            pool.submit({"mb": 300}, timeout=20, limits=RenderLimits(max_rss_mb=150))
+        assert e.value.limit == "max_rss_mb"
+        assert time.monotonic() - started < 10
+        assert pool._idle.qsize() == 1
+    finally:
+        pool.close()
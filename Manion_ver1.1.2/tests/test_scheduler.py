@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Test shortest-job-first render scheduling, core sets and encode slots."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.deadline import Deadline, DeadlineExceeded
+from manimator.utils.scheduler import RenderScheduler, core_sets, encode_slot
+
+
+def run_queued(scheduler, jobs, gap=0.02):
+    """Occupies the single slot, queues jobs (name, cost) in order, then frees it.
+
+    Returns:
+        list: Job names in the order they got the slot
+    """
+
+    order, release = [], threading.Event()
+
+    def blocker():
+        with scheduler.slot(0.0):
+            release.wait()
+
+    def job(name, cost):
+        with scheduler.slot(cost):
+            order.append(name)
+
+    threads = [threading.Thread(target=blocker)]
+    threads[0].start()
+    time.sleep(gap)
+    for name, cost in jobs:
+        threads.append(threading.Thread(target=job, args=(name, cost)))
+        threads[-1].start()
+        time.sleep(gap)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    return order
+
+
+def test_shortest_job_runs_first():
+    scheduler = RenderScheduler(1, aging=0.0, pin_cpus=False)
+    jobs = [("hd", 300.0), ("preview", 2.0), ("medium", 60.0)]
+    assert run_queued(scheduler, jobs) == ["preview", "medium", "hd"]
+    assert scheduler.stats()["dispatched"] == 4
+
+
+def test_fifo_keeps_arrival_order():
+    scheduler = RenderScheduler(1, policy="fifo", pin_cpus=False)
+    jobs = [("hd", 300.0), ("preview", 2.0), ("medium", 60.0)]
+    assert run_queued(scheduler, jobs) == ["hd", "preview", "medium"]
+
+
+def test_aging_lets_long_jobs_through():
+    # 0.1s more waiting outweighs a 3s cost difference at this aging rate
+    scheduler = RenderScheduler(1, aging=100.0, pin_cpus=False)
+    jobs = [("hd", 5.0), ("preview", 2.0)]
+    assert run_queued(scheduler, jobs, gap=0.1) == ["hd", "preview"]
+
+
+def test_wait_for_slot_ends_at_the_deadline():
+    scheduler = RenderScheduler(1, pin_cpus=False)
+    with scheduler.slot(0.0):
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded) as excinfo:
+            with scheduler.slot(1.0, Deadline(0.2)):
+                pass
+        assert excinfo.value.stage == "render_queue"
+        assert time.monotonic() - started < 1.0
+        assert scheduler.stats()["waiting"] == 0
+    # The expired job left the queue, so the slot is handed out again
+    with scheduler.slot(0.0, Deadline(5)):
+        pass
+
+
+def test_core_sets_are_disjoint():
+    assert core_sets(2, list(range(8))) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    assert core_sets(3, list(range(7))) == [[0, 1], [2, 3], [4, 5]]
+    # Fewer than two cores per slot: not pinned at all
+    assert core_sets(4, list(range(7))) == [[], [], [], []]
+    assert core_sets(3, [0, 1]) == [[], [], []]
+
+
+def test_encode_slots_cap_concurrency(tmp_path, monkeypatch):
+    monkeypatch.setenv("FFMPEG_ENCODE_SLOTS", "2")
+    monkeypatch.setenv("FFMPEG_SLOT_DIR", str(tmp_path))
+    active, peak, lock = [0], [], threading.Lock()
+
+    def encode():
+        with encode_slot(poll_seconds=0.01):
+            with lock:
+                active[0] += 1
+                peak.append(active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=encode) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert max(peak) == 2 and len(peak) == 6
+
+
+def test_encode_slot_wait_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setenv("FFMPEG_ENCODE_SLOTS", "1")
+    monkeypatch.setenv("FFMPEG_SLOT_DIR", str(tmp_path))
+    with encode_slot():
+        with pytest.raises(TimeoutError):
+            with encode_slot(timeout=0.05, poll_seconds=0.01):
+                pass
+    with encode_slot(timeout=0.05):
+        pass
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Test how scenes are cut into sections for parallel rendering."""
+
+import ast
+import os
+import sys
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.sections import build_section_scenes, split_sections
+from manimator.utils.system_prompts import MANIM_EXAMPLE_SCENE
+
+EXAMPLE_CODE = MANIM_EXAMPLE_SCENE.split("```python\n", 1)[1].split("```", 1)[0]
+
+
+def test_splits_at_helpers_and_fade_outs():
+    """Title, intro and each helper call become their own section"""
+    sections = split_sections(EXAMPLE_CODE, "NeuralNetworkExplanation")
+    assert sections is not None
+    first_lines = [ast.unparse(section[0]) for section in sections]
+    assert first_lines[0].startswith("title = Text(")
+    assert first_lines[1].startswith("intro = Text(")
+    assert first_lines[2] == "self.show_neural_network_structure()"
+    # The wait after a helper call stays in that helper's section
+    assert ast.unparse(sections[2][1]) == "self.wait(2)"
+
+
+def test_linear_scene_without_cuts_is_not_split():
+    code = (
+        "class A(Scene):\n"
+        "    def construct(self):\n"
+        "        t = Text('a')\n"
+        "        self.play(Write(t))\n"
+        "        self.wait()\n"
+    )
+    assert split_sections(code, "A") is None
+    assert split_sections("class A(:", "A") is None
+    assert split_sections(code, "Missing") is None
+
+
+def test_sub_scenes_replay_earlier_sections_skipped():
+    """Each sub-scene skips the sections before it and renders its own"""
+    code, names = build_section_scenes(EXAMPLE_CODE, "NeuralNetworkExplanation")
+    tree = ast.parse(code)
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    assert names[0] == "NeuralNetworkExplanationSection00"
+    assert all(name in classes for name in names)
+
+    last = ast.unparse(classes[names[-1]])
+    assert "self.next_section(skip_animations=True)" in last
+    assert "self.show_neural_network_structure()" in last
+    assert last.index("skip_animations=True") < last.index(f"self.next_section({names[-1]!r})")
+    assert "skip_animations" not in ast.unparse(classes[names[0]])
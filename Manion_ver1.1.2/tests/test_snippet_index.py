@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Test snippet retrieval for the code generation prompt."""
+
+import ast
+import os
+import sys
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.few_shot.manim_snippets import MANIM_SNIPPETS
+from manimator.utils.snippet_index import retrieve_snippets, format_snippets
+
+
+def test_snippets_are_valid_python():
+    """Every bundled snippet must parse and define exactly one Scene subclass"""
+    for snippet in MANIM_SNIPPETS:
+        tree = ast.parse(snippet["code"])
+        scenes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+        assert len(scenes) == 1, snippet["name"]
+
+
+def test_retrieval_matches_topic():
+    """Relevant snippets rank first for typical scene descriptions"""
+    factoring = retrieve_snippets("Factor the quadratic polynomial x^2 + 5x + 6", k=1)
+    assert factoring[0]["name"] == "factoring_transform"
+
+    network = retrieve_snippets("Explain how neurons in each layer of a neural network connect", k=1)
+    assert network[0]["name"] == "neural_network_layers"
+
+    plot = retrieve_snippets("Plot the graph of the sigmoid activation function on axes", k=1)
+    assert plot[0]["name"] == "axes_plot"
+
+
+def test_unrelated_prompt_returns_nothing():
+    """Prompts with no overlapping vocabulary fall back to the default prompt"""
+    assert retrieve_snippets("zzz qqq", k=3) == []
+
+
+def test_format_snippets_fences_code():
+    """Formatted snippets are fenced so the model treats them as code"""
+    text = format_snippets(MANIM_SNIPPETS[:2])
+    assert text.count("```python") == 2
+
+
+def main():
+    """Main test function"""
+    test_snippets_are_valid_python()
+    test_retrieval_matches_topic()
+    test_unrelated_prompt_returns_nothing()
+    test_format_snippets_fences_code()
+    print("✅ Snippet retrieval tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Test incremental guard rules for streamed code completions."""
+
+import os
+import sys
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.stream_guard import StreamGuard, StreamGuardViolation
+
+
+def feed_in_chunks(guard, text, size=7):
+    """Feeds text to the guard in small chunks like a real stream"""
+    for i in range(0, len(text), size):
+        if guard.feed(text[i:i + size]):
+            return True
+    return False
+
+
+def expect_violation(guard, text, rule):
+    try:
+        feed_in_chunks(guard, text)
+    except StreamGuardViolation as e:
+        assert e.rule == rule, e.rule
+    else:
+        raise AssertionError(f"expected {rule} violation")
+
+
+def test_complete_block_stops_stream():
+    """A well-formed reply completes at the closing fence"""
+    guard = StreamGuard()
+    reply = "Sure:\n```python\nclass Demo(Scene):\n    def construct(self):\n        self.wait()\n```\nRun it with manim."
+    assert feed_in_chunks(guard, reply)
+    assert "Run it" not in guard.text
+    assert guard.scene_count == 1
+
+
+def test_prose_without_fence_is_aborted():
+    """Replies that never open a python fence are cancelled early"""
+    expect_violation(StreamGuard(fence_within_tokens=20), "Let me explain the idea first. " * 20, "no_code_fence")
+
+
+def test_second_scene_is_aborted():
+    """A second Scene subclass in the block cancels the stream"""
+    reply = (
+        "```python\nclass First(Scene):\n    pass\n\n"
+        "class Second(MovingCameraScene):\n    pass\n```"
+    )
+    expect_violation(StreamGuard(), reply, "extra_scene")
+    assert feed_in_chunks(StreamGuard(max_scenes=None), reply)
+
+
+def test_length_cap():
+    """Runaway output is cut at the length cap"""
+    reply = "```python\n" + "x = 1\n" * 1000
+    expect_violation(StreamGuard(max_tokens=100), reply, "length_cap")
+
+
+def main():
+    """Main test function"""
+    test_complete_block_stops_stream()
+    test_prose_without_fence_is_aborted()
+    test_second_scene_is_aborted()
+    test_length_cap()
+    print("✅ Stream guard tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Test HLS segments published while a render is in progress.
+
+ffmpeg and manim are replaced by stand-ins, so neither needs to be installed.
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils import streaming
+from manimator.utils.schema import ManimProcessor
+from manimator.utils.streaming import HlsPlaylist, SegmentPublisher, start_streaming_render
+
+
+def fake_remux(video_path, output_path, offset=0.0, timeout=None):
+    shutil.copyfile(video_path, output_path)
+    return output_path
+
+
+def test_playlist_grows_and_ends(tmp_path):
+    playlist = HlsPlaylist(str(tmp_path / "index.m3u8"))
+    assert "#EXTINF" not in open(playlist.path).read()
+    playlist.add("segment00000.ts", 1.0)
+    playlist.add("segment00001.ts", 2.4)
+    text = open(playlist.path).read()
+    assert "#EXT-X-TARGETDURATION:3" in text
+    assert "#EXT-X-ENDLIST" not in text
+    playlist.end()
+    lines = open(playlist.path).read().splitlines()
+    assert lines[-3:] == ["#EXTINF:2.400,", "segment00001.ts", "#EXT-X-ENDLIST"]
+
+
+def test_publisher_skips_unfinished_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming, "remux_to_ts", fake_remux)
+    partial = tmp_path / "partial.mp4"
+    partial.write_text("frames")
+    log = tmp_path / "segments.log"
+    log.write_text(f"{partial}\t1.5\n{partial}\t2")
+    playlist = HlsPlaylist(str(tmp_path / "index.m3u8"))
+    publisher = SegmentPublisher(str(log), playlist)
+    publisher.publish_pending()
+    assert playlist.segments == [("segment00000.ts", 1.5)]
+    with open(log, "a") as f:
+        f.write(".0\n")
+    publisher.publish_pending()
+    assert playlist.segments == [("segment00000.ts", 1.5), ("segment00001.ts", 2.0)]
+    assert publisher.elapsed == 3.5
+
+
+def test_failed_remux_leaves_a_marked_gap(tmp_path, monkeypatch):
+    """Segments after a failed remux keep their time offset behind a discontinuity"""
+    offsets = []
+
+    def flaky_remux(video_path, output_path, offset=0.0, timeout=None):
+        if os.path.basename(video_path) == "broken.mp4":
+            raise RuntimeError("remux failed")
+        offsets.append(offset)
+        return fake_remux(video_path, output_path)
+
+    monkeypatch.setattr(streaming, "remux_to_ts", flaky_remux)
+    good, broken = tmp_path / "good.mp4", tmp_path / "broken.mp4"
+    good.write_text("frames")
+    broken.write_text("frames")
+    log = tmp_path / "segments.log"
+    log.write_text(f"{good}\t1.0\n{broken}\t2.0\n{good}\t1.5\n")
+    playlist = HlsPlaylist(str(tmp_path / "index.m3u8"))
+    publisher = SegmentPublisher(str(log), playlist)
+    publisher.publish_pending()
+    assert playlist.segments == [("segment00000.ts", 1.0), ("segment00001.ts", 1.5)]
+    assert offsets == [0.0, 3.0]
+    assert publisher.elapsed == 4.5
+    assert publisher.error == "remux failed"
+    lines = open(playlist.path).read().splitlines()
+    assert lines[-3:] == ["#EXT-X-DISCONTINUITY", "#EXTINF:1.500,", "segment00001.ts"]
+    assert lines.count("#EXT-X-DISCONTINUITY") == 1
+
+
+def test_streaming_render_publishes_every_scene(tmp_path, monkeypatch):
+    def fake_render_scene(self, scene_file, scene_name, temp_dir, deadline=None, quality=None,
+                          sections=None, segment_log=None):
+        """Stands in for manim: logs two partial movies, then returns the video"""
+        for index in range(2):
+            partial = os.path.join(temp_dir, f"{scene_name}{index}.mp4")
+            with open(partial, "w") as f:
+                f.write(scene_name)
+            with open(segment_log, "a") as f:
+                f.write(f"{partial}\t1.0\n")
+        video = os.path.join(str(tmp_path / "artifacts"), f"{scene_name}.mp4")
+        with open(video, "w") as f:
+            f.write(scene_name)
+        return video
+
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(streaming, "remux_to_ts", fake_remux)
+    monkeypatch.setattr(ManimProcessor, "render_scene", fake_render_scene)
+    stream = start_streaming_render("class Intro(Scene): pass", ["Intro"])
+    assert stream.wait(timeout=10) == os.path.join(stream.directory, "video.mp4")
+    assert stream.error is None
+    text = open(stream.playlist_path).read()
+    assert text.count("#EXTINF:1.000,") == 2 and text.endswith("#EXT-X-ENDLIST\n")
+    assert open(os.path.join(stream.directory, "segment00001.ts")).read() == "Intro"
+    assert streaming.get_streaming_render(stream.stream_id) is stream
+
+
+def test_only_finished_streams_are_evicted(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def fake_render_scene(self, scene_file, scene_name, temp_dir, deadline=None, quality=None,
+                          sections=None, segment_log=None):
+        """Holds the "Slow" scene until released"""
+        if scene_name == "Slow":
+            release.wait(10)
+        video = os.path.join(str(tmp_path / "artifacts"), f"{scene_name}.mp4")
+        with open(video, "w") as f:
+            f.write(scene_name)
+        return video
+
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(streaming, "_MAX_TRACKED_STREAMS", 1)
+    monkeypatch.setattr(streaming, "_streams", OrderedDict())
+    monkeypatch.setattr(ManimProcessor, "render_scene", fake_render_scene)
+    slow = start_streaming_render("class Slow(Scene): pass", ["Slow"])
+    fast = start_streaming_render("class Fast(Scene): pass", ["Fast"])
+    fast.wait(timeout=10)
+    for _ in range(100):
+        if not os.path.exists(fast.directory):
+            break
+        time.sleep(0.01)
+    # Over the limit: the finished stream goes, the older one still rendering stays
+    assert streaming.get_streaming_render(fast.stream_id) is None
+    assert not os.path.exists(fast.directory)
+    assert streaming.get_streaming_render(slow.stream_id) is slow
+    release.set()
+    assert slow.wait(timeout=10) == os.path.join(slow.directory, "video.mp4")
+    assert os.path.exists(slow.playlist_path)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Test TeX cache keys and hit-rate totals shared between processes."""
+
+import os
+import sys
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.disk_cache import DiskCache
+from manimator.utils.tex_cache import tex_cache_key
+
+
+def test_key_covers_document_and_toolchain():
+    doc = "\\documentclass{standalone}\\begin{document}$x^2$\\end{document}"
+    assert tex_cache_key(doc, "latex", ".dvi") == tex_cache_key(doc, "latex", ".dvi")
+    assert tex_cache_key(doc, "latex", ".dvi") != tex_cache_key(doc, "xelatex", ".xdv")
+    assert tex_cache_key(doc, "latex", ".dvi") != tex_cache_key(doc.replace("x^2", "x^3"), "latex", ".dvi")
+    assert tex_cache_key(doc, "latex", ".dvi").endswith(".svg")
+
+
+def test_hit_rate_totals_across_processes(tmp_path):
+    """Each worker persists its own counts; totals add up"""
+    root = str(tmp_path / "tex")
+    worker_a = DiskCache(root, max_bytes=10**6)
+    worker_b = DiskCache(root, max_bytes=10**6)
+
+    assert worker_a.get("formula.svg") is None
+    worker_a.put_bytes("formula.svg", b"<svg/>")
+    assert worker_b.get("formula.svg")
+    assert worker_b.get("formula.svg")
+
+    assert worker_a.persist_stats() == (0, 1)
+    assert worker_b.persist_stats() == (2, 0)
+    # Nothing new since the last flush
+    assert worker_b.persist_stats() == (0, 0)
+    totals = DiskCache(root, max_bytes=10**6).load_stats()
+    assert totals["hits"] == 2 and totals["misses"] == 1
+    assert abs(totals["hit_rate"] - 2 / 3) < 1e-9
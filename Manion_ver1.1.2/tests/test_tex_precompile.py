@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Test which formulas are collected for ahead-of-time LaTeX compilation."""
+
+import os
+import sys
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.tex_precompile import collect_tex_calls
+
+CODE = r'''
+class Quadratic(Scene):
+    def construct(self):
+        eq = MathTex("x^2", "+", "bx", color=BLUE, font_size=48)
+        again = MathTex("x^2", "+", "bx")
+        roots = MathTex(r"x = \frac{-b \pm \sqrt{b^2-4ac}}{2a}", tex_to_color_map={"a": RED})
+        label = Tex("Roots", tex_template=TexTemplateLibrary.ctex)
+        dynamic = MathTex(f"{n}^2")
+        templated = Tex("x", tex_template=my_template)
+        number = Text("not tex")
+'''
+
+
+def test_collects_literal_formulas_once():
+    specs = collect_tex_calls(CODE)
+    assert {"cls": "MathTex", "args": ["x^2", "+", "bx"], "kwargs": {}} in specs
+    assert len([s for s in specs if s["args"] == ["x^2", "+", "bx"]]) == 1
+    assert {
+        "cls": "MathTex",
+        "args": [r"x = \frac{-b \pm \sqrt{b^2-4ac}}{2a}"],
+        "kwargs": {"substrings_to_isolate": ["a"]},
+    } in specs
+    assert {"cls": "Tex", "args": ["Roots"], "kwargs": {"tex_template": "ctex"}} in specs
+    # f-strings and unknown templates are left to the render
+    assert len(specs) == 3
+
+
+def test_unparsable_code_collects_nothing():
+    assert collect_tex_calls("class A(:") == []
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Test time-sliced rendering of a single long scene.
+
+dry_run, render_scene and the join are replaced by stand-ins, except in the
+end-to-end test, which needs manim and ffmpeg.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils import timeslice
+from manimator.utils.schema import DryRunResult, ManimProcessor
+from manimator.utils.timeslice import render_time_sliced, slice_bounds
+
+SWEEP = """class Sweep(Scene):
+    def construct(self):
+        dot = Dot(LEFT * 4)
+        self.add(dot)
+        self.play(dot.animate.shift(RIGHT * 8), run_time=6, rate_func=linear)
+        self.wait(2)
+"""
+
+TRACKING = """class Tracking(Scene):
+    def construct(self):
+        dot = Dot(LEFT * 4)
+        label = always_redraw(lambda: Text("x").next_to(dot, UP))
+        self.add(dot, label)
+        self.play(dot.animate.shift(RIGHT * 8), run_time=6, rate_func=linear)
+"""
+
+
+def fake_concat(video_paths, output_path, timeout=None):
+    with open(output_path, "w") as f:
+        f.write("|".join(open(path).read() for path in video_paths))
+    return output_path
+
+
+def test_slice_bounds_cover_the_video():
+    assert slice_bounds(90, 4) == [(0, 22), (22, 45), (45, 68), (68, None)]
+    assert slice_bounds(10, 1) == [(0, None)]
+
+
+def test_slices_render_in_parallel_and_join(tmp_path, monkeypatch):
+    calls, lock = [], threading.Lock()
+
+    def fake_dry_run(self, scene_file, scene_name, temp_dir, deadline=None, layout=None, previews=None):
+        return DryRunResult(ok=True, duration=8.0, animations=2)
+
+    def fake_render_scene(self, scene_file, scene_name, temp_dir, deadline=None, quality=None,
+                          frame_slice=None, fast_start=None):
+        assert fast_start is False
+        with lock:
+            calls.append(frame_slice)
+        path = os.path.join(temp_dir, "slice.mp4")
+        with open(path, "w") as f:
+            f.write(f"{frame_slice[0]}-{frame_slice[1]}")
+        return path
+
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(ManimProcessor, "dry_run", fake_dry_run)
+    monkeypatch.setattr(ManimProcessor, "render_scene", fake_render_scene)
+    monkeypatch.setattr(timeslice, "concat_videos", fake_concat)
+    joined = render_time_sliced(ManimProcessor(), "scene.py", "Sweep", str(tmp_path), quality="low", slices=4)
+    # 8 seconds at 15 fps
+    assert open(joined).read() == "0-30|30-60|60-90|90-None"
+    assert sorted(calls, key=lambda bounds: bounds[0]) == slice_bounds(120, 4)
+    assert not os.path.exists(os.path.join(str(tmp_path), "slices", "media00", "slice.mp4"))
+
+
+def test_short_or_unsliceable_scenes_render_whole(tmp_path, monkeypatch):
+    def short_dry_run(self, scene_file, scene_name, temp_dir, deadline=None, layout=None, previews=None):
+        return DryRunResult(ok=True, duration=3.0, animations=1)
+
+    monkeypatch.setattr(ManimProcessor, "dry_run", short_dry_run)
+    assert render_time_sliced(ManimProcessor(), "scene.py", "Sweep", str(tmp_path), slices=4) is None
+
+    # The caller's dry run is used as is; updaters rule slicing out
+    def no_dry_run(self, *args, **kwargs):
+        raise AssertionError("dry run repeated")
+
+    monkeypatch.setattr(ManimProcessor, "dry_run", no_dry_run)
+    planned = DryRunResult(ok=True, duration=30.0, animations=1, slice_blocker="updaters")
+    assert render_time_sliced(
+        ManimProcessor(), "scene.py", "Sweep", str(tmp_path), slices=4, planned=planned
+    ) is None
+
+
+def test_slice_errors_are_raised(tmp_path, monkeypatch):
+    def broken(self, scene_file, scene_name, temp_dir, deadline=None, quality=None, frame_slice=None,
+               fast_start=None):
+        if frame_slice[0] > 0:
+            raise RuntimeError("Render error: NameError")
+        path = os.path.join(temp_dir, "slice.mp4")
+        with open(path, "w") as f:
+            f.write("frames")
+        return path
+
+    monkeypatch.setattr(ManimProcessor, "render_scene", broken)
+    planned = DryRunResult(ok=True, duration=30.0, animations=1)
+    with pytest.raises(RuntimeError, match="NameError"):
+        render_time_sliced(ManimProcessor(), "scene.py", "Sweep", str(tmp_path), slices=4, planned=planned)
+    # The slice that did render is not left behind
+    assert not os.path.exists(os.path.join(str(tmp_path), "slices", "media00", "slice.mp4"))
+
+
+@pytest.mark.parametrize("fast_start, moved", [(None, True), (False, False)])
+def test_only_joined_slices_skip_faststart(tmp_path, monkeypatch, fast_start, moved):
+    """A scene cut short by the load policy is served as is, so it still gets faststart"""
+    from manimator.utils import schema
+
+    def fake_render_cli(self, scene_file, scene_name, temp_dir, quality, *args):
+        video = tmp_path / "Sweep.mp4"
+        video.write_text("video")
+        return str(video)
+
+    moved_videos = []
+    monkeypatch.setenv("MANIM_RENDER_POOL_SIZE", "0")
+    monkeypatch.setenv("RENDER_TIMINGS", "0")
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(schema, "precompile_tex", lambda code, timeout=None: None)
+    monkeypatch.setattr(schema, "faststart", lambda path, timeout=None: moved_videos.append(path))
+    monkeypatch.setattr(ManimProcessor, "_render_cli", fake_render_cli)
+    scene_file = tmp_path / "scene.py"
+    scene_file.write_text(SWEEP)
+    assert ManimProcessor().render_scene(
+        str(scene_file), "Sweep", str(tmp_path), quality="low", frame_slice=(0, 60),
+        fast_start=fast_start,
+    )
+    assert bool(moved_videos) == moved
+
+
+def test_dry_run_reports_what_blocks_slicing(monkeypatch):
+    pytest.importorskip("manim")
+    monkeypatch.setenv("MANIM_RENDER_POOL_SIZE", "0")
+    processor = ManimProcessor()
+    with processor.create_temp_dir() as temp_dir:
+        sweep = processor.dry_run(processor.save_code(SWEEP, temp_dir), "Sweep", temp_dir)
+        tracking = processor.dry_run(processor.save_code(TRACKING, temp_dir), "Tracking", temp_dir)
+    assert sweep.ok and sweep.slice_blocker is None
+    assert tracking.ok and "updaters" in tracking.slice_blocker
+
+
+def count_frames(path):
+    return int(subprocess.run(
+        ["ffprobe", "-v", "error", "-count_frames", "-select_streams", "v:0",
+         "-show_entries", "stream=nb_read_frames", "-of", "csv=p=0", path],
+        check=True, capture_output=True, text=True,
+    ).stdout.strip())
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="needs ffmpeg")
+def test_sliced_render_matches_whole_render(tmp_path, monkeypatch):
+    pytest.importorskip("manim")
+    monkeypatch.setenv("MANIM_RENDER_POOL_SIZE", "0")
+    monkeypatch.setenv("RENDER_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    processor = ManimProcessor()
+    videos = []
+    for slices in (0, 3):
+        with processor.create_temp_dir() as temp_dir:
+            scene_file = processor.save_code(SWEEP, temp_dir)
+            videos.append(processor.render_scene(
+                scene_file, "Sweep", temp_dir, quality="preview", sections=False, time_slices=slices
+            ))
+    # 8 seconds at 10 fps, however it was cut
+    assert count_frames(videos[0]) == count_frames(videos[1]) == 80
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Test the static pre-render validator for generated Manim code."""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils.system_prompts import MANIM_EXAMPLE_SCENE
+from manimator.utils.validator import find_scene_classes, manim_names, validate_code
+
+KNOWN = frozenset({
+    "Scene", "ThreeDScene", "MovingCameraScene", "Text", "MathTex", "Write", "FadeOut",
+    "Create", "Circle", "VGroup", "Line", "Transform", "BLUE", "WHITE", "RED", "GREEN",
+    "YELLOW", "UP", "DOWN", "LEFT", "RIGHT", "Dot", "Axes", "np", "config",
+})
+
+EXAMPLE_CODE = MANIM_EXAMPLE_SCENE.split("```python\n", 1)[1].split("```", 1)[0]
+
+
+def codes(result):
+    return [d.code for d in result.diagnostics]
+
+
+def test_example_scene_is_valid_and_fast():
+    start = time.perf_counter()
+    result = validate_code(EXAMPLE_CODE, KNOWN)
+    assert time.perf_counter() - start < 0.1
+    assert result.ok, result.summary()
+    assert result.scenes == ["NeuralNetworkExplanation"]
+
+
+def test_finds_every_scene_kind_in_order():
+    code = (
+        "class Intro(Scene):\n    def construct(self): self.wait(1)\n"
+        "class Orbit(ThreeDScene):\n    def construct(self): self.wait(1)\n"
+        "class Zoom(MovingCameraScene):\n    def construct(self): self.wait(1)\n"
+        "class Helper:\n    pass\n"
+        "class Derived(Intro):\n    pass\n"
+    )
+    assert find_scene_classes(code) == ["Intro", "Orbit", "Zoom", "Derived"]
+    assert validate_code(code, KNOWN).ok
+    # Intro is Derived's base here, so it is not rendered by itself
+    assert validate_code(code, KNOWN).scenes == ["Orbit", "Zoom", "Derived"]
+
+
+def test_local_scene_base_needs_no_construct():
+    code = (
+        "class Base(Scene):\n    def title(self, text): return Text(text)\n"
+        "class Main(Base):\n    def construct(self): self.add(self.title('Hi'))\n"
+    )
+    result = validate_code(code, KNOWN)
+    assert result.ok, result.summary()
+    assert result.scenes == ["Main"]
+    # A leaf gets construct() from a local base, or must define it
+    assert validate_code(code + "class Again(Main):\n    pass\n", KNOWN).ok
+    helpers_only = "class Base(Scene):\n    def title(self, text): return Text(text)\n"
+    assert "no_construct" in codes(validate_code(helpers_only + "class Main(Base):\n    pass\n", KNOWN))
+
+
+def test_rejects_bad_code():
+    assert codes(validate_code("class A(Scene):\n  def construct(self)\n", KNOWN)) == ["syntax"]
+    assert "no_scene" in codes(validate_code("x = 1\n", KNOWN))
+    assert "no_construct" in codes(validate_code("class A(Scene):\n    pass\n", KNOWN))
+
+    code = (
+        "import os\n"
+        "import requests\n"
+        "from math import pi\n"
+        "class A(Scene):\n"
+        "    def construct(self):\n"
+        "        data = open('/etc/passwd').read()\n"
+        "        c = Circle(colour=BLUE)\n"
+        "        sq = Sqaure()\n"
+        "        self.play()\n"
+        "        self.play(Create(c), run_time=0)\n"
+        "        img = ImageMobject('cat.png')\n"
+        "        self.__class__.__subclasses__()\n"
+    )
+    result = validate_code(code, KNOWN | {"ImageMobject"})
+    assert not result.ok
+    found = codes(result)
+    assert found.count("import") == 2  # os, requests; math is allowed
+    for rule in ["forbidden_call", "empty_play", "bad_duration", "file_access", "dunder_access"]:
+        assert rule in found
+    unknown = [d for d in result.diagnostics if d.code == "unknown_name"]
+    assert [d.message.split("'")[1] for d in unknown] == ["Sqaure"]
+    assert unknown[0].line == 8
+
+
+@pytest.mark.parametrize("line", [
+    "np.load('weights.npy')",
+    "np.save('out.npy', np.zeros(3))",
+    "np.savez('out.npz', a=np.zeros(3))",
+    "np.fromfile('/etc/passwd', dtype=np.uint8)",
+    "np.zeros(3).tofile('out.bin')",
+    "np.loadtxt('/etc/passwd', dtype=str)",
+    "np.savetxt('out.txt', np.zeros(3))",
+    "np.genfromtxt('/etc/passwd', dtype=str)",
+    "np.memmap('/etc/passwd', dtype=np.uint8)",
+    "reader = np.load",
+    "numpy.lib.npyio.load('x.npy')",
+])
+def test_rejects_numpy_file_access(line):
+    code = f"import numpy\nclass A(Scene):\n    def construct(self):\n        {line}\n"
+    assert "file_access" in codes(validate_code(code, KNOWN))
+
+
+@pytest.mark.parametrize("code", [
+    "from numpy import load\n",
+    "from numpy import *\nx = fromfile('/etc/passwd')\n",
+    "import numpy.ctypeslib\n",
+])
+def test_rejects_numpy_file_access_imports(code):
+    code += "class A(Scene):\n    def construct(self):\n        self.wait(1)\n"
+    assert "file_access" in codes(validate_code(code, KNOWN))
+
+
+@pytest.mark.parametrize("line", [
+    "getattr(np, 'lo' + 'ad')('x.npy')",
+    "vars(np)['load']('x.npy')",
+    "globals()['__builtins__']",
+    "locals()",
+    "lookup = getattr",
+])
+def test_rejects_reflective_builtins(line):
+    code = f"class A(Scene):\n    def construct(self):\n        {line}\n"
+    assert "forbidden_call" in codes(validate_code(code, KNOWN))
+
+
+def test_name_check_skipped_without_manim():
+    code = "class A(Scene):\n    def construct(self):\n        self.play(Sqaure())\n"
+    assert validate_code(code, None).ok == (manim_names() is None)
+
+
+def test_manim_names_resolves_star_exports(tmp_path):
+    package = tmp_path / "manim"
+    (package / "animation").mkdir(parents=True)
+    (package / "__init__.py").write_text(
+        "import numpy as np\nfrom .constants import *\nfrom .animation.fading import *\n"
+    )
+    (package / "constants.py").write_text("__all__ = ['UP']\nUP = 1\nDOWN = -1\n")
+    (package / "animation" / "__init__.py").write_text("")
+    (package / "animation" / "fading.py").write_text(
+        "from ..constants import *\nclass FadeOut: pass\nclass _Private: pass\n"
+    )
+    assert manim_names(str(package)) == frozenset({"np", "UP", "FadeOut"})
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Test the pool of reusable render workspaces.
+
+The pool root is a plain temp dir here; whether it is tmpfs does not change
+the pool's behaviour.
+"""
+
+import os
+import sys
+import time
+
+# Add the manimator module to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from manimator.utils import workspace
+from manimator.utils.workspace import WorkspacePool
+
+
+def test_workspace_is_reused_and_emptied(tmp_path):
+    pool = WorkspacePool(str(tmp_path / "ram"), size=1, quota_bytes=1024)
+    with pool.workspace() as first:
+        os.makedirs(os.path.join(first, "media", "partial_movie_files"))
+        with open(os.path.join(first, "scene.py"), "w") as f:
+            f.write("class Intro(Scene): pass")
+    with pool.workspace() as second:
+        assert second == first
+        assert os.listdir(second) == []
+    assert pool.stats == {"ram": 2, "disk": 0}
+
+    # The old contents are removed in the background
+    for _ in range(100):
+        if os.listdir(pool.root) == ["ws00"]:
+            break
+        time.sleep(0.01)
+    assert os.listdir(pool.root) == ["ws00"]
+
+
+def test_busy_or_full_pool_falls_back_to_disk(tmp_path, monkeypatch):
+    pool = WorkspacePool(
+        str(tmp_path / "ram"), size=1, quota_bytes=1024, fallback_root=str(tmp_path / "disk")
+    )
+    os.makedirs(tmp_path / "disk")
+    with pool.workspace() as ram:
+        with pool.workspace() as disk:
+            assert os.path.dirname(disk) == str(tmp_path / "disk")
+        assert not os.path.exists(disk)
+        assert ram.startswith(pool.root)
+
+    # Not enough RAM left for another full workspace
+    monkeypatch.setattr(workspace, "available_memory_bytes", lambda: 512)
+    with pool.workspace() as low_memory:
+        assert os.path.dirname(low_memory) == str(tmp_path / "disk")
+    assert pool.stats == {"ram": 1, "disk": 2}
+
+
+def test_quota_of_workspaces_in_use_is_reserved(tmp_path, monkeypatch):
+    pool = WorkspacePool(str(tmp_path / "ram"), size=2, quota_bytes=1024)
+    # Room for one full quota, not two
+    monkeypatch.setattr(workspace, "available_memory_bytes", lambda: 1536)
+    with pool.workspace() as first:
+        assert first.startswith(pool.root)
+        assert pool.reserved_bytes == 1024
+        with pool.workspace() as second:
+            assert not second.startswith(pool.root)
+    assert pool.reserved_bytes == 0
+    with pool.workspace() as again:
+        assert again.startswith(pool.root)
+    assert pool.stats == {"ram": 2, "disk": 1}
+
+
+def test_quota_larger_than_root_uses_disk(tmp_path):
+    pool = WorkspacePool(str(tmp_path / "ram"), size=1, quota_bytes=1 << 60)
+    with pool.workspace() as path:
+        assert not path.startswith(pool.root)
+    assert pool.stats == {"ram": 0, "disk": 1}
+
+
+def test_workspaces_of_dead_processes_are_removed(tmp_path):
+    root = tmp_path / "ram"
+    # No process has this pid (pid_max is at most 2**22)
+    stale = root / f"{2 ** 22 + 1}-deadbeef" / "ws00"
+    os.makedirs(stale)
+    pool = WorkspacePool(str(root), size=1, quota_bytes=1024)
+    assert sorted(os.listdir(root)) == [os.path.basename(pool.root)]
+
+
+def test_pool_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv("RENDER_WORKSPACE_DIR", raising=False)
+    assert workspace.get_workspace_pool() is None
+    monkeypatch.setenv("RENDER_WORKSPACE_DIR", str(tmp_path))
+    monkeypatch.setenv("RENDER_WORKSPACES", "0")
+    assert workspace.get_workspace_pool() is None